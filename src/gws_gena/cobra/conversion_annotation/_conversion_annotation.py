@@ -1,124 +1,215 @@
+import csv
+import json
+import os
 import re
 import sys
 
-import pandas as pd
-from cobra.io import load_json_model, save_json_model
+# If there is the id of the compartment at the end of the bigg id, we remove it
+COMPARTMENT_SUFFIX_PATTERN = re.compile(
+    r'(_c$|_e$|_b$|_cm$|_cx$|_g$|_h$|_f$|_m$|_i$|_im$|_mm$|_l$|_n$|_p$|_r$|_s$|_env$|_u$|_um$|_v$|_x$|_y$|_w$)')
+
+
+class AnnotationDBIndex:
+    """
+    Hashed indexes of a database (tab-separated file with a header), by value of its key columns (e.g. BIGG -> row,
+    Name -> row). The first row of a value is kept, like a scan of the database.
+
+    Only the annotation columns (`VALUE_COLUMNS`) of the indexed rows are kept, so the indexes are cached in a file
+    next to the database (`<database>.index.json`) smaller than the database, rebuilt when the database changes.
+    """
+
+    INDEX_FILE_SUFFIX = ".index.json"
+    FORMAT_VERSION = 2
+    METABOLITE_KEY_COLUMNS = ["BIGG", "Name"]
+    REACTION_KEY_COLUMNS = ["BIGG"]
+    VALUE_COLUMNS = ["CHEBI", "RHEA", "EC-number"]
+
+    def __init__(self, header: list, rows: list, indexes: dict):
+        self.header = header
+        self.rows = rows
+        self.indexes = indexes
+
+    @classmethod
+    def build(cls, db_path: str, key_columns: list) -> 'AnnotationDBIndex':
+        """ Read a database and index its key columns """
+        with open(db_path, encoding='utf-8', newline='') as file:
+            reader = csv.reader(file, delimiter='\t')
+            db_header = next(reader, [])
+            db_rows = [row for row in reader if row]
+        header = [column for column in cls.VALUE_COLUMNS if column in db_header]
+        value_positions = [db_header.index(column) for column in header]
+        rows = []
+        row_positions = {}
+        indexes = {}
+        for column in key_columns:
+            position = db_header.index(column)
+            index = {}
+            for i, row in enumerate(db_rows):
+                if position < len(row) and row[position] and row[position] not in index:
+                    if i not in row_positions:
+                        # the row is kept once, even if it is indexed by several key columns
+                        row_positions[i] = len(rows)
+                        rows.append([(row[j] if j < len(row) else "") for j in value_positions])
+                    index[row[position]] = row_positions[i]
+            indexes[column] = index
+        return cls(header, rows, indexes)
+
+    @classmethod
+    def _get_signature(cls, db_path: str, key_columns: list) -> list:
+        stat = os.stat(db_path)
+        return [cls.FORMAT_VERSION, stat.st_size, stat.st_mtime_ns, sorted(key_columns)]
+
+    def get(self, column: str, value: str) -> dict:
+        """
+        Get the annotation columns of the first row of the database with a value in a key column, `None` if there is
+        no row
+        """
+        position = self.indexes[column].get(value)
+        if position is None:
+            return None
+        return dict(zip(self.header, self.rows[position]))
+
+    @classmethod
+    def load(cls, db_path: str, key_columns: list) -> 'AnnotationDBIndex':
+        """ Load the indexes of a database from the index file, or build them (and write the index file) """
+        index_path = db_path + cls.INDEX_FILE_SUFFIX
+        signature = cls._get_signature(db_path, key_columns)
+        if os.path.exists(index_path):
+            try:
+                with open(index_path, encoding='utf-8') as file:
+                    data = json.load(file)
+                if data.get("signature") == signature:
+                    return cls(data["header"], data["rows"], data["indexes"])
+            except (OSError, ValueError, KeyError):
+                pass
+        db_index = cls.build(db_path, key_columns)
+        try:
+            db_index.save(index_path, signature)
+        except OSError:
+            # e.g. read-only directory, the indexes are only kept in memory
+            pass
+        return db_index
+
+    def save(self, index_path: str, signature: list):
+        """ Write the index file (atomically, so concurrent readers never see a partial file) """
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding='utf-8') as file:
+            json.dump({"signature": signature, "header": self.header, "rows": self.rows,
+                      "indexes": self.indexes}, file, separators=(",", ":"))
+        os.replace(tmp_path, index_path)
+
+
+def find_metabolite_row(db_bigg_chebi: AnnotationDBIndex, metabolite_id: str, metabolite_name: str,
+                        metabolites_id: str, metabolites_name: str) -> dict:
+    """ Find the row of a metabolite in the database, `None` if there is no row """
+    # We give priority if there are BiGG identifiers
+    if (metabolites_name == "BiGG" or metabolites_id == "BiGG"):
+        bigg = metabolite_name if metabolites_name == "BiGG" else metabolite_id
+        bigg = COMPARTMENT_SUFFIX_PATTERN.sub('', bigg or "")
+        return db_bigg_chebi.get("BIGG", bigg)
+    if (metabolites_name == "Literal_name" or metabolites_id == "Literal_name"):
+        name = metabolite_name if metabolites_name == "Literal_name" else metabolite_id
+        return db_bigg_chebi.get("Name", (name or "").lower())
+    return None
+
+
+def find_reaction_row(db_bigg_rhea: AnnotationDBIndex, rxn_id: str, rxn_name: str,
+                      reaction_id: str, reaction_name: str) -> dict:
+    """ Find the row of a reaction in the database, `None` if there is no row """
+    if (reaction_name == "BiGG"):
+        return db_bigg_rhea.get("BIGG", rxn_name or "")
+    if (reaction_id == "BiGG"):
+        return db_bigg_rhea.get("BIGG", rxn_id or "")
+    return None
 
 
 #Function to annotate metabolites
-def annotate_metabolites(model, db_bigg_chebi, metabolites_id, metabolites_name):
+def annotate_metabolites(model, db_bigg_chebi: AnnotationDBIndex, metabolites_id, metabolites_name):
     index_metabolite = 0
     chebi_filled_db = 0
+    if "BiGG" not in (metabolites_id, metabolites_name) and \
+            "Literal_name" not in (metabolites_id, metabolites_name):
+        return (model, index_metabolite, chebi_filled_db)
 
     for metabolite in model.metabolites:
-        # We give priority if there are BiGG identifiers
-        if (metabolites_name == "BiGG" or metabolites_id == "BiGG"):
-            if (metabolites_name == "BiGG"):
-                bigg = metabolite.name
-            elif (metabolites_id == "BiGG"):
-                bigg = metabolite.id
-            #If there is the id of the compartment at the end of the bigg id, we remove it
-            bigg = re.sub(r'(_c$|_e$|_b$|_cm$|_cx$|_g$|_h$|_f$|_m$|_i$|_im$|_mm$|_l$|_n$|_p$|_r$|_s$|_env$|_u$|_um$|_v$|_x$|_y$|_w$)', '', bigg)
-            # We search into the database we created
-            if (bigg in db_bigg_chebi.BIGG.values):
-                index_bigg = db_bigg_chebi.index[(db_bigg_chebi['BIGG'] == bigg)].tolist()[0]
-                if 'chebi' not in metabolite.annotation:
-                    id_chebi = db_bigg_chebi["CHEBI"][index_bigg]
-                    metabolite.annotation["chebi"] = str(id_chebi)
-                    chebi_filled_db += 1
-
-            index_metabolite += 1
-
-        elif (metabolites_name == "Literal_name" or metabolites_id == "Literal_name"):
-            if (metabolites_name == "Literal_name"):
-                name = metabolite.name.lower()
-            elif (metabolites_id == "Literal_name"):
-                name = metabolite.id.lower()
-            # We search into the database we created
-            if (name in db_bigg_chebi.Name.values):
-                index_bigg = db_bigg_chebi.index[(db_bigg_chebi['Name'] == name)].tolist()[0]
-                if 'chebi' not in metabolite.annotation:
-                    id_chebi = db_bigg_chebi["CHEBI"][index_bigg]
-                    metabolite.annotation["chebi"] = str(id_chebi)
-                    chebi_filled_db += 1
-
-            index_metabolite += 1
+        # We search into the database we created
+        row = find_metabolite_row(db_bigg_chebi, metabolite.id, metabolite.name, metabolites_id, metabolites_name)
+        # the empty values are not added as annotations
+        if row is not None and 'chebi' not in metabolite.annotation and row["CHEBI"]:
+            metabolite.annotation["chebi"] = row["CHEBI"]
+            chebi_filled_db += 1
+        index_metabolite += 1
 
     return (model, index_metabolite, chebi_filled_db)
 
+
 #Function to annotate reactions
-def annotate_reactions(model, db_bigg_rhea, reaction_id, reaction_name):
+def annotate_reactions(model, db_bigg_rhea: AnnotationDBIndex, reaction_id, reaction_name):
     index_reactions = 0
     rhea_filled_db = 0
     ecnumber_filled_db = 0
 
     for reaction in model.reactions:
-        if (reaction_name == "BiGG"):
-            bigg = reaction.name
-        elif (reaction_id == "BiGG"):
-            bigg = reaction.id
         # We search into the database we created
-        if (bigg in db_bigg_rhea.BIGG.values):
-            index_bigg = db_bigg_rhea.index[(db_bigg_rhea['BIGG'] == bigg)].tolist()[0]
-
-            if 'rhea' not in reaction.annotation:
-                id_rhea = db_bigg_rhea["RHEA"][index_bigg]
-                # if there is not a str, then it's nan, but we don't want to add an annotation "nan"
-                if (isinstance(id_rhea, str)):
-                    reaction.annotation["rhea"] = id_rhea
-                    rhea_filled_db += 1
-            if 'ec-number' not in reaction.annotation:
-                id_ecnumber = db_bigg_rhea["EC-number"][index_bigg]
-                # if there is not a str, then it's nan, but we don't want to add an annotation "nan"
-                if (isinstance(id_ecnumber, str)):
-                    reaction.annotation["ec-number"] = id_ecnumber
-                    ecnumber_filled_db += 1
+        row = find_reaction_row(db_bigg_rhea, reaction.id, reaction.name, reaction_id, reaction_name)
+        if row is not None:
+            # the empty values are not added as annotations
+            if 'rhea' not in reaction.annotation and row["RHEA"]:
+                reaction.annotation["rhea"] = row["RHEA"]
+                rhea_filled_db += 1
+            if 'ec-number' not in reaction.annotation and row["EC-number"]:
+                reaction.annotation["ec-number"] = row["EC-number"]
+                ecnumber_filled_db += 1
 
         index_reactions += 1
     return (model, index_reactions, rhea_filled_db, ecnumber_filled_db)
 
 
-input_model = sys.argv[1]
-output_path = sys.argv[2]
-metabolites_id = sys.argv[3]
-metabolites_name = sys.argv[4]
-reaction_id = sys.argv[5]
-reaction_name = sys.argv[6]
-results_path = sys.argv[7]
-db_metabolites_path = sys.argv[8]
-db_reactions_path = sys.argv[9]
-
-index_reactions = 0
-index_metabolite = 0
-chebi_filled_db = 0
-rhea_filled_db = 0
-ecnumber_filled_db = 0
-
-# Load metabolic model
-model = load_json_model(input_model)
-# Load the database Reactions
-db_bigg_rhea = pd.read_csv(db_reactions_path, sep='\t', dtype=str)
-
-# Load the database Metabolites
-db_bigg_chebi = pd.read_csv(db_metabolites_path, sep='\t', dtype=str)
-
-# Metabolites
-if (metabolites_id != "Other" or metabolites_name != "Other"):
-    model, index_metabolite, chebi_filled_db = annotate_metabolites(
-        model, db_bigg_chebi, metabolites_id, metabolites_name)
-
-# Reactions
-if (reaction_id != "Other" or reaction_name != "Other"):
-    model, index_reactions, rhea_filled_db, ecnumber_filled_db = annotate_reactions(
-        model, db_bigg_rhea, reaction_id, reaction_name)
-
-#Create dataframe results
-columns_results = ("Number reactions", "Rhea filled", "EC number filled", "Number metabolites", "ChEBI filled")
-results = pd.DataFrame(columns=columns_results)
-row = pd.DataFrame([[index_reactions, rhea_filled_db, ecnumber_filled_db,
-                    index_metabolite, chebi_filled_db]], columns=columns_results)
-results = pd.concat([results, row])
-
-# Output
-save_json_model(model, output_path)
-results.to_csv(results_path)
+if __name__ == "__main__":
+    import pandas as pd
+    from cobra.io import load_json_model, save_json_model
+
+    input_model = sys.argv[1]
+    output_path = sys.argv[2]
+    metabolites_id = sys.argv[3]
+    metabolites_name = sys.argv[4]
+    reaction_id = sys.argv[5]
+    reaction_name = sys.argv[6]
+    results_path = sys.argv[7]
+    db_metabolites_path = sys.argv[8]
+    db_reactions_path = sys.argv[9]
+
+    index_reactions = 0
+    index_metabolite = 0
+    chebi_filled_db = 0
+    rhea_filled_db = 0
+    ecnumber_filled_db = 0
+
+    # Load metabolic model
+    model = load_json_model(input_model)
+    # Load the database Reactions
+    db_bigg_rhea = AnnotationDBIndex.load(db_reactions_path, AnnotationDBIndex.REACTION_KEY_COLUMNS)
+
+    # Load the database Metabolites
+    db_bigg_chebi = AnnotationDBIndex.load(db_metabolites_path, AnnotationDBIndex.METABOLITE_KEY_COLUMNS)
+
+    # Metabolites
+    if (metabolites_id != "Other" or metabolites_name != "Other"):
+        model, index_metabolite, chebi_filled_db = annotate_metabolites(
+            model, db_bigg_chebi, metabolites_id, metabolites_name)
+
+    # Reactions
+    if (reaction_id != "Other" or reaction_name != "Other"):
+        model, index_reactions, rhea_filled_db, ecnumber_filled_db = annotate_reactions(
+            model, db_bigg_rhea, reaction_id, reaction_name)
+
+    #Create dataframe results
+    columns_results = ("Number reactions", "Rhea filled", "EC number filled", "Number metabolites", "ChEBI filled")
+    results = pd.DataFrame(columns=columns_results)
+    row = pd.DataFrame([[index_reactions, rhea_filled_db, ecnumber_filled_db,
+                        index_metabolite, chebi_filled_db]], columns=columns_results)
+    results = pd.concat([results, row])
+
+    # Output
+    save_json_model(model, output_path)
+    results.to_csv(results_path)
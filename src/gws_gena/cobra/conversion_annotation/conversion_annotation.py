@@ -19,7 +19,9 @@ from gws_core import (
     task_decorator,
 )
 
+from ...network.network import Network
 from ..cobra_env import CobraEnvHelper
+from .conversion_annotation_helper import ConversionAnnotationHelper
 from .create_database_task import TransformMetabolitesFile, TransformReactionsFile
 
 
@@ -38,19 +40,22 @@ class ConvertAnnotation(Task):
 
     Please provide your metabolic model in input. In output, you will get your model updated and a table summarising the changes made.
 
+    If a Network is given in input, it is annotated in the main process (see `ConversionAnnotationHelper`) and the
+    annotated Network is returned. Otherwise, the model file is annotated with cobra.
+
     """
 
     input_specs = InputSpecs(
         {
             "input_model": InputSpec(
-                File, human_name="Model", short_description="The model to annotate"
+                (File, Network), human_name="Model", short_description="The model to annotate"
             )
         }
     )
     output_specs = OutputSpecs(
         {
             "output_model_annotated": OutputSpec(
-                File, human_name="Model annotated", short_description="The model completed"
+                (File, Network), human_name="Model annotated", short_description="The model completed"
             ),
             "output_results": OutputSpec(
                 Table,
@@ -97,7 +102,7 @@ class ConvertAnnotation(Task):
     )
 
     def run(self, params: ConfigParams, inputs: TaskInputs) -> TaskOutputs:
-        input_model: File = inputs["input_model"]
+        input_model: File | Network = inputs["input_model"]
 
         metabolites_id = params["metabolites_id"]
         metabolites_name = params["metabolites_name"]
@@ -126,6 +131,14 @@ class ConvertAnnotation(Task):
                 db_reactions_path = path
                 break
 
+        if isinstance(input_model, Network):
+            helper = ConversionAnnotationHelper()
+            helper.attach_message_dispatcher(self.message_dispatcher)
+            net_annotated, results = helper.annotate(
+                input_model, db_metabolites_path, db_reactions_path, metabolites_id, metabolites_name,
+                reaction_id, reaction_name)
+            return {"output_model_annotated": net_annotated, "output_results": Table(results)}
+
         shell_proxy = CobraEnvHelper.create_proxy(self.message_dispatcher)
 
         output_path = os.path.join(shell_proxy.working_dir, "model_annotated.json")
@@ -0,0 +1,119 @@
+import os
+
+from pandas import DataFrame
+
+from ...helper.base_helper import BaseHelper
+from ...network.helper.lru_cache import LRUCache
+from ...network.network import Network
+from ._conversion_annotation import AnnotationDBIndex, find_metabolite_row, find_reaction_row
+
+
+class ConversionAnnotationHelper(BaseHelper):
+    """
+    ConversionAnnotationHelper
+
+    Completes the annotation of a network in the main process, like `ConvertAnnotation` does for the cobra models:
+    * the compounds without chebi id get the chebi id of their BiGG id (or name),
+    * the reactions without rhea id (resp. EC number) get the rhea id (resp. EC number) of their BiGG id (or name).
+
+    The databases are looked up with hashed indexes (see `AnnotationDBIndex`), loaded once per process (the
+    indexes of the last databases used are kept in memory).
+    """
+
+    RESULT_COLUMNS = ("Number reactions", "Rhea filled", "EC number filled", "Number metabolites", "ChEBI filled")
+    OTHER = "Other"
+
+    MAX_DB_INDEXES = 4
+
+    _db_indexes = LRUCache(MAX_DB_INDEXES)
+
+    # -- A --
+
+    def annotate(self, network: Network, db_metabolites_path: str, db_reactions_path: str,
+                 metabolites_id: str, metabolites_name: str, reaction_id: str,
+                 reaction_name: str) -> tuple[Network, DataFrame]:
+        """
+        Annotate a network. The input network is not modified.
+
+        :param network: The network
+        :type network: `Network`
+        :param db_metabolites_path: The path of the metabolite database (see `TransformMetabolitesFile`)
+        :type db_metabolites_path: `str`
+        :param db_reactions_path: The path of the reaction database (see `TransformReactionsFile`)
+        :type db_reactions_path: `str`
+        :param metabolites_id: The type of the compound ids (`BiGG`, `Literal_name` or `Other`)
+        :type metabolites_id: `str`
+        :param metabolites_name: The type of the compound names (`BiGG`, `Literal_name` or `Other`)
+        :type metabolites_name: `str`
+        :param reaction_id: The type of the reaction ids (`BiGG` or `Other`)
+        :type reaction_id: `str`
+        :param reaction_name: The type of the reaction names (`BiGG` or `Other`)
+        :type reaction_name: `str`
+        :return: The annotated network and the table summarising the changes
+        :rtype: `tuple[Network, DataFrame]`
+        """
+
+        data = network.dumps()
+        nb_compounds = nb_chebi_ids = 0
+        nb_reactions = nb_rhea_ids = nb_ec_numbers = 0
+
+        if metabolites_id != self.OTHER or metabolites_name != self.OTHER:
+            nb_compounds, nb_chebi_ids = self._annotate_compounds(
+                data, db_metabolites_path, metabolites_id, metabolites_name)
+
+        if reaction_id != self.OTHER or reaction_name != self.OTHER:
+            nb_reactions, nb_rhea_ids, nb_ec_numbers = self._annotate_reactions(
+                data, db_reactions_path, reaction_id, reaction_name)
+
+        self.log_info_message(
+            f"{nb_chebi_ids} chebi ids, {nb_rhea_ids} rhea ids and {nb_ec_numbers} EC numbers added")
+        net = Network.loads(data)
+        results = DataFrame(
+            [[nb_reactions, nb_rhea_ids, nb_ec_numbers, nb_compounds, nb_chebi_ids]], columns=self.RESULT_COLUMNS)
+        return net, results
+
+    def _annotate_compounds(self, data: dict, db_metabolites_path: str, metabolites_id: str,
+                            metabolites_name: str) -> tuple[int, int]:
+        types = (metabolites_id, metabolites_name)
+        if "BiGG" not in types and "Literal_name" not in types:
+            return 0, 0
+
+        db_index = self.load_db_index(db_metabolites_path, AnnotationDBIndex.METABOLITE_KEY_COLUMNS)
+        nb_compounds = nb_chebi_ids = 0
+        for comp_data in data["metabolites"]:
+            row = find_metabolite_row(
+                db_index, comp_data["id"], comp_data.get("name"), metabolites_id, metabolites_name)
+            if row is not None and not comp_data.get("chebi_id") and row["CHEBI"]:
+                comp_data["chebi_id"] = row["CHEBI"]
+                nb_chebi_ids += 1
+            nb_compounds += 1
+        return nb_compounds, nb_chebi_ids
+
+    def _annotate_reactions(self, data: dict, db_reactions_path: str, reaction_id: str,
+                            reaction_name: str) -> tuple[int, int, int]:
+        db_index = self.load_db_index(db_reactions_path, AnnotationDBIndex.REACTION_KEY_COLUMNS)
+        nb_rhea_ids = nb_ec_numbers = 0
+        for rxn_data in data["reactions"]:
+            row = find_reaction_row(db_index, rxn_data["id"], rxn_data.get("name"), reaction_id, reaction_name)
+            if row is None:
+                continue
+            if not rxn_data.get("rhea_id") and row["RHEA"]:
+                rxn_data["rhea_id"] = "RHEA:" + row["RHEA"]
+                nb_rhea_ids += 1
+            if not rxn_data.get("enzymes") and row["EC-number"]:
+                # the enzyme is retrieved from biota when the network is loaded
+                rxn_data["enzymes"] = [{"ec_number": row["EC-number"]}]
+                nb_ec_numbers += 1
+        return len(data["reactions"]), nb_rhea_ids, nb_ec_numbers
+
+    # -- L --
+
+    @classmethod
+    def load_db_index(cls, db_path: str, key_columns: list[str]) -> AnnotationDBIndex:
+        """ Get the indexes of a database, loaded once per process (see `AnnotationDBIndex.load`) """
+        key = (db_path, os.stat(db_path).st_mtime_ns, tuple(key_columns))
+        db_index = cls._db_indexes.get(key)
+        if db_index is None:
+            db_index = AnnotationDBIndex.load(db_path, key_columns)
+            cls._db_indexes.set(key, db_index)
+        return db_index
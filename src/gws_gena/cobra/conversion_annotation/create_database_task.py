@@ -16,6 +16,8 @@ from gws_core import (
     task_decorator,
 )
 
+from ._conversion_annotation import AnnotationDBIndex
+
 
 @task_decorator("Transform_metabolites_file", human_name="Metabolites file transformation",
                 short_description="Transformation of the Bigg Models database metabolites file", hide=True)
@@ -58,6 +60,9 @@ class TransformMetabolitesFile(Task):
             for key, value in metabolites_dict.items():
                 writer.writerow(
                     {'BIGG': key, 'Name': value['name'], 'CHEBI': value['chebi']})
+        # Write the indexes next to the database (see AnnotationDBIndex)
+        AnnotationDBIndex.load(
+            f"{destination_dir}/restructured_metabolites_file.txt", AnnotationDBIndex.METABOLITE_KEY_COLUMNS)
         return {"output": Folder(destination_dir)}
 
 
@@ -115,4 +120,7 @@ class TransformReactionsFile(Task):
             for key, value in reactions_dict.items():
                 writer.writerow(
                     {'BIGG': key, 'RHEA': value['rhea'], 'EC-number': value['ec_number']})
+        # Write the indexes next to the database (see AnnotationDBIndex)
+        AnnotationDBIndex.load(
+            f"{destination_dir}/restructured_reactions_file.txt", AnnotationDBIndex.REACTION_KEY_COLUMNS)
         return {"output": Folder(destination_dir)}
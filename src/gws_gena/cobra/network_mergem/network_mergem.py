@@ -2,6 +2,7 @@ import json
 import os
 
 from gws_core import (
+    BadRequestException,
     BoolParam,
     ConfigParams,
     ConfigSpecs,
@@ -19,6 +20,7 @@ from gws_core import (
     task_decorator,
 )
 
+from ...network.helper.network_mergem_helper import NetworkMergemHelper
 from ...network.network import Network
 from ...network.network_task.network_exporter import NetworkExporter
 from ...network.network_task.network_importer import NetworkImporter
@@ -41,6 +43,10 @@ class NetworkMergem(Task):
     mergem: merging, comparing, and translating genome-scale metabolic models using universal identifiers,
     NAR Genomics and Bioinformatics, Volume 6, Issue 1, March 2024, lqae010,
     https://doi.org/10.1093/nargab/lqae010
+
+    By default, the networks are merged in memory (`native` engine, see `NetworkMergemHelper`): the compounds are
+    matched by chebi id and the reactions by their compounds. The `mergem` engine runs mergem in a conda
+    environment; it is required to translate the ids to another database or to add the mergem annotations.
     """
 
     input_specs = InputSpecs(
@@ -59,6 +65,12 @@ class NetworkMergem(Task):
     )
     config_specs: ConfigSpecs = ConfigSpecs(
         {
+            "engine": SelectParam(
+                default_value="native",
+                options=["native", "mergem"],
+                human_name="Engine",
+                short_description="Merge the networks in memory (native) or with mergem in a conda environment",
+            ),
             "keep_objective": SelectParam(
                 default_value="merge",
                 options=["merge", "1", "2"],
@@ -138,6 +150,19 @@ class NetworkMergem(Task):
         use_proton = params["use_proton"]
         trans_to_db = params["trans_to_db"]
 
+        if params["engine"] == "native":
+            if trans_to_db != "None" or add_annotations:
+                self.log_warning_message(
+                    "The translation of the ids and the mergem annotations require mergem, the mergem engine is used")
+            else:
+                helper = NetworkMergemHelper()
+                helper.attach_message_dispatcher(self.message_dispatcher)
+                net_merged = helper.merge(
+                    self.import_network(net1), self.import_network(net2), keep_objective=keep_objective,
+                    exact_stoichiometry=exact_stoichiometry, use_proton=use_proton, add_biomass=add_biomass,
+                    biomass_metabolite_id_user=biomass_metabolite_id_user)
+                return {"network": net_merged}
+
         if isinstance(net1, Network):
             net1_path = self.export_to_json(net1)
         elif net1.is_json():
@@ -175,6 +200,22 @@ class NetworkMergem(Task):
 
         return {"network": net_mergem}
 
+    def import_network(self, network: Network | File) -> Network:
+        if isinstance(network, Network):
+            return network
+        if network.is_json():
+            # the biomass options are applied once, on the merged network (see NetworkMergemHelper.merge)
+            with open(network.path, encoding="utf-8") as fp:
+                data = json.load(fp)
+            if data.get("network"):
+                # is gws resource
+                data = data["network"]
+            elif data.get("data", {}).get("network"):
+                # is gws old resource
+                data = data["data"]["network"]
+            return Network.loads(data, add_biomass=False)
+        raise BadRequestException("Your models must be Networks or Json Files")
+
     def export_to_json(self, network: Network):
         network = NetworkExporter.call(
             network, params={"file_name": "network", "file_format": "json"}
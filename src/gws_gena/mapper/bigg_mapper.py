@@ -1,7 +1,5 @@
 
-from gws_biota import Compound as BiotaCompound
-from gws_biota import Reaction as BiotaReaction
-
+from ..network.helper.biota_lookup_helper import BiotaLookupHelper
 from ..unicell.unicell import Unicell
 
 
@@ -23,24 +21,13 @@ class BiggMapper:
 
     @classmethod
     def create_mapping_dict(cls, data):
-        unicell = Unicell.create_network()
-        unicell_comps = {comp.chebi_id: comp for comp in unicell.compounds.values()}
-        unicell_rxns = {rxn.rhea_id: rxn for rxn in unicell.reactions.values()}
-
-        # load biota compounds
-        query = BiotaCompound.select().where(BiotaCompound.chebi_id.in_(list(unicell_comps.keys())))
-        biota_comps = {}
-        for c in query:
-            biota_comps[c.chebi_id] = c
+        # lookup tables of the unicell network, cached in the process
+        lookup_tables = Unicell.get_lookup_tables()
+        unicell_chebi_ids = lookup_tables["compound_chebi_ids"]
+        unicell_rhea_ids = lookup_tables["reaction_rhea_ids"]
 
-        # load biota reactions
-        query = BiotaReaction.select().where(BiotaReaction.rhea_id.in_(list(unicell_rxns.keys())))
-        biota_rxns = {}
-        for r in query:
-            biota_rxns[r.rhea_id] = r
-
-        comp_table = {}
-        rxn_table = {}
+        comp_chebi_ids = {}
+        rxn_rhea_ids = {}
 
         # prepare compounds
         ckey = "compounds" if "compounds" in data else "metabolites"
@@ -58,9 +45,8 @@ class BiggMapper:
                 chebi_ids = [val if val.startswith("CHEBI") else "CHEBI:"+val for val in chebi_ids]
 
                 for chebi_id in chebi_ids:
-                    if chebi_id in unicell_comps:
-                        comp = unicell_comps[chebi_id]
-                        comp_table[comp_data["id"]] = biota_comps[chebi_id]
+                    if chebi_id in unicell_chebi_ids:
+                        comp_chebi_ids[comp_data["id"]] = chebi_id
                         break
 
         # prepare reactions
@@ -77,9 +63,14 @@ class BiggMapper:
                 rhea_ids = [val if val.startswith("RHEA") else "RHEA:"+val for val in rhea_ids]
 
                 for rhea_id in rhea_ids:
-                    if rhea_id in unicell_rxns:
-                        rxn = unicell_rxns[rhea_id]
-                        rxn_table[rxn_data["id"]] = biota_rxns[rhea_id]
+                    if rhea_id in unicell_rhea_ids:
+                        rxn_rhea_ids[rxn_data["id"]] = rhea_id
                         break
 
+        # load the biota compounds and reactions used by the network (in bulk, cached)
+        biota_comps = BiotaLookupHelper.get_compounds_by_chebi_ids(comp_chebi_ids.values())
+        biota_rxns = BiotaLookupHelper.get_reactions_by_rhea_ids(rxn_rhea_ids.values())
+        comp_table = {comp_id: biota_comps.get(chebi_id) for comp_id, chebi_id in comp_chebi_ids.items()}
+        rxn_table = {rxn_id: biota_rxns.get(rhea_id) for rxn_id, rhea_id in rxn_rhea_ids.items()}
+
         return {"compounds": comp_table, "reactions": rxn_table}
@@ -31,6 +31,10 @@ class Compartment:
     color = None
     is_steady: bool = None
 
+    # process-wide cache of the biota compartments, by ("go_id", go_id) and ("bigg_id", bigg_id)
+    _biota_compartments: dict = {}
+    _is_biota_compartments_prefetched: bool = False
+
     def __init__(self, dict_: CompartmentDict = None):
         super().__init__()
         if dict_ is None:
@@ -40,7 +44,7 @@ class Compartment:
 
         # only the go_id is used to retreive a valid compartment
         if self.go_id:
-            biota_compart = BiotaCompartment.get_by_go_id(go_id=self.go_id)
+            biota_compart = self._get_biota_compartment(go_id=self.go_id)
         else:
             raise InvalidCompartmentException("A valid compartment go_id is required")
 
@@ -97,9 +101,9 @@ class Compartment:
 
         try:
             if go_id:
-                biota_compart = BiotaCompartment.get_by_go_id(go_id)
+                biota_compart = cls._get_biota_compartment(go_id=go_id)
             elif bigg_id:
-                biota_compart = BiotaCompartment.get_by_bigg_id(bigg_id)
+                biota_compart = cls._get_biota_compartment(bigg_id=bigg_id)
         except BiotaCompartmentNotFoundException as _:
             return None
         except Exception as err:
@@ -117,6 +121,38 @@ class Compartment:
         else:
             return None
 
+    @classmethod
+    def _get_biota_compartment(cls, *, go_id: str = None, bigg_id: str = None) -> BiotaCompartment:
+        """ Get a biota compartment using the process-wide cache """
+        key = ("go_id", go_id) if go_id else ("bigg_id", bigg_id)
+        biota_compart = cls._biota_compartments.get(key)
+        if biota_compart is None:
+            if go_id:
+                biota_compart = BiotaCompartment.get_by_go_id(go_id)
+            else:
+                biota_compart = BiotaCompartment.get_by_bigg_id(bigg_id)
+            if biota_compart:
+                cls._cache_biota_compartment(biota_compart, key)
+        return biota_compart
+
+    @classmethod
+    def _cache_biota_compartment(cls, biota_compart: BiotaCompartment, key: tuple = None):
+        if key is not None:
+            cls._biota_compartments[key] = biota_compart
+        # the go_id is shared by several compartments (e.g. sink and environment), the first one is kept
+        cls._biota_compartments.setdefault(("go_id", biota_compart.go_id), biota_compart)
+        if biota_compart.bigg_id:
+            cls._biota_compartments.setdefault(("bigg_id", biota_compart.bigg_id), biota_compart)
+
+    @classmethod
+    def prefetch_biota_compartments(cls):
+        """ Load all the biota compartments in the process-wide cache at once (done only once) """
+        if cls._is_biota_compartments_prefetched:
+            return
+        for biota_compart in BiotaCompartment.select():
+            cls._cache_biota_compartment(biota_compart)
+        cls._is_biota_compartments_prefetched = True
+
     @ classmethod
     def create_cytosol_compartment(cls):
         """ Create cytosol compartment """
@@ -2,15 +2,17 @@
 import copy
 import random
 
-from gws_biota import Cofactor as BiotaCofactor
 from gws_biota import Compound as BiotaCompound
 from gws_biota import CompoundLayout as BiotaCompoundLayout
 from gws_biota import CompoundLayoutDict as BiotaCompoundLayoutDict
-from gws_biota import Residue as BiotaResidue
 from gws_core import BadRequestException
 
 from ..compartment.compartment import Compartment
 from ..exceptions.compound_exceptions import CompoundNotFoundException, InvalidCompoundIdException
+from ..helper.biota_lookup_helper import BiotaLookupHelper
+from ..helper.biota_template_cache import BiotaTemplateCache
+from ..helper.change_tracker_helper import ChangeTrackerHelper
+from ..helper.compound_classifier_helper import CompoundClassifierHelper
 from ..typing.compound_typing import CompoundDict
 
 
@@ -68,6 +70,19 @@ class Compound:
     inchikey: str = ""
     layout: BiotaCompoundLayoutDict = None
 
+    # classification of the compound, valid for the (chebi_id, name) it was computed with
+    _classification: tuple = None
+
+    _TRACKED_ATTRIBUTES = {
+        "id": ChangeTrackerHelper.TOPOLOGY,
+        "name": ChangeTrackerHelper.TOPOLOGY,
+        "compartment": ChangeTrackerHelper.TOPOLOGY,
+        "chebi_id": ChangeTrackerHelper.TOPOLOGY,
+        "charge": ChangeTrackerHelper.CHEMISTRY,
+        "mass": ChangeTrackerHelper.CHEMISTRY,
+        "formula": ChangeTrackerHelper.CHEMISTRY,
+    }
+
     def __init__(self, dict_: CompoundDict = None):
         if dict_ is None:
             dict_ = {}
@@ -120,12 +135,17 @@ class Compound:
 
         if self.layout is None:
             # refresh layout
-            self.layout = BiotaCompoundLayout.get_layout_by_chebi_id(
-                synonym_chebi_ids=self.chebi_id)
+            self.layout = BiotaLookupHelper.get_compound_layout(self.chebi_id)
 
         if self.is_biomass():
             self.append_biomass_layout(is_biomass=True)
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        channel = self._TRACKED_ATTRIBUTES.get(name)
+        if channel is not None:
+            ChangeTrackerHelper.notify_entity_change(self, channel)
+
     # -- A --
 
     def append_biomass_layout(self, is_biomass=False):
@@ -148,11 +168,18 @@ class Compound:
 
     def copy(self) -> 'Compound':
         """ Create a copy of the compound """
+        if self.layout is None:
+            # check attribute for retro-compatiblity
+            # TODO: remove on next major
+            self.layout = {}
+
+        # the layout is given to the constructor to prevent its retrieval from biota
         c = Compound(
             CompoundDict(
                 id=self.id,
                 name=self.name,
-                compartment=self.compartment
+                compartment=self.compartment,
+                layout=self.layout
             ))
         c.charge = self.charge
         c.mass = self.mass
@@ -163,12 +190,7 @@ class Compound:
         c.alt_chebi_ids = copy.deepcopy(self.alt_chebi_ids)
         c.kegg_id = self.kegg_id
         c.inchikey = self.inchikey
-        if self.layout is None:
-            # check attribute for retro-compatiblity
-            # TODO: remove on next major
-            self.layout = {}
-
-        c.layout = self.layout
+        c._classification = self._classification
         return c
 
     @ classmethod
@@ -231,9 +253,16 @@ class Compound:
         :rtype: `gena.compound.Compound`
         """
 
+        if chebi_id and isinstance(chebi_id, (float, int)):
+            chebi_id = f"CHEBI:{chebi_id}"
+        template_key = (
+            biota_compound.id if biota_compound is not None else None,
+            chebi_id, kegg_id, inchikey, compartment_go_id, id, name)
+        c = BiotaTemplateCache.get_compound(template_key)
+        if c is not None:
+            return c
+
         if biota_compound is None and chebi_id:
-            if isinstance(chebi_id, (float, int)):
-                chebi_id = f"CHEBI:{chebi_id}"
             query = BiotaCompound.search_by_chebi_ids([chebi_id])
             biota_compound = query[0] if len(query) > 0 else None
         if biota_compound is None and inchikey:
@@ -266,6 +295,7 @@ class Compound:
                 monoisotopic_mass=biota_compound.monoisotopic_mass,
             ))
 
+        BiotaTemplateCache.set_compound(template_key, c)
         return c
 
     # -- G --
@@ -393,7 +423,7 @@ class Compound:
         :rtype: `bool`
         """
 
-        return BiotaCofactor.is_cofactor(self.chebi_id, name=self.name, use_name_pattern=True)
+        return self._get_classification()[2]
 
     def is_residue(self) -> bool:
         """
@@ -403,7 +433,16 @@ class Compound:
         :rtype: `bool`
         """
 
-        return BiotaResidue.is_residue(name=self.name)
+        return self._get_classification()[3]
+
+    def _get_classification(self) -> tuple:
+        classification = self._classification
+        if classification is None or classification[0] != self.chebi_id or classification[1] != self.name:
+            is_cofactor = CompoundClassifierHelper.is_cofactor(self.chebi_id, self.name)
+            is_residue = CompoundClassifierHelper.is_residue(self.name)
+            classification = (self.chebi_id, self.name, is_cofactor, is_residue)
+            self._classification = classification
+        return classification
 
     def get_type(self) -> bool:
         """
@@ -1,113 +1,364 @@
 
 
 import networkx as nx
+import numpy as np
 from gws_biota import Cofactor as BiotaCofactor
 from gws_core import BadRequestException, Logger
+from pandas import DataFrame
+from scipy.sparse import coo_matrix, csc_matrix, csr_matrix
+from scipy.sparse.csgraph import breadth_first_order, connected_components
+
+from ..helper.change_tracker_helper import ChangeTrackerHelper
+
+
+class GraphData:
+    """
+    Sparse representation of a graph: the nodes are integer-indexed and the adjacency is stored as a
+    symmetric CSR matrix. The edges are stored as arrays, each edge keeps the data of the last reaction that
+    created it (like `networkx.Graph.add_edge`).
+
+    It is cached on the network (see `BaseGraph`) and must therefore not be modified.
+    """
+
+    node_ids: list[str] = None
+    node_edges: csr_matrix = None
+    edge_sources: np.ndarray = None
+    edge_targets: np.ndarray = None
+    edge_rxn_ids: list[str] = None
+    edge_rhea_ids: list[str] = None
+    edge_chebi_ids: list[tuple] = None
+    adjacency: csr_matrix = None
+
+    _node_index: dict[str, int] = None
+    _edge_index: dict[tuple, int] = None
+    _edges: list[tuple] = None
+
+    def __init__(self):
+        self.node_ids = []
+        self._node_index = {}
+        self._edge_index = {}
+        self._edges = []
+
+    # -- A --
+
+    def add_edge(self, node_1: str, node_2: str, rxn_id: str, rhea_id: str, chebi_ids: tuple):
+        """ Add an edge, the data of the edge are replaced if it already exists """
+        i = self._add_node(node_1)
+        j = self._add_node(node_2)
+        key = (i, j) if i <= j else (j, i)
+        edge = (i, j, rxn_id, rhea_id, chebi_ids)
+        if key in self._edge_index:
+            position = self._edge_index[key]
+            # keep the orientation of the first edge
+            self._edges[position] = (*self._edges[position][:2], rxn_id, rhea_id, chebi_ids)
+        else:
+            self._edge_index[key] = len(self._edges)
+            self._edges.append(edge)
+
+    def _add_node(self, node_id: str) -> int:
+        index = self._node_index.get(node_id)
+        if index is None:
+            index = len(self.node_ids)
+            self._node_index[node_id] = index
+            self.node_ids.append(node_id)
+        return index
+
+    # -- B --
+
+    def build(self):
+        """ Build the arrays and the adjacency matrix once all the edges are added """
+        nb_nodes = len(self.node_ids)
+        self.edge_sources = np.array([edge[0] for edge in self._edges], dtype=np.int64)
+        self.edge_targets = np.array([edge[1] for edge in self._edges], dtype=np.int64)
+        self.edge_rxn_ids = [edge[2] for edge in self._edges]
+        self.edge_rhea_ids = [edge[3] for edge in self._edges]
+        self.edge_chebi_ids = [edge[4] for edge in self._edges]
+        rows = np.concatenate([self.edge_sources, self.edge_targets])
+        cols = np.concatenate([self.edge_targets, self.edge_sources])
+        self.adjacency = coo_matrix(
+            (np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=(nb_nodes, nb_nodes)
+        ).tocsr()
+        # the self-loops are counted twice
+        self.adjacency.data[:] = 1
+        edge_numbers = np.arange(len(self._edges), dtype=np.int64)
+        self.node_edges = coo_matrix(
+            (np.ones(len(rows), dtype=np.int8), (rows, np.concatenate([edge_numbers, edge_numbers]))),
+            shape=(nb_nodes, len(self._edges))
+        ).tocsr()
+        self._edge_index = None
+        self._edges = None
+
+    # -- G --
+
+    def get_node_index(self, node_id: str) -> int:
+        """ Get the index of a node """
+        index = self._node_index.get(node_id)
+        if index is None:
+            raise BadRequestException(f"Node {node_id} not found in the graph")
+        return index
+
+    # -- H --
+
+    def has_node(self, node_id: str) -> bool:
+        """ Return True if the node exists """
+        return node_id in self._node_index
 
 
 class BaseGraph:
-    """ Graph """
+    """
+    Graph
+
+    The graph is derived from the stoichiometric matrix of the network and stored in a sparse form (see
+    `GraphData`), cached on the network until its topology changes. The queries run on the sparse adjacency
+    matrix; the networkx graph is only created if requested (see `get_nx_graph`).
+    """
+
+    _data: GraphData = None
     _nxgraph = None
-    _chebi_ids = None
 
     def __init__(self, network: 'Network' = None, use_chebi_ids_as_nodes: bool = False, skip_cofactors: bool = False):
         if network is None:
-            self._graph = nx.Graph()
+            self._data = GraphData()
+            self._data.build()
         else:
-            nxgraph = self._create_nxgraph_from_network(
-                network, use_chebi_ids_as_nodes=use_chebi_ids_as_nodes, skip_cofactors=skip_cofactors)
-            self._nxgraph = nxgraph
+            self._data = network.network_data._get_cached_data(
+                f"{self.__class__.__name__}:{use_chebi_ids_as_nodes}:{skip_cofactors}",
+                lambda: self._create_graph_data_from_network(
+                    network, use_chebi_ids_as_nodes=use_chebi_ids_as_nodes, skip_cofactors=skip_cofactors),
+                channels=(ChangeTrackerHelper.TOPOLOGY,)
+            )
+
+    # -- A --
+
+    @classmethod
+    def _add_reaction_edges(cls, data: GraphData, rxn_id: str, rhea_id: str, substrates: list[int],
+                            products: list[int], node_ids: list[str], chebi_ids: list[str]):
+        for i in substrates:
+            for k in products:
+                data.add_edge(node_ids[i], node_ids[k], rxn_id, rhea_id, (chebi_ids[i], chebi_ids[k]))
+
+    # -- C --
+
+    @classmethod
+    def _create_graph_data(cls, S_csc: csc_matrix, compound_ids: list[str], chebi_ids: list[str],
+                           reaction_ids: list[str], rhea_ids: list[str], use_chebi_ids_as_nodes: bool = False,
+                           skip_cofactors: bool = False) -> GraphData:
+        """ Construct the graph data from a stoichiometric matrix (compounds x reactions) """
+
+        data = GraphData()
+        node_ids = [(chebi_id or comp_id) if use_chebi_ids_as_nodes else comp_id
+                    for comp_id, chebi_id in zip(compound_ids, chebi_ids)]
+
+        cofactors = set(BiotaCofactor.get_factors_as_list()) if skip_cofactors else set()
+        is_valid = [bool(node_id) and node_id not in cofactors for node_id in node_ids]
+        if not all(bool(node_id) for node_id in node_ids):
+            Logger.debug("Reactions without rhea_id or compounds without chebi_id are ignored")
+
+        added_rhea_ids = set()
+        for j, (rxn_id, rhea_id) in enumerate(zip(reaction_ids, rhea_ids)):
+            if rhea_id in added_rhea_ids:
+                continue
+
+            start, end = S_csc.indptr[j], S_csc.indptr[j + 1]
+            indices, stoichs = S_csc.indices[start:end], S_csc.data[start:end]
+            substrates = [i for i, stoich in zip(indices, stoichs) if stoich < 0 and is_valid[i]]
+            products = [i for i, stoich in zip(indices, stoichs) if stoich > 0 and is_valid[i]]
+            cls._add_reaction_edges(data, rxn_id, rhea_id, substrates, products, node_ids, chebi_ids)
+
+            if rhea_id:
+                added_rhea_ids.add(rhea_id)
+
+        data.build()
+        return data
+
+    @classmethod
+    def _create_graph_data_from_network(
+            cls, network: 'Network', use_chebi_ids_as_nodes: bool = False, skip_cofactors: bool = False) -> GraphData:
+        """ Construct the graph data from a `Network` """
+
+        network_data = network.network_data
+        core = network_data.get_core()
+        return cls._create_graph_data(
+            core.get_csc_matrix(), core.compound_ids, core.compound_chebi_ids, core.reaction_ids,
+            core.reaction_rhea_ids,
+            use_chebi_ids_as_nodes=use_chebi_ids_as_nodes, skip_cofactors=skip_cofactors)
+
+    # -- E --
+
+    def _expand(self, indices: list[int], radius: int, blocked: np.ndarray = None) -> np.ndarray:
+        """
+        Expand a set of nodes, all the sources at once: the frontier is propagated with sparse matrix-vector
+        products over the adjacency matrix
+
+        :return: The mask of the nodes at a distance <= radius of the sources
+        :rtype: `np.ndarray`
+        """
+
+        adjacency = self._data.adjacency
+        visited = np.zeros(adjacency.shape[0], dtype=bool)
+        visited[indices] = True
+        frontier = visited.copy()
+        for _ in range(radius):
+            reached = adjacency.dot(frontier.astype(np.int32)) > 0
+            reached &= ~visited
+            if blocked is not None:
+                reached &= ~blocked
+            if not reached.any():
+                break
+            visited |= reached
+            frontier = reached
+        return visited
+
+    # -- F --
 
     def find_neigbors(self, nodes: list, radius: int = 1, exclude_nodes: list = None):
         """ Finds the neighbors of a list of nodes """
 
         if not isinstance(nodes, list):
             raise BadRequestException("The nodes must be a list")
-        neigbors = []
-        for node in nodes:
-            subgraph = nx.ego_graph(self._nxgraph, node, radius=radius)
-            neigbors.extend(list(subgraph.nodes()))
+        if len(nodes) == 0:
+            return []
+
+        indices = [self._data.get_node_index(node) for node in nodes]
+        visited = self._expand(indices, radius)
+        neigbors = [self._data.node_ids[i] for i in np.flatnonzero(visited)]
 
-        neigbors = list(set(neigbors))
         if exclude_nodes is not None:
+            exclude_nodes = set(exclude_nodes)
             neigbors = [n for n in neigbors if n not in exclude_nodes]
 
         return neigbors
 
+    def find_neighborhood(self, nodes: list, radius: int = 1, exclude_nodes: list = None) -> DataFrame:
+        """
+        Finds the neighborhood of a list of nodes, i.e. the subgraph induced by the nodes at a distance
+        <= radius of any of the nodes. All the nodes are expanded at once.
+
+        :param nodes: The source nodes
+        :type nodes: `list`
+        :param radius: The radius of the neighborhood
+        :type radius: `int`
+        :param exclude_nodes: The nodes to exclude, the paths going through these nodes are not followed
+        :type exclude_nodes: `list`
+        :return: The edges of the induced subgraph, with the columns `source`, `target`, `rxn_id` and `rhea_id`
+        :rtype: `DataFrame`
+        """
+
+        if not isinstance(nodes, list):
+            raise BadRequestException("The nodes must be a list")
+
+        data = self._data
+        indices = [data.get_node_index(node) for node in nodes]
+        blocked = None
+        if exclude_nodes:
+            blocked = np.zeros(len(data.node_ids), dtype=bool)
+            blocked[[data.get_node_index(node) for node in exclude_nodes if data.has_node(node)]] = True
+            indices = [i for i in indices if not blocked[i]]
+
+        visited = self._expand(indices, radius, blocked=blocked)
+        edges = np.flatnonzero(visited[data.edge_sources] & visited[data.edge_targets])
+        return DataFrame({
+            "source": [data.node_ids[i] for i in data.edge_sources[edges]],
+            "target": [data.node_ids[i] for i in data.edge_targets[edges]],
+            "rxn_id": [data.edge_rxn_ids[k] for k in edges],
+            "rhea_id": [data.edge_rhea_ids[k] for k in edges],
+        }, columns=["source", "target", "rxn_id", "rhea_id"])
+
+    @classmethod
+    def from_stoichiometric_matrix(
+            cls, S: csc_matrix, compound_ids: list[str], reaction_ids: list[str], chebi_ids: list[str] = None,
+            rhea_ids: list[str] = None, use_chebi_ids_as_nodes: bool = False, skip_cofactors: bool = False):
+        """
+        Create a graph from a stoichiometric matrix (compounds x reactions), without creating the network
+        (e.g. from the arrays of a binary network file, see `NetworkDataBinaryHelper`)
+
+        :param S: The stoichiometric matrix
+        :type S: `csc_matrix`
+        :param compound_ids: The ids of the compounds (rows)
+        :type compound_ids: `list[str]`
+        :param reaction_ids: The ids of the reactions (columns)
+        :type reaction_ids: `list[str]`
+        :param chebi_ids: The chebi ids of the compounds
+        :type chebi_ids: `list[str]`
+        :param rhea_ids: The rhea ids of the reactions
+        :type rhea_ids: `list[str]`
+        """
+
+        graph = cls()
+        graph._data = cls._create_graph_data(
+            csc_matrix(S), compound_ids, chebi_ids or [""] * len(compound_ids), reaction_ids,
+            rhea_ids or [""] * len(reaction_ids), use_chebi_ids_as_nodes=use_chebi_ids_as_nodes,
+            skip_cofactors=skip_cofactors)
+        return graph
+
+    # -- G --
+
     def get_all_rhea_ids(self) -> list:
         """ Get all rhea ids """
-        rhea_ids = set([edge[3] for edge in self._nxgraph.edges.data("rhea_id", default=None)])
-        rhea_ids = [id_ for id_ in rhea_ids if id_ is not None]
-        return rhea_ids
+        return list({id_ for id_ in self._data.edge_rhea_ids if id_ is not None})
 
     def get_all_chebi_ids(self) -> list:
         """ Get all chebi ids """
-        chebi_id_tuples = [edge[3] for edge in self._nxgraph.edges.data("chebi_ids", default=None)]
         chebi_ids = set()
-        for list_ in chebi_id_tuples:
-            chebi_ids.update(*list_)
-        chebi_ids = [id_ for id_ in chebi_ids if id_ is not None]
-        return chebi_ids
+        for ids in self._data.edge_chebi_ids:
+            chebi_ids.update(ids)
+        return [id_ for id_ in chebi_ids if id_ is not None]
+
+    def get_connected_component(self, node: str) -> set[str]:
+        """ Get the nodes connected to a node (including the node) """
+        indices = breadth_first_order(
+            self._data.adjacency, self._data.get_node_index(node), directed=False, return_predecessors=False)
+        return {self._data.node_ids[i] for i in indices}
+
+    def get_connected_components(self) -> list[set[str]]:
+        """ Get the connected components of the graph """
+        nb_components, labels = connected_components(self._data.adjacency, directed=False)
+        components = [set() for _ in range(nb_components)]
+        for node_id, label in zip(self._data.node_ids, labels):
+            components[label].add(node_id)
+        return components
+
+    def get_edges(self, node: str) -> list[tuple[str, str, str]]:
+        """
+        Get the edges of a node
+
+        :return: The edges, as `(node, neighbor, rxn_id)` tuples
+        :rtype: `list[tuple[str, str, str]]`
+        """
+
+        index = self._data.get_node_index(node)
+        node_edges = self._data.node_edges
+        edges = []
+        for k in node_edges.indices[node_edges.indptr[index]:node_edges.indptr[index + 1]]:
+            source, target = self._data.edge_sources[k], self._data.edge_targets[k]
+            neighbor = target if source == index else source
+            edges.append((node, self._data.node_ids[neighbor], self._data.edge_rxn_ids[k]))
+        return edges
+
+    def get_node_ids(self) -> list[str]:
+        """ Get the ids of the nodes """
+        return list(self._data.node_ids)
 
     def get_nx_graph(self):
-        """ Get nx graph """
+        """ Get the graph as a networkx graph (created on the first call) """
+        if self._nxgraph is None:
+            data = self._data
+            nxgraph = nx.Graph()
+            for k, (source, target) in enumerate(zip(data.edge_sources, data.edge_targets)):
+                nxgraph.add_edge(data.node_ids[source], data.node_ids[target], rxn_id=data.edge_rxn_ids[k],
+                                 rhea_id=data.edge_rhea_ids[k], chebi_ids=data.edge_chebi_ids[k], dg_prime=1.0)
+            self._nxgraph = nxgraph
         return self._nxgraph
 
-    # def edge_disjoint_paths(self, source, target, flow_func=None, cutoff=None, auxiliary=None, residual=None):
-    #     pass
+    # -- H --
 
-    @classmethod
-    def _create_nxgraph_from_network(
-            cls, network: 'Network', use_chebi_ids_as_nodes: bool = False, skip_cofactors: bool = False):
-        """ Construct a `Graph` from a `Network` """
-
-        added_rhea_ids = []
-        is_warning_shown = False
-        nxgraph = nx.Graph()
-
-        cofactor_list: list[str] = BiotaCofactor.get_factors_as_list()
-        for rxn in network.reactions.values():
-            if rxn.rhea_id in added_rhea_ids:
-                continue
-
-            for comp1 in rxn.substrates.values():
-                if use_chebi_ids_as_nodes:
-                    comp_id_1 = comp1.compound.chebi_id or comp1.compound.id
-                else:
-                    comp_id_1 = comp1.compound.id
-
-                if not comp_id_1:
-                    if not is_warning_shown:
-                        Logger.debug("Reactions without rhea_id or compounds without chebi_id are ignored")
-                        is_warning_shown = True
-                    continue
-
-                if skip_cofactors and comp_id_1 in cofactor_list:
-                    continue
+    def has_node(self, node: str) -> bool:
+        """ Return True if the node exists """
+        return self._data.has_node(node)
 
-                for comp2 in rxn.products.values():
-                    if use_chebi_ids_as_nodes:
-                        comp_id_2 = comp2.compound.chebi_id or comp2.compound.id
-                    else:
-                        comp_id_2 = comp2.compound.id
-
-                    if not comp_id_2:
-                        if not is_warning_shown:
-                            Logger.debug("Reactions without rhea_id or compounds without chebi_id are ignored")
-                            is_warning_shown = True
-                        continue
-
-                    if skip_cofactors and comp_id_2 in cofactor_list:
-                        continue
-
-                    chebi_ids = (comp1.compound.chebi_id, comp2.compound.chebi_id)
-                    nxgraph.add_edge(comp_id_1, comp_id_2, rxn_id=rxn.id,
-                                     rhea_id=rxn.rhea_id, chebi_ids=chebi_ids, dg_prime=1.0)
-
-            if rxn.rhea_id:
-                added_rhea_ids.append(rxn.rhea_id)
-
-        return nxgraph
+    def has_path(self, source: str, target: str) -> bool:
+        """ Return True if a path exists between two nodes """
+        return target in self.get_connected_component(source)
 
 
 class Graph(BaseGraph):
@@ -117,56 +368,9 @@ class Graph(BaseGraph):
 class BipartiteGraph(BaseGraph):
 
     @classmethod
-    def _create_nxgraph_from_network(
-            cls, network: 'Network', use_chebi_ids_as_nodes: bool = False, skip_cofactors: bool = False):
-        """ Construct a `Graph` from a `Network` """
-
-        added_rhea_ids = []
-        is_warning_shown = False
-        nxgraph = nx.Graph()
-
-        cofactor_list: list[str] = BiotaCofactor.get_factors_as_list()
-        for rxn in network.reactions.values():
-            if rxn.rhea_id in added_rhea_ids:
-                continue
-
-            for comp1 in rxn.substrates.values():
-                if use_chebi_ids_as_nodes:
-                    comp_id_1 = comp1.compound.chebi_id or comp1.compound.id
-                else:
-                    comp_id_1 = comp1.compound.id
-
-                if not comp_id_1:
-                    if not is_warning_shown:
-                        Logger.debug("Reactions without rhea_id or compounds without chebi_id are ignored")
-                        is_warning_shown = True
-                    continue
-
-                if skip_cofactors and comp_id_1 in cofactor_list:
-                    continue
-
-                nxgraph.add_edge(comp_id_1, rxn.id, rxn_id=rxn.id,
-                                 rhea_id=rxn.rhea_id, chebi_ids=(comp_id_1,), dg_prime=1.0)
-
-            for comp2 in rxn.products.values():
-                if use_chebi_ids_as_nodes:
-                    comp_id_2 = comp2.compound.chebi_id or comp2.compound.id
-                else:
-                    comp_id_2 = comp2.compound.id
-
-                if not comp_id_2:
-                    if not is_warning_shown:
-                        Logger.debug("Reactions without rhea_id or compounds without chebi_id are ignored")
-                        is_warning_shown = True
-                    continue
-
-                if skip_cofactors and comp_id_2 in cofactor_list:
-                    continue
-
-                nxgraph.add_edge(rxn.id, comp_id_2, rxn_id=rxn.id,
-                                 rhea_id=rxn.rhea_id, chebi_ids=(comp_id_2,), dg_prime=1.0)
-
-            if rxn.rhea_id:
-                added_rhea_ids.append(rxn.rhea_id)
-
-        return nxgraph
+    def _add_reaction_edges(cls, data: GraphData, rxn_id: str, rhea_id: str, substrates: list[int],
+                            products: list[int], node_ids: list[str], chebi_ids: list[str]):
+        for i in substrates:
+            data.add_edge(node_ids[i], rxn_id, rxn_id, rhea_id, (node_ids[i],))
+        for k in products:
+            data.add_edge(rxn_id, node_ids[k], rxn_id, rhea_id, (node_ids[k],))
@@ -0,0 +1,68 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from gws_biota import Enzyme as BiotaEnzyme
+
+
+class BiotaFetchHelper:
+    """
+    BiotaFetchHelper
+
+    Runs independent biota queries (e.g. one query per batch of ids) concurrently, in a bounded pool of threads.
+    Each thread uses its own connection of the biota database (opened and closed around each query).
+    The results are merged in the order of the batches, so they do not depend on the scheduling of the threads.
+
+    The queries are run one by one if `MAX_WORKERS` is 1, if there is only one batch, or if the biota database
+    is an in-memory SQLite database (which is not shared between the connections).
+    """
+
+    MAX_WORKERS = 4
+
+    # -- F --
+
+    @classmethod
+    def fetch_in_batches(cls, fetch_fn: Callable[[list], list], ids: list, batch_size: int) -> list[Any]:
+        """
+        Fetch the biota entities of a list of ids, by batches
+
+        :param fetch_fn: Function that returns the results of a batch of ids (the query must be evaluated, e.g.
+        with `list(query)`)
+        :type fetch_fn: `Callable[[list], list]`
+        :param ids: The ids
+        :type ids: `list`
+        :param batch_size: The size of the batches
+        :type batch_size: `int`
+        :return: The results of all the batches, in the order of the batches
+        :rtype: `list`
+        """
+
+        batches = [ids[i:i + batch_size] for i in range(0, len(ids), batch_size)]
+        if len(batches) <= 1 or not cls.is_concurrent():
+            return [item for batch in batches for item in fetch_fn(batch)]
+
+        database = cls._get_database()
+        with ThreadPoolExecutor(max_workers=min(cls.MAX_WORKERS, len(batches))) as executor:
+            results = executor.map(lambda batch: cls._fetch(database, fetch_fn, batch), batches)
+            return [item for result in results for item in result]
+
+    @staticmethod
+    def _fetch(database, fetch_fn: Callable[[list], list], batch: list) -> list:
+        with database.connection_context():
+            return list(fetch_fn(batch))
+
+    # -- G --
+
+    @staticmethod
+    def _get_database():
+        return BiotaEnzyme._meta.database
+
+    # -- I --
+
+    @classmethod
+    def is_concurrent(cls) -> bool:
+        """ Return True if the queries can be run concurrently """
+        if cls.MAX_WORKERS <= 1:
+            return False
+        database = cls._get_database()
+        name = str(getattr(database, "database", None) or "")
+        return name not in ("", ":memory:") and "mode=memory" not in name
@@ -0,0 +1,121 @@
+
+import copy
+from typing import Iterable
+
+from gws_biota import Compound as BiotaCompound
+from gws_biota import CompoundLayout as BiotaCompoundLayout
+from gws_biota import Reaction as BiotaReaction
+from gws_biota import Taxonomy as BiotaTaxonomy
+
+from .biota_fetch_helper import BiotaFetchHelper
+from .lru_cache import LRUCache
+
+
+class BiotaLookupHelper:
+    """
+    BiotaLookupHelper
+
+    Memoised lookups of the biota entities used when networks are loaded. The entities are fetched in bulk
+    (`IN (...)` queries by batches) and kept in bounded LRU caches shared by the process. The entities that do
+    not exist are cached too.
+    """
+
+    MAX_CACHE_SIZE = 20000
+    BATCH_SIZE = 500
+
+    _compounds = LRUCache(MAX_CACHE_SIZE)
+    _reactions = LRUCache(MAX_CACHE_SIZE)
+    _master_chebi_ids = LRUCache(MAX_CACHE_SIZE)
+    _compound_layouts = LRUCache(MAX_CACHE_SIZE)
+    _taxonomy_lineages = LRUCache(MAX_CACHE_SIZE)
+
+    # -- C --
+
+    @classmethod
+    def clear_cache(cls):
+        """ Clear the caches """
+        for cache in (cls._compounds, cls._reactions, cls._master_chebi_ids, cls._compound_layouts,
+                      cls._taxonomy_lineages):
+            cache.clear()
+
+    # -- G --
+
+    @classmethod
+    def get_compounds_by_chebi_ids(cls, chebi_ids: Iterable[str]) -> dict[str, BiotaCompound]:
+        """
+        Get the biota compounds of a list of chebi ids
+
+        :return: The compounds that exist, by chebi id
+        :rtype: `dict[str, BiotaCompound]`
+        """
+
+        return cls._get_in_bulk(cls._compounds, BiotaCompound, BiotaCompound.chebi_id, "chebi_id", chebi_ids)
+
+    @classmethod
+    def get_reactions_by_rhea_ids(cls, rhea_ids: Iterable[str]) -> dict[str, BiotaReaction]:
+        """
+        Get the biota reactions of a list of rhea ids
+
+        :return: The reactions that exist, by rhea id
+        :rtype: `dict[str, BiotaReaction]`
+        """
+
+        return cls._get_in_bulk(cls._reactions, BiotaReaction, BiotaReaction.rhea_id, "rhea_id", rhea_ids)
+
+    @classmethod
+    def _get_in_bulk(cls, cache: LRUCache, model, field, field_name: str, ids: Iterable[str]) -> dict:
+        ids = list(dict.fromkeys(id_ for id_ in ids if id_))
+        missing_ids = [id_ for id_ in ids if id_ not in cache]
+        found = {}
+        for entity in BiotaFetchHelper.fetch_in_batches(
+                lambda batch: list(model.select().where(field.in_(batch))), missing_ids, cls.BATCH_SIZE):
+            found[getattr(entity, field_name)] = entity
+        for id_ in missing_ids:
+            cache.set(id_, found.get(id_))
+
+        entities = {}
+        for id_ in ids:
+            entity = cache.get(id_)
+            if entity is None and id_ not in cache:
+                # evicted by the current lookup (more ids than the cache size)
+                entity = model.select().where(field == id_).first()
+            if entity is not None:
+                entities[id_] = entity
+        return entities
+
+    @classmethod
+    def get_compound_layout(cls, chebi_id: str) -> dict:
+        """ Get the layout of a compound (a copy that can be modified) """
+        key = tuple(chebi_id) if isinstance(chebi_id, list) else chebi_id
+        if key not in cls._compound_layouts:
+            cls._compound_layouts.set(key, BiotaCompoundLayout.get_layout_by_chebi_id(synonym_chebi_ids=chebi_id))
+        return copy.deepcopy(cls._compound_layouts.get(key))
+
+    @classmethod
+    def get_taxonomy(cls, tax_id: str) -> BiotaTaxonomy | None:
+        """ Get a taxonomy, `None` if it does not exist """
+        lineage = cls.get_taxonomy_lineage(tax_id)
+        return lineage[0] if lineage else None
+
+    @classmethod
+    def get_taxonomy_lineage(cls, tax_id: str) -> list[BiotaTaxonomy]:
+        """
+        Get the lineage of a taxonomy, i.e. the taxonomy followed by its ancestors (see `Taxonomy.ancestors`)
+
+        :return: The lineage, an empty list if the taxonomy does not exist
+        :rtype: `list[BiotaTaxonomy]`
+        """
+
+        if tax_id not in cls._taxonomy_lineages:
+            tax = BiotaTaxonomy.get_or_none(BiotaTaxonomy.tax_id == tax_id)
+            cls._taxonomy_lineages.set(tax_id, [tax, *tax.ancestors] if tax is not None else [])
+        return cls._taxonomy_lineages.get(tax_id)
+
+    # -- R --
+
+    @classmethod
+    def retrieve_master_chebi_id(cls, chebi_id: str) -> str:
+        """ Get the master chebi id of a chebi id (see `CompoundLayout.retreive_master_chebi_id`) """
+        if chebi_id not in cls._master_chebi_ids:
+            cls._master_chebi_ids.set(chebi_id, BiotaCompoundLayout.retreive_master_chebi_id(chebi_id))
+        return cls._master_chebi_ids.get(chebi_id)
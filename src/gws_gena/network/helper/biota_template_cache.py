@@ -0,0 +1,73 @@
+import copy
+from typing import Hashable
+
+from .lru_cache import LRUCache
+
+
+class BiotaTemplateCache:
+    """
+    BiotaTemplateCache
+
+    Process-level cache of the reactions (by Rhea id) and of the compounds (by biota id and compartment) created
+    from biota. The cached objects are templates: they are never returned, copies are returned instead so the
+    templates cannot be modified by the networks that use them.
+    The caches are bounded, the least recently used templates are evicted.
+
+    The reactions are keyed by Rhea id only: the compartments of their compounds are not chosen by the caller,
+    they are derived from the Rhea definition (`(out)` compounds in the extracellular space, the others in the
+    cytosol, see `ReactionBiotaHelper.create_reaction_from_biota`), so a Rhea id always gives the same reaction.
+    """
+
+    MAX_REACTIONS = 5000
+    MAX_COMPOUNDS = 20000
+
+    _reactions = LRUCache(MAX_REACTIONS)
+    _compounds = LRUCache(MAX_COMPOUNDS)
+
+    # -- C --
+
+    @classmethod
+    def clear_cache(cls):
+        """ Clear the caches """
+        cls._reactions.clear()
+        cls._compounds.clear()
+
+    @staticmethod
+    def _copy_compound(comp: 'Compound') -> 'Compound':
+        comp = comp.copy()
+        comp.layout = copy.deepcopy(comp.layout)
+        return comp
+
+    @classmethod
+    def _copy_reaction(cls, rxn: 'Reaction') -> 'Reaction':
+        rxn = rxn.copy()
+        rxn.enzymes = copy.deepcopy(rxn.enzymes)
+        for val in (*rxn.substrates.values(), *rxn.products.values()):
+            val.compound.layout = copy.deepcopy(val.compound.layout)
+        return rxn
+
+    # -- G --
+
+    @classmethod
+    def get_compound(cls, key: Hashable) -> 'Compound':
+        """ Get a copy of a compound template, `None` if it is not cached """
+        comp = cls._compounds.get(key)
+        return cls._copy_compound(comp) if comp is not None else None
+
+    @classmethod
+    def get_reaction(cls, rhea_id: str) -> 'Reaction':
+        """ Get a copy of a reaction template, `None` if it is not cached """
+        rxn = cls._reactions.get(rhea_id)
+        return cls._copy_reaction(rxn) if rxn is not None else None
+
+    # -- S --
+
+    @classmethod
+    def set_compound(cls, key: Hashable, comp: 'Compound'):
+        """ Cache a copy of a compound as template """
+        cls._compounds.set(key, cls._copy_compound(comp))
+
+    @classmethod
+    def set_reaction(cls, rhea_id: str, rxn: 'Reaction'):
+        """ Cache a copy of a reaction as template """
+        cls._reactions.set(rhea_id, cls._copy_reaction(rxn))
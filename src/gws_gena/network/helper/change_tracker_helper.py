@@ -0,0 +1,82 @@
+
+import itertools
+
+
+class ChangeTrackerHelper:
+    """
+    ChangeTrackerHelper
+
+    Stamps the changes of the network entities (compounds, reactions and reaction compounds) to invalidate
+    the data derived from the networks (matrices, indexes, ...).
+
+    Each network owns a dictionary of stamps with one stamp per channel. An entity added to a network is
+    registered with the stamps of this network, and the stamp of the related channel is renewed each time
+    one of its tracked attributes changes. Each entity also keeps the stamp of its own last change.
+    Stamps are unique and increasing in the process.
+    """
+
+    TOPOLOGY = "topology"
+    BOUNDS = "bounds"
+    CHEMISTRY = "chemistry"
+    CHANNELS = (TOPOLOGY, BOUNDS, CHEMISTRY)
+
+    _counter = itertools.count(1)
+
+    @classmethod
+    def new_stamp(cls) -> int:
+        """ Returns a new stamp """
+        return next(cls._counter)
+
+    @classmethod
+    def create_stamps(cls) -> dict[str, int]:
+        """ Create the stamps of a network """
+        stamp = cls.new_stamp()
+        return {channel: stamp for channel in cls.CHANNELS}
+
+    @classmethod
+    def get_key(cls, stamps: dict[str, int], channels: tuple = CHANNELS) -> tuple:
+        """ Returns the key identifying the state of the given channels """
+        return tuple(stamps[channel] for channel in channels)
+
+    @classmethod
+    def notify(cls, stamps: dict[str, int], *channels):
+        """ Notify the changes of a network on the given channels """
+        stamp = cls.new_stamp()
+        for channel in (channels or cls.CHANNELS):
+            stamps[channel] = stamp
+
+    @classmethod
+    def notify_entity_change(cls, entity, channel: str):
+        """ Notify the change of an entity to the networks it is registered with """
+        stamp = cls.new_stamp()
+        entity.__dict__["_stamp"] = stamp
+        for stamps in entity.__dict__.get("_owner_stamps", ()):
+            stamps[channel] = stamp
+
+    @classmethod
+    def get_entity_stamp(cls, entity) -> int:
+        """ Returns the stamp of the last change of an entity """
+        return entity.__dict__.get("_stamp", 0)
+
+    @classmethod
+    def register(cls, entity, stamps: dict[str, int]):
+        """ Register an entity with the stamps of a network """
+        owners = entity.__dict__.get("_owner_stamps", ())
+        for owner in owners:
+            if owner is stamps:
+                return
+        entity.__dict__["_owner_stamps"] = (*owners, stamps)
+
+    @classmethod
+    def register_reaction(cls, rxn, stamps: dict[str, int]):
+        """ Register a reaction, its reaction compounds and their compounds with the stamps of a network """
+        cls.register(rxn, stamps)
+        for reaction_compounds in (rxn.substrates, rxn.products):
+            for reaction_compound in reaction_compounds.values():
+                cls.register(reaction_compound, stamps)
+                cls.register(reaction_compound.compound, stamps)
+
+    @classmethod
+    def get_owner_stamps(cls, entity) -> tuple:
+        """ Returns the stamps of the networks an entity is registered with """
+        return entity.__dict__.get("_owner_stamps", ())
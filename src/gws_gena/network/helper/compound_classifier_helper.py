@@ -0,0 +1,56 @@
+
+from typing import Iterable
+
+from gws_biota import Cofactor as BiotaCofactor
+from gws_biota import Residue as BiotaResidue
+
+
+class CompoundClassifierHelper:
+    """
+    CompoundClassifierHelper
+
+    Classifies the compounds as cofactors or residues. The cofactor classification is computed once
+    per (chebi_id, name) and the residue classification once per name; the results are cached in the process.
+    """
+
+    _cofactor_cache: dict[tuple[str, str], bool] = {}
+    _residue_cache: dict[str, bool] = {}
+
+    @classmethod
+    def is_cofactor(cls, chebi_id: str, name: str) -> bool:
+        """ Test if a compound is a cofactor """
+        key = (chebi_id, name)
+        is_cofactor = cls._cofactor_cache.get(key)
+        if is_cofactor is None:
+            is_cofactor = bool(BiotaCofactor.is_cofactor(chebi_id, name=name, use_name_pattern=True))
+            cls._cofactor_cache[key] = is_cofactor
+        return is_cofactor
+
+    @classmethod
+    def is_residue(cls, name: str) -> bool:
+        """ Test if a compound is a residue """
+        is_residue = cls._residue_cache.get(name)
+        if is_residue is None:
+            is_residue = bool(BiotaResidue.is_residue(name=name))
+            cls._residue_cache[name] = is_residue
+        return is_residue
+
+    @classmethod
+    def classify_compounds(cls, compounds: Iterable['Compound']):
+        """
+        Classify a set of compounds (e.g. all the compounds of a network)
+
+        The classification is stored on each compound, the compounds are not modified otherwise.
+
+        :param compounds: The compounds to classify
+        :type compounds: `Iterable[Compound]`
+        """
+
+        for comp in compounds:
+            comp.get_type()
+
+    @classmethod
+    def clear_cache(cls):
+        """ Clear the cache of the classifications """
+        cls._cofactor_cache = {}
+        cls._residue_cache = {}
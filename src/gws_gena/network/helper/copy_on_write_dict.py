@@ -0,0 +1,150 @@
+
+from collections.abc import MutableMapping
+from typing import Any, Callable, Iterator
+
+
+def copy_value(value: Any) -> Any:
+    """ Default copy function of the `CopyOnWriteDict` values """
+    return value.copy()
+
+
+class CopyOnWriteDict(MutableMapping):
+    """
+    CopyOnWriteDict class
+
+    Dictionary whose values are shared with its copies until they are accessed for writing.
+    The values are stored in a read-only `base` dictionary shared by all the copies. Each dictionary
+    creates a private copy of a value (using its copy function) the first time it is accessed through
+    the mapping interface (`[]`, `get`, `values`, `items`, ...) because the caller may then mutate it.
+    Read-only traversals must use `peek`, `peek_values` and `peek_items`, which never copy.
+
+    Keys keep their insertion order, like a regular `dict`.
+    """
+
+    _base: dict = None
+    _own: dict = None
+    _appended: dict = None
+    _hidden: set = None
+    _copy_value: Callable = None
+
+    def __init__(self, base: dict = None, copy_value_fn: Callable = copy_value):
+        # the base dictionary is never modified, it may be shared with other copies
+        self._base = base if base is not None else {}
+        # private copies of base values (same key order as in base)
+        self._own = {}
+        # keys added after the creation of the base (appended at the end)
+        self._appended = {}
+        # keys of the base that were removed (or re-added and moved to `_appended`)
+        self._hidden = set()
+        self._copy_value = copy_value_fn
+
+    def __getitem__(self, key):
+        if key in self._appended:
+            return self._appended[key]
+        if key in self._own:
+            return self._own[key]
+        if key in self._base and key not in self._hidden:
+            value = self._copy_value(self._base[key])
+            self._own[key] = value
+            return value
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._appended:
+            self._appended[key] = value
+        elif key in self._base and key not in self._hidden:
+            self._own[key] = value
+        else:
+            self._appended[key] = value
+
+    def __delitem__(self, key):
+        if key in self._appended:
+            del self._appended[key]
+        elif key in self._base and key not in self._hidden:
+            self._hidden.add(key)
+            self._own.pop(key, None)
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        return key in self._appended or (key in self._base and key not in self._hidden)
+
+    def __iter__(self) -> Iterator:
+        if self._hidden:
+            for key in self._base:
+                if key not in self._hidden:
+                    yield key
+        else:
+            yield from self._base
+        yield from self._appended
+
+    def __len__(self) -> int:
+        return len(self._base) - len(self._hidden) + len(self._appended)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict(self.peek_items())})"
+
+    # -- C --
+
+    def copy(self, copy_value_fn: Callable = None) -> 'CopyOnWriteDict':
+        """
+        Returns a copy of the dictionary. The values are shared until they are accessed for writing.
+
+        No value is copied: the values of this dictionary are frozen in a base shared with the copy, and each
+        dictionary then copies a value on its own first write. A value referenced before the copy is shared
+        and must be accessed again through the mapping interface to be modified.
+
+        :param copy_value_fn: The copy function of the values of the new dictionary (defaults to the current one)
+        :type copy_value_fn: `Callable`
+        :rtype: `CopyOnWriteDict`
+        """
+
+        self._freeze()
+        return CopyOnWriteDict(self._base, copy_value_fn=copy_value_fn or self._copy_value)
+
+    # -- F --
+
+    def _freeze(self):
+        """ Move the values owned by this dictionary to a new base, that can be shared """
+        if not self._own and not self._appended and not self._hidden:
+            return
+        if not self._base:
+            # e.g. a loaded network, all its values were appended
+            base = self._appended
+        else:
+            base = dict(self.peek_items())
+        self._base = base
+        self._own = {}
+        self._appended = {}
+        self._hidden = set()
+
+    # -- I --
+
+    def is_materialized(self, key) -> bool:
+        """ Returns True if the value of the key is owned by this dictionary (i.e. not shared) """
+        return key in self._appended or key in self._own
+
+    # -- P --
+
+    def peek(self, key, default=None) -> Any:
+        """
+        Get a value without copying it. The returned value may be shared with other copies and must not be modified.
+        """
+
+        if key in self._appended:
+            return self._appended[key]
+        if key in self._own:
+            return self._own[key]
+        if key in self._base and key not in self._hidden:
+            return self._base[key]
+        return default
+
+    def peek_values(self) -> Iterator:
+        """ Iterate over the values without copying them. The values must not be modified. """
+        for key in self:
+            yield self.peek(key)
+
+    def peek_items(self) -> Iterator:
+        """ Iterate over the (key, value) pairs without copying the values. The values must not be modified. """
+        for key in self:
+            yield key, self.peek(key)
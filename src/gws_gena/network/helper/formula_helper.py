@@ -0,0 +1,45 @@
+
+import re
+
+_ELEMENT_PATTERN = re.compile(r"([A-Z][a-z]*)(\d+(?:\.\d+)?)?")
+
+
+class FormulaHelper:
+    """
+    FormulaHelper
+
+    Parses the chemical formulas of the compounds (e.g. `C6H12O6`). The results are cached in the process.
+    """
+
+    _cache: dict[str, dict[str, float]] = {}
+
+    @classmethod
+    def parse(cls, formula: str) -> dict[str, float] | None:
+        """
+        Parse a chemical formula
+
+        :param formula: The formula
+        :type formula: `str`
+        :return: The number of atoms of each element, `None` if the formula is empty or cannot be parsed
+        (e.g. formulas with groups or generic R groups are not supported)
+        :rtype: `dict[str, float]`
+        """
+
+        if not isinstance(formula, str) or not formula:
+            return None
+        if formula in cls._cache:
+            return cls._cache[formula]
+
+        elements = {}
+        position = 0
+        for match in _ELEMENT_PATTERN.finditer(formula):
+            if match.start() != position:
+                break
+            element, count = match.groups()
+            elements[element] = elements.get(element, 0.0) + (float(count) if count else 1.0)
+            position = match.end()
+        if position != len(formula) or "R" in elements:
+            elements = None
+
+        cls._cache[formula] = elements
+        return elements
@@ -0,0 +1,49 @@
+
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class LRUCache:
+    """
+    LRUCache class
+
+    Bounded cache that evicts the least recently used entries. `None` values are cached like the other values
+    (e.g. to remember that an entity does not exist); use `in` to test if a key is cached.
+    """
+
+    max_size: int = None
+    _data: OrderedDict = None
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._data = OrderedDict()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    # -- C --
+
+    def clear(self):
+        """ Remove all the entries """
+        self._data.clear()
+
+    # -- G --
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """ Get a value and mark it as recently used """
+        if key not in self._data:
+            return default
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    # -- S --
+
+    def set(self, key: Hashable, value: Any):
+        """ Set a value, the least recently used entries are evicted if the cache is full """
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
@@ -0,0 +1,224 @@
+from typing import TypedDict
+
+from gws_core import BadRequestException
+
+from ...helper.base_helper import BaseHelper
+from ..compound.compound import Compound
+from ..network import Network
+from ..network_data.helper.network_data_loader_helper import NetworkDataLoaderHelper
+from ..reaction.reaction import Reaction
+
+
+class NetworkMergemTranslationDict(TypedDict):
+    compound_ids: dict[str, str]
+    reaction_ids: dict[str, str]
+
+
+class NetworkMergemHelper(BaseHelper):
+    """
+    NetworkMergemHelper
+
+    Merges two networks in memory, like mergem does (see `NetworkMergem`), without exporting the networks:
+    * the compounds of the second network are matched with the compounds of the first network by chebi id (and
+    alternative chebi ids) in the same compartment, then by id,
+    * the reactions of the second network are translated with the compound id translation table and matched with
+    the reactions of the first network by hash-join on their compounds (and their stoichiometry if
+    `exact_stoichiometry` is True). The protons are ignored unless `use_proton` is True,
+    * the objective (biomass reaction) is taken from the first network, the second network or merged in a new
+    `merged-objectives` reaction.
+
+    The id translation tables of the second network are available in `translation` after the merge.
+    """
+
+    KEEP_OBJECTIVE_MERGE = "merge"
+    KEEP_OBJECTIVE_1 = "1"
+    KEEP_OBJECTIVE_2 = "2"
+    PROTON_CHEBI_IDS = frozenset(["CHEBI:15378", "CHEBI:24636", "CHEBI:49637"])
+    PROTON_NAMES = frozenset(["h+", "h", "proton", "hydron"])
+    MERGED_OBJECTIVE_ID = "merged-objectives"
+
+    translation: NetworkMergemTranslationDict = None
+
+    # -- C --
+
+    def _create_reaction_key(self, rxn: Reaction, compound_ids: dict[str, str], exact_stoichiometry: bool,
+                             use_proton: bool) -> tuple:
+        sides = []
+        for reaction_compounds in (rxn.substrates, rxn.products):
+            side = {}
+            for comp_id, reaction_compound in reaction_compounds.items():
+                if not use_proton and self.is_proton(reaction_compound.compound):
+                    continue
+                side[compound_ids.get(comp_id, comp_id)] = reaction_compound.stoich
+            if exact_stoichiometry:
+                sides.append(tuple(sorted(side.items())))
+            else:
+                sides.append(tuple(sorted(side)))
+        # the reactions written the other way round are the same reactions
+        return tuple(sorted(sides))
+
+    # -- G --
+
+    @staticmethod
+    def _get_objective_reaction(network: Network) -> Reaction:
+        """ Get the biomass reaction, or the first reaction named biomass (like `NetworkImporter` infers it) """
+        rxn = network.get_biomass_reaction()
+        if rxn is not None:
+            return rxn
+        for rxn in network.reactions.peek_values():
+            if "biomass" in rxn.id.lower():
+                return rxn
+        return None
+
+    # -- I --
+
+    @classmethod
+    def is_proton(cls, comp: Compound) -> bool:
+        """ Return True if the compound is a proton """
+        if comp.chebi_id in cls.PROTON_CHEBI_IDS:
+            return True
+        return (comp.name or "").lower() in cls.PROTON_NAMES
+
+    # -- M --
+
+    def merge(self, network_1: Network, network_2: Network, keep_objective: str = KEEP_OBJECTIVE_MERGE,
+              exact_stoichiometry: bool = False, use_proton: bool = False, add_biomass: bool = False,
+              biomass_metabolite_id_user: str = None) -> Network:
+        """
+        Merge two networks. The input networks are not modified.
+
+        :param network_1: The first network
+        :type network_1: `Network`
+        :param network_2: The second network
+        :type network_2: `Network`
+        :param keep_objective: `merge` to merge the objectives, `1` (resp. `2`) to keep the objective of the first
+        (resp. second) network
+        :type keep_objective: `str`
+        :param exact_stoichiometry: If True, the reactions are matched with their stoichiometry
+        :type exact_stoichiometry: `bool`
+        :param use_proton: If True, the protons are considered when matching the reactions
+        :type use_proton: `bool`
+        :param add_biomass: Add the biomass compound if it does not exist (see `NetworkImporter`)
+        :type add_biomass: `bool`
+        :param biomass_metabolite_id_user: The id of the biomass compound to check (see `NetworkImporter`)
+        :type biomass_metabolite_id_user: `str`
+        :return: The merged network
+        :rtype: `Network`
+        """
+
+        if keep_objective not in (self.KEEP_OBJECTIVE_MERGE, self.KEEP_OBJECTIVE_1, self.KEEP_OBJECTIVE_2):
+            raise BadRequestException(f"Invalid keep_objective value '{keep_objective}'")
+
+        merged = network_1.copy()
+        merged.network_data.name = "Merged_model"
+        merged.name = merged.network_data.name
+        compound_ids = self._merge_compounds(merged, network_2)
+
+        objective_1 = self._get_objective_reaction(merged)
+        objective_2 = self._get_objective_reaction(network_2)
+
+        # hash-join on the reaction keys (the objectives are merged apart)
+        reaction_keys = {}
+        for rxn in merged.reactions.peek_values():
+            if objective_1 is None or rxn.id != objective_1.id:
+                key = self._create_reaction_key(rxn, {}, exact_stoichiometry, use_proton)
+                reaction_keys.setdefault(key, rxn.id)
+
+        reaction_ids = {}
+        nb_matched = 0
+        for rxn in network_2.reactions.peek_values():
+            if objective_2 is not None and rxn.id == objective_2.id:
+                continue
+            key = self._create_reaction_key(rxn, compound_ids, exact_stoichiometry, use_proton)
+            if key in reaction_keys:
+                reaction_ids[rxn.id] = reaction_keys[key]
+                nb_matched += 1
+                continue
+            new_rxn = self._translate_reaction(rxn, merged, compound_ids)
+            merged.add_reaction(new_rxn)
+            reaction_keys[key] = new_rxn.id
+            reaction_ids[rxn.id] = new_rxn.id
+
+        # objective
+        if objective_2 is not None:
+            if keep_objective == self.KEEP_OBJECTIVE_1 and objective_1 is not None:
+                reaction_ids[objective_2.id] = objective_1.id
+            elif keep_objective == self.KEEP_OBJECTIVE_MERGE and objective_1 is not None:
+                objective_comp_ids = {comp_id: comp_id for comp_id in (*objective_1.substrates, *objective_1.products)}
+                new_rxn = self._translate_reaction(
+                    objective_1, merged, objective_comp_ids, rxn_id=self.MERGED_OBJECTIVE_ID)
+                new_rxn.name = self.MERGED_OBJECTIVE_ID
+                self._merge_objective_reactions(merged, new_rxn, objective_2, compound_ids)
+                merged.remove_reaction(objective_1.id)
+                merged.add_reaction(new_rxn)
+                reaction_ids[objective_2.id] = new_rxn.id
+            else:
+                if objective_1 is not None:
+                    merged.remove_reaction(objective_1.id)
+                new_rxn = self._translate_reaction(objective_2, merged, compound_ids)
+                merged.add_reaction(new_rxn)
+                reaction_ids[objective_2.id] = new_rxn.id
+
+        self.translation = NetworkMergemTranslationDict(compound_ids=compound_ids, reaction_ids=reaction_ids)
+        self.log_info_message(
+            f"{nb_matched} reaction(s) of the second network matched, "
+            f"{len(merged.reactions) - len(network_1.reactions)} reaction(s) added")
+
+        NetworkDataLoaderHelper().finalize_loads(
+            merged.network_data, biomass_metabolite_id_user=biomass_metabolite_id_user, add_biomass=add_biomass)
+        return merged
+
+    @staticmethod
+    def _merge_objective_reactions(merged: Network, objective: Reaction, other_objective: Reaction,
+                                   compound_ids: dict[str, str]):
+        """ Add the compounds of another objective reaction that are not in an objective reaction """
+        for comp_id, substrate in other_objective.substrates.items():
+            comp = merged.compounds[compound_ids[comp_id]]
+            if comp.id not in objective.substrates and comp.id not in objective.products:
+                objective.add_substrate(comp, substrate.stoich)
+        for comp_id, product in other_objective.products.items():
+            comp = merged.compounds[compound_ids[comp_id]]
+            if comp.id not in objective.substrates and comp.id not in objective.products:
+                objective.add_product(comp, product.stoich)
+
+    @staticmethod
+    def _merge_compounds(merged: Network, network: Network) -> dict[str, str]:
+        """ Add the compounds of a network that are not in the merged network, return the id translation table """
+        compound_ids = {}
+        for comp in network.compounds.peek_values():
+            matches = []
+            for chebi_id in (comp.chebi_id, *comp.alt_chebi_ids):
+                if chebi_id:
+                    matches = merged.get_compounds_by_chebi_id(chebi_id, comp.compartment.go_id)
+                    if matches:
+                        break
+            if matches:
+                compound_ids[comp.id] = matches[0].id
+            elif comp.id in merged.compounds:
+                compound_ids[comp.id] = comp.id
+            else:
+                merged.add_compound(comp.copy())
+                compound_ids[comp.id] = comp.id
+        return compound_ids
+
+    # -- T --
+
+    @staticmethod
+    def _translate_reaction(rxn: Reaction, merged: Network, compound_ids: dict[str, str],
+                            rxn_id: str = None) -> Reaction:
+        """ Copy a reaction with the compounds of the merged network """
+        new_rxn = rxn.copy()
+        new_rxn.substrates = {}
+        new_rxn.products = {}
+        if rxn_id is not None:
+            new_rxn.id = rxn_id
+        elif new_rxn.id in merged.reactions:
+            suffix = 2
+            while f"{rxn.id}_{suffix}" in merged.reactions:
+                suffix += 1
+            new_rxn.id = f"{rxn.id}_{suffix}"
+        for comp_id, substrate in rxn.substrates.items():
+            new_rxn.add_substrate(merged.compounds[compound_ids[comp_id]], substrate.stoich, update_if_exists=True)
+        for comp_id, product in rxn.products.items():
+            new_rxn.add_product(merged.compounds[compound_ids[comp_id]], product.stoich, update_if_exists=True)
+        return new_rxn
@@ -1,12 +1,21 @@
+from gws_core import BadRequestException
 
 from ...helper.base_helper import BaseHelper
 from ..network import Network
 
 
 class NetworkMergerHelper(BaseHelper):
-    """ NetworkMergerHelper """
+    """
+    NetworkMergerHelper
 
-    def merge(self, destination_network: Network, source_network: Network, inplace=False):
+    Merges networks by hash-join: a reaction of a source network is added to the destination network unless a
+    reaction with the same id or, if `skip_duplicates` is True, with the same signature (see
+    `Reaction.get_signature`) already exists (see `NetworkData.reaction_exists`). The lookups use the indexes of
+    the destination network, which are maintained while the reactions are added, so merging networks is linear in
+    their number of reactions.
+    """
+
+    def merge(self, destination_network: Network, source_network: Network, inplace=False, skip_duplicates=False):
         """
         Merge two networks
         The input destination_network is augmented after merge
@@ -15,10 +24,44 @@ class NetworkMergerHelper(BaseHelper):
         if not inplace:
             destination_network = destination_network.copy()
 
-        for rxn in source_network.reactions.values():
-            if not destination_network.reaction_exists(rxn):
-                destination_network.add_reaction(rxn)
-            # else:
-            #     self.log_info_message(f"Reaction {rxn.id} is ignored. It already exists.")
+        nb_ignored = self._merge_into(destination_network, source_network, skip_duplicates=skip_duplicates)
+        if nb_ignored:
+            self.log_info_message(f"{nb_ignored} reaction(s) ignored, they already exist")
+
+        return destination_network
+
+    def merge_all(self, networks: list[Network], skip_duplicates=False) -> Network:
+        """
+        Merge a list of networks in one pass. The networks are merged in their order, into a copy of the first
+        network.
+
+        :param networks: The networks to merge
+        :type networks: `list[Network]`
+        :param skip_duplicates: If True, the reactions with the same signature as a reaction already merged are
+        ignored (Defaults to False, only the reactions with the same id are ignored)
+        :type skip_duplicates: `bool`
+        :return: The merged network
+        :rtype: `Network`
+        """
+
+        if not networks:
+            raise BadRequestException("No networks to merge")
+
+        destination_network = networks[0].copy()
+        nb_ignored = 0
+        for source_network in networks[1:]:
+            nb_ignored += self._merge_into(destination_network, source_network, skip_duplicates=skip_duplicates)
+        if nb_ignored:
+            self.log_info_message(f"{nb_ignored} reaction(s) ignored, they already exist")
 
         return destination_network
+
+    @staticmethod
+    def _merge_into(destination_network: Network, source_network: Network, skip_duplicates=False) -> int:
+        nb_ignored = 0
+        for rxn in source_network.reactions.values():
+            if destination_network.reaction_exists(rxn, check_signature=skip_duplicates):
+                nb_ignored += 1
+                continue
+            destination_network.add_reaction(rxn)
+        return nb_ignored
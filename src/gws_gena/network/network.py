@@ -15,6 +15,7 @@ from pandas import DataFrame
 
 from .compartment.compartment import Compartment
 from .compound.compound import Compound
+from .network_data.network_core import NetworkCore
 from .network_data.network_data import NetworkData
 from .reaction.reaction import Reaction
 from .typing.network_typing import NetworkDict
@@ -95,12 +96,22 @@ class Network(Resource):
         return self.network_data.compounds
 
     def copy(self) -> 'Network':
-        """ Returns a deep copy """
+        """ Returns a copy. Compounds and reactions are copied on write (see `NetworkData.copy`) """
         net = Network()
         net.name = self.name
         net.network_data = self.network_data.copy()
         return net
 
+    def compute_mass_and_charge_balance(self) -> DataFrame:
+        """
+        Compute the mass, charge and element balances of all the reactions of the network
+
+        :return: The balances (rows: reactions, columns: `mass`, `charge` and one column per element)
+        :rtype: `DataFrame`
+        """
+
+        return self.network_data.compute_mass_and_charge_balance()
+
     def create_stoichiometric_matrix(self) -> DataFrame:
         """
         Create the full stoichiometric matrix of the network
@@ -171,17 +182,20 @@ class Network(Resource):
 
         return self.network_data.compound_exists(comp)
 
-    def reaction_exists(self, rxn: Reaction) -> bool:
+    def reaction_exists(self, rxn: Reaction, check_signature: bool = False) -> bool:
         """
         Check that a reaction exists in the network
 
         :param rxn: The reaction
         :type rxn: `gws.gena.Reaction`
+        :param check_signature: If True, the reaction also exists if a reaction with the same signature (i.e. a
+        duplicate with another id, see `Reaction.get_signature`) exists
+        :type check_signature: `bool`
         :return: True if the reaction exists, False otherwise
         :rtype: `bool`
         """
 
-        return self.network_data.reaction_exists(rxn)
+        return self.network_data.reaction_exists(rxn, check_signature=check_signature)
 
     # -- E --
 
@@ -311,6 +325,19 @@ class Network(Resource):
 
         return self.network_data.get_compounds_by_compartments(compartment_list)
 
+    def get_duplicate_reaction_ids(self, rxn: Reaction) -> list[str]:
+        """
+        Get the ids of the reactions of the network that have the same signature as a reaction (see
+        `Reaction.get_signature`)
+
+        :param rxn: The reaction
+        :type rxn: `gws.gena.Reaction`
+        :return: The ids of the duplicate reactions (including the reaction if it is in the network)
+        :rtype: `list[str]`
+        """
+
+        return self.network_data.get_duplicate_reaction_ids(rxn)
+
     def get_steady_compounds(self, ignore_cofactors=False) -> dict[str, Compound]:
         """
         Get the steady compounds
@@ -331,6 +358,16 @@ class Network(Resource):
 
         return self.network_data.get_non_steady_compounds(ignore_cofactors)
 
+    def get_core(self) -> NetworkCore:
+        """
+        Get the compact core of the network, i.e. a read-only and array-based view derived from the network
+
+        :return: The core
+        :rtype: `NetworkCore`
+        """
+
+        return self.network_data.get_core()
+
     def get_reaction_bounds(self) -> DataFrame:
         """
         Get the reaction bounds `[lb, ub]`
@@ -412,15 +449,45 @@ class Network(Resource):
         network.name = network.network_data.name
         return network
 
+    @classmethod
+    def loads_file(cls, file_path: str, biomass_reaction_id: str = None,
+                   skip_orphans: bool = False,
+                   replace_unknown_compartments: bool = False,
+                   biomass_metabolite_id_user: str = None,
+                   add_biomass: bool = False,
+                   message_dispatcher=None) -> 'Network':
+        """ Create a Network from a JSON network dump file. The file is read incrementally to limit the memory usage. """
+
+        network = cls()
+        network.network_data = NetworkData.loads_file(
+            file_path,
+            biomass_reaction_id=biomass_reaction_id,
+            skip_orphans=skip_orphans,
+            replace_unknown_compartments=replace_unknown_compartments,
+            biomass_metabolite_id_user=biomass_metabolite_id_user,
+            add_biomass=add_biomass,
+            message_dispatcher=message_dispatcher
+        )
+        network.name = network.network_data.name
+        return network
+
     # -- N --
 
     # -- M --
 
-    def merge(self, network: 'Network', inplace=False):
+    def merge(self, network: 'Network', inplace=False, skip_duplicates=False):
         """ Merge with another network """
         from .helper.network_merger import NetworkMergerHelper
         merger_helper = NetworkMergerHelper()
-        return merger_helper.merge(destination_network=self, source_network=network, inplace=inplace)
+        return merger_helper.merge(
+            destination_network=self, source_network=network, inplace=inplace, skip_duplicates=skip_duplicates)
+
+    @classmethod
+    def merge_all(cls, networks: list['Network'], skip_duplicates=False) -> 'Network':
+        """ Merge a list of networks in one pass, into a new network """
+        from .helper.network_merger import NetworkMergerHelper
+        merger_helper = NetworkMergerHelper()
+        return merger_helper.merge_all(networks, skip_duplicates=skip_duplicates)
     # -- P --
 
     # -- R --
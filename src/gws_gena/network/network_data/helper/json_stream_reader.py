@@ -0,0 +1,180 @@
+
+import codecs
+import json
+import os
+from typing import Any, Callable, Iterator
+
+from gws_core import BadRequestException
+
+
+class JSONStreamReader:
+    """
+    JSONStreamReader
+
+    Reads a JSON file whose root is an object, without loading the whole file in memory.
+    The file is read by chunks. The members of the root object are decoded one by one and the arrays of
+    the streamed members are decoded item by item.
+    """
+
+    CHUNK_SIZE = 1 << 20
+    _WHITESPACES = " \t\n\r"
+
+    file_path: str = None
+    bytes_read: int = 0
+    total_bytes: int = 0
+
+    _fp = None
+    _decoder: json.JSONDecoder = None
+    _text_decoder = None
+    _buffer: str = ""
+    _pos: int = 0
+    _eof: bool = False
+    _chunk_size: int = CHUNK_SIZE
+    _progress_fn: Callable = None
+
+    def __init__(self, file_path: str, chunk_size: int = CHUNK_SIZE, progress_fn: Callable = None):
+        """
+        :param file_path: The path of the JSON file
+        :type file_path: `str`
+        :param chunk_size: The number of bytes read at once
+        :type chunk_size: `int`
+        :param progress_fn: Function called with `(bytes_read, total_bytes)` each time a chunk is read
+        :type progress_fn: `Callable`
+        """
+
+        self.file_path = file_path
+        self.total_bytes = os.path.getsize(file_path)
+        self._chunk_size = chunk_size
+        self._progress_fn = progress_fn
+        self._decoder = json.JSONDecoder()
+
+    # -- D --
+
+    def _decode(self) -> Any:
+        """ Decode the next value. The buffer is extended until the value is complete. """
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as err:
+                if self._eof:
+                    self._raise_error(str(err))
+                self._fill()
+                continue
+            if end == len(self._buffer) and not self._eof:
+                # a number or a literal may be truncated by the end of the chunk
+                self._fill()
+                continue
+            self._pos = end
+            return value
+
+    # -- E --
+
+    def _expect(self, char: str):
+        found = self._next()
+        if found != char:
+            self._raise_error(f"'{char}' expected, '{found}' found")
+
+    # -- F --
+
+    def _fill(self):
+        """ Read the next chunk. The consumed part of the buffer is dropped. """
+        chunk = self._fp.read(self._chunk_size)
+        self.bytes_read += len(chunk)
+        self._eof = len(chunk) == 0
+        self._buffer = self._buffer[self._pos:] + self._text_decoder.decode(chunk, final=self._eof)
+        self._pos = 0
+        if self._progress_fn is not None and not self._eof:
+            self._progress_fn(self.bytes_read, self.total_bytes)
+
+    # -- I --
+
+    def iter_members(self, keys: set[str] = None, stream_keys: set[str] = None) -> Iterator[tuple[str, Any]]:
+        """
+        Iterate over the members of the root object, in the order of the file.
+
+        The values of the `stream_keys` members that are arrays are returned as iterators over their items.
+        Such an iterator must be consumed before moving to the next member (the remaining items are skipped).
+
+        :param keys: The keys of the members to return. The other members are skipped. All the members are
+        returned if `None`.
+        :type keys: `set[str]`
+        :param stream_keys: The keys of the members to stream
+        :type stream_keys: `set[str]`
+        :return: The iterator over the `(key, value)` pairs
+        :rtype: `Iterator[tuple[str, Any]]`
+        """
+
+        stream_keys = stream_keys or set()
+        with open(self.file_path, "rb") as fp:
+            self._fp = fp
+            self._text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+            self._buffer = ""
+            self._pos = 0
+            self._eof = False
+            self.bytes_read = 0
+            try:
+                self._expect("{")
+                if self._peek() == "}":
+                    return
+                while True:
+                    key = self._decode()
+                    self._expect(":")
+                    if self._peek() == "[" and (key in stream_keys or (keys is not None and key not in keys)):
+                        items = self._iter_array()
+                        if keys is None or key in keys:
+                            yield key, items
+                        # skip the remaining items
+                        for _ in items:
+                            pass
+                    elif keys is None or key in keys:
+                        yield key, self._decode()
+                    else:
+                        self._decode()
+
+                    char = self._next()
+                    if char == "}":
+                        break
+                    if char != ",":
+                        self._raise_error(f"',' or '}}' expected, '{char}' found")
+            finally:
+                self._fp = None
+                self._buffer = ""
+
+    def _iter_array(self) -> Iterator[Any]:
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._decode()
+            char = self._next()
+            if char == "]":
+                return
+            if char != ",":
+                self._raise_error(f"',' or ']' expected, '{char}' found")
+
+    # -- N --
+
+    def _next(self) -> str:
+        char = self._peek()
+        self._pos += 1
+        return char
+
+    # -- P --
+
+    def _peek(self) -> str:
+        """ Skip the whitespaces and return the next character ('' at the end of the file) """
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in self._WHITESPACES:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if self._eof:
+                return ""
+            self._fill()
+
+    # -- R --
+
+    def _raise_error(self, message: str):
+        raise BadRequestException(f"Cannot read JSON file {self.file_path}: {message}")
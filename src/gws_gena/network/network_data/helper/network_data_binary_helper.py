@@ -0,0 +1,276 @@
+
+import json
+import struct
+import zipfile
+
+import numpy as np
+from gws_core import BadRequestException
+from scipy.sparse import csr_matrix
+
+from ....helper.base_helper import BaseHelper
+from ...typing.network_typing import NetworkDict
+
+
+class NetworkDataBinaryHelper(BaseHelper):
+    """
+    NetworkDataBinaryHelper
+
+    Writes and reads the network dumps in a compact binary format (npz archive):
+    * the compounds and the reactions are stored as columnar tables, i.e. one array per attribute (the strings
+    are stored as a utf-8 buffer, an array of offsets and a null mask),
+    * the stoichiometry is stored as a CSR matrix (reactions x compounds),
+    * the free-form data (compartments, simulations, recon tags and the other fields of the compounds and reactions,
+    e.g. layouts, enzymes, alternative chebi ids) are stored as JSON.
+
+    The dump is lossless: the dump read from a file is equal to the dump written in it.
+
+    The members of uncompressed archives can be memory-mapped.
+    """
+
+    FORMAT_VERSION = 2
+    METADATA_KEY = "metadata"
+    COMPOUND_STR_COLUMNS = ("id", "name", "formula", "inchi", "compartment", "chebi_id", "kegg_id")
+    COMPOUND_FLOAT_COLUMNS = ("charge", "mass", "monoisotopic_mass")
+    REACTION_STR_COLUMNS = ("id", "name", "rhea_id", "gene_reaction_rule")
+    REACTION_FLOAT_COLUMNS = ("lower_bound", "upper_bound")
+
+    # -- A --
+
+    @staticmethod
+    def _add_str_column(arrays, name: str, values: list):
+        encoded = [(val if isinstance(val, str) else ("" if val is None else str(val))).encode("utf-8")
+                   for val in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(val) for val in encoded])
+        arrays[name + ".data"] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        arrays[name + ".offsets"] = offsets
+        arrays[name + ".is_null"] = np.array([val is None for val in values], dtype=bool)
+
+    @staticmethod
+    def _add_float_column(arrays, name: str, values: list):
+        column = np.full(len(values), np.nan)
+        for i, val in enumerate(values):
+            try:
+                column[i] = float(val)
+            except (TypeError, ValueError):
+                pass
+        arrays[name] = column
+
+    # -- D --
+
+    def dump(self, data: NetworkDict, file_path: str, compress: bool = False):
+        """
+        Write a network dump in a binary file
+
+        :param data: The network dump (see `NetworkData.dumps`)
+        :type data: `NetworkDict`
+        :param file_path: The path of the file
+        :type file_path: `str`
+        :param compress: True to compress the file. Compressed files cannot be memory-mapped.
+        :type compress: `bool`
+        """
+
+        arrays = {}
+        compounds = data.get("metabolites") or data.get("compounds") or []
+        reactions = data.get("reactions") or []
+
+        for column in self.COMPOUND_STR_COLUMNS:
+            self._add_str_column(arrays, "compounds." + column, [comp.get(column) for comp in compounds])
+        for column in self.COMPOUND_FLOAT_COLUMNS:
+            self._add_float_column(arrays, "compounds." + column, [comp.get(column) for comp in compounds])
+        for column in self.REACTION_STR_COLUMNS:
+            self._add_str_column(arrays, "reactions." + column, [rxn.get(column) for rxn in reactions])
+        for column in self.REACTION_FLOAT_COLUMNS:
+            self._add_float_column(arrays, "reactions." + column, [rxn.get(column) for rxn in reactions])
+
+        # stoichiometry (the compounds that are only used by the reactions are appended to the compound ids)
+        comp_ids = [comp["id"] for comp in compounds]
+        comp_index = {comp_id: i for i, comp_id in enumerate(comp_ids)}
+        indptr = [0]
+        indices = []
+        stoichs = []
+        for rxn in reactions:
+            for comp_id, stoich in (rxn.get("metabolites") or rxn.get("compounds") or {}).items():
+                if isinstance(stoich, dict):
+                    stoich = stoich.get("stoich")
+                if comp_id not in comp_index:
+                    comp_index[comp_id] = len(comp_ids)
+                    comp_ids.append(comp_id)
+                indices.append(comp_index[comp_id])
+                stoichs.append(float(stoich))
+            indptr.append(len(indices))
+        self._add_str_column(arrays, "stoichiometry.compound_ids", comp_ids)
+        arrays["stoichiometry.indptr"] = np.array(indptr, dtype=np.int64)
+        arrays["stoichiometry.indices"] = np.array(indices, dtype=np.int64)
+        arrays["stoichiometry.data"] = np.array(stoichs, dtype=np.float64)
+
+        metadata = {
+            "format_version": self.FORMAT_VERSION,
+            "name": data.get("name"),
+            "compartments": data.get("compartments"),
+            "simulations": data.get("simulations", []),
+            "recon_tags": data.get("recon_tags", {}),
+            "compound_fields": [self._get_other_fields(comp, self.COMPOUND_STR_COLUMNS + self.COMPOUND_FLOAT_COLUMNS)
+                                for comp in compounds],
+            "reaction_fields": [self._get_other_fields(rxn, self.REACTION_STR_COLUMNS + self.REACTION_FLOAT_COLUMNS)
+                                for rxn in reactions],
+        }
+        arrays[self.METADATA_KEY] = np.frombuffer(json.dumps(metadata).encode("utf-8"), dtype=np.uint8)
+
+        with open(file_path, "wb") as fp:
+            if compress:
+                np.savez_compressed(fp, **arrays)
+            else:
+                np.savez(fp, **arrays)
+
+    # -- G --
+
+    def get_metadata(self, arrays: dict[str, np.ndarray]) -> dict:
+        """ Get the free-form data of the network from the arrays of a binary file """
+        metadata = json.loads(np.asarray(arrays[self.METADATA_KEY]).tobytes().decode("utf-8"))
+        if metadata.get("format_version", 0) != self.FORMAT_VERSION:
+            raise BadRequestException(
+                f"Unsupported binary network format version {metadata.get('format_version')}")
+        return metadata
+
+    def get_stoichiometric_matrix(self, arrays: dict[str, np.ndarray]) -> tuple[csr_matrix, list[str], list[str]]:
+        """
+        Get the stoichiometric matrix from the arrays of a binary file, without creating the network
+
+        :return: The stoichiometric matrix, the ids of the compounds (rows) and the ids of the reactions (columns)
+        :rtype: `tuple[csr_matrix, list[str], list[str]]`
+        """
+
+        comp_ids = self._read_str_column(arrays, "stoichiometry.compound_ids")
+        rxn_ids = self._read_str_column(arrays, "reactions.id")
+        S = csr_matrix(
+            (arrays["stoichiometry.data"], arrays["stoichiometry.indices"], arrays["stoichiometry.indptr"]),
+            shape=(len(rxn_ids), len(comp_ids))
+        )
+        return S.transpose().tocsr(), comp_ids, rxn_ids
+
+    @staticmethod
+    def _get_other_fields(row: dict, columns: tuple) -> dict:
+        """ Get the fields of a compound or a reaction that are not stored in columns """
+        return {key: val for key, val in row.items() if key not in columns and key not in ("metabolites", "compounds")}
+
+    def get_str_column(self, arrays: dict[str, np.ndarray], name: str) -> list[str]:
+        """ Get a column of strings (e.g. `compounds.chebi_id`) from the arrays of a binary file (None if null) """
+        return self._read_str_column(arrays, name)
+
+    # -- L --
+
+    def load(self, file_path: str, mmap_mode: str = None) -> NetworkDict:
+        """
+        Read a network dump from a binary file
+
+        :param file_path: The path of the file
+        :type file_path: `str`
+        :param mmap_mode: The memory-map mode of the arrays (e.g. 'r'), see `load_arrays`
+        :type mmap_mode: `str`
+        :return: The network dump, which can be loaded with `NetworkData.loads`
+        :rtype: `NetworkDict`
+        """
+
+        arrays = self.load_arrays(file_path, mmap_mode=mmap_mode)
+        metadata = self.get_metadata(arrays)
+
+        compounds = self._read_rows(arrays, "compounds", self.COMPOUND_STR_COLUMNS, self.COMPOUND_FLOAT_COLUMNS)
+        for comp, fields in zip(compounds, metadata["compound_fields"]):
+            comp.update(fields)
+
+        reactions = self._read_rows(arrays, "reactions", self.REACTION_STR_COLUMNS, self.REACTION_FLOAT_COLUMNS)
+        comp_ids = self._read_str_column(arrays, "stoichiometry.compound_ids")
+        indptr = arrays["stoichiometry.indptr"]
+        indices = arrays["stoichiometry.indices"]
+        stoichs = arrays["stoichiometry.data"]
+        for j, rxn in enumerate(reactions):
+            start, end = int(indptr[j]), int(indptr[j + 1])
+            rxn["metabolites"] = {comp_ids[i]: float(stoich)
+                                  for i, stoich in zip(indices[start:end], stoichs[start:end])}
+            rxn.update(metadata["reaction_fields"][j])
+
+        return NetworkDict(
+            name=metadata["name"],
+            metabolites=compounds,
+            reactions=reactions,
+            compartments=metadata["compartments"],
+            simulations=metadata["simulations"],
+            recon_tags=metadata["recon_tags"]
+        )
+
+    def load_arrays(self, file_path: str, mmap_mode: str = None) -> dict[str, np.ndarray]:
+        """
+        Read the arrays of a binary file, without creating the network
+
+        :param file_path: The path of the file
+        :type file_path: `str`
+        :param mmap_mode: The memory-map mode (e.g. 'r'), see `numpy.memmap`. Only the members of uncompressed
+        files are memory-mapped, the others are read in memory.
+        :type mmap_mode: `str`
+        :return: The arrays, by name (e.g. `compounds.mass`, `stoichiometry.indptr`)
+        :rtype: `dict[str, numpy.ndarray]`
+        """
+
+        arrays = {}
+        try:
+            with zipfile.ZipFile(file_path) as zip_file:
+                for info in zip_file.infolist():
+                    name = info.filename[:-len(".npy")] if info.filename.endswith(".npy") else info.filename
+                    if mmap_mode is not None and info.compress_type == zipfile.ZIP_STORED:
+                        arrays[name] = self._memory_map_member(file_path, info, mmap_mode)
+                    else:
+                        with zip_file.open(info) as fp:
+                            arrays[name] = np.lib.format.read_array(fp, allow_pickle=False)
+        except (zipfile.BadZipFile, ValueError) as err:
+            raise BadRequestException(f"Cannot load binary network file {file_path}.") from err
+
+        if self.METADATA_KEY not in arrays:
+            raise BadRequestException(f"Invalid binary network file {file_path}. Metadata not found")
+        return arrays
+
+    # -- M --
+
+    @staticmethod
+    def _memory_map_member(file_path: str, info: zipfile.ZipInfo, mmap_mode: str) -> np.ndarray:
+        """ Memory-map an uncompressed npy member of a zip file """
+        with open(file_path, "rb") as fp:
+            # local file header: the data start after the name and the extra field
+            fp.seek(info.header_offset)
+            header = fp.read(30)
+            name_length, extra_length = struct.unpack("<HH", header[26:30])
+            fp.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(fp)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(fp)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(fp)
+            offset = fp.tell()
+
+        if dtype.hasobject:
+            raise ValueError("Object arrays are not supported")
+        if int(np.prod(shape)) == 0:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(file_path, dtype=dtype, mode=mmap_mode, offset=offset, shape=shape,
+                         order="F" if fortran_order else "C")
+
+    # -- R --
+
+    def _read_rows(self, arrays, table: str, str_columns: tuple, float_columns: tuple) -> list[dict]:
+        columns = {}
+        for column in str_columns:
+            columns[column] = self._read_str_column(arrays, table + "." + column)
+        for column in float_columns:
+            values = arrays[table + "." + column]
+            columns[column] = [None if np.isnan(val) else float(val) for val in values]
+
+        nb_rows = len(columns[str_columns[0]])
+        return [{column: values[i] for column, values in columns.items()} for i in range(nb_rows)]
+
+    @staticmethod
+    def _read_str_column(arrays, name: str) -> list[str]:
+        buffer = np.asarray(arrays[name + ".data"]).tobytes()
+        offsets = arrays[name + ".offsets"]
+        is_null = arrays[name + ".is_null"]
+        return [None if is_null[i] else buffer[offsets[i]:offsets[i + 1]].decode("utf-8")
+                for i in range(len(offsets) - 1)]
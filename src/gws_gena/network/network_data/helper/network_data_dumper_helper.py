@@ -32,7 +32,7 @@ class NetworkDataDumperHelper(BaseHelper):
                 if not comp.is_biomass():
                     comp.append_biomass_layout()
 
-        for _met in network_data.compounds.values():
+        for _met in network_data.compounds.peek_values():
             met_data.append({
                 "id": _met.id,
                 "name": _met.name,
@@ -49,7 +49,7 @@ class NetworkDataDumperHelper(BaseHelper):
                 "layout": _met.get_layout(refresh=refresh_layout),
             })
 
-        for _rxn in network_data.reactions.values():
+        for _rxn in network_data.reactions.peek_values():
             _rxn_met = {}
             for susbtrate in _rxn.substrates.values():
                 comp_id = susbtrate.compound.id
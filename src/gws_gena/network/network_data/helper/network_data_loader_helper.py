@@ -1,22 +1,25 @@
 
 import copy
 
-from gws_biota import CompoundLayout as BiotaCompoundLayout
 from gws_biota import EnzymeOrtholog as BiotaEnzymeOrtholog
 from gws_core import BadRequestException
 
 from ....helper.base_helper import BaseHelper
 from ...compartment.compartment import Compartment
+from ...helper.biota_lookup_helper import BiotaLookupHelper
+from ...helper.compound_classifier_helper import CompoundClassifierHelper
 from ...reaction.helper.reaction_biota_helper import ReactionBiotaHelper
 from ...typing.compound_typing import CompoundDict
 from ...typing.enzyme_typing import EnzymeDict
 from ...typing.reaction_typing import ReactionDict
+from .json_stream_reader import JSONStreamReader
 
 
 class NetworkDataLoaderHelper(BaseHelper):
     """ NetworkDataLoaderHelper """
 
     BIGG_REACTION_PREFIX_TO_IGNORE = ["EX_", "DM_"]
+    ENVIRONMENT_COMPARTMENT_NAME = "extracellular region (environment)"
     is_bigg_data_format = False
 
     def _convert_bigg_annotation_list_to_dict(self, annotation):
@@ -34,7 +37,6 @@ class NetworkDataLoaderHelper(BaseHelper):
 
     def _create_compounds_from_dump(
             self, net, data: 'NetworkDict', *, mapping_dict, skip_orphans):
-        from ...compound.compound import Compound
 
         added_comps = {}
         ckey = "compounds" if "compounds" in data else "metabolites"
@@ -50,74 +52,87 @@ class NetworkDataLoaderHelper(BaseHelper):
                 perc = int(100 * count/total_number_of_compounds)
                 self.log_info_message(f"... {perc}%")
 
-            # loads biota info if it exists
-            comp_id = comp_data["id"]
-            if "compounds" in mapping_dict:
-                biota_comp = mapping_dict["compounds"].get(comp_id)
-                if biota_comp is not None:
-                    for k in comp_data:
-                        if hasattr(biota_comp, k):
-                            if k != "id":
-                                comp_data[k] = getattr(biota_comp, k)
-
-            # create compartment
-            compart_id = comp_data["compartment"]
-            if compart_id == "":
-                # for some bigg models
-                # try to infer compartment from compound id
-                compart_id = comp_id.split("_")[-1]
-                compartment = Compartment.from_biota(bigg_id=compart_id)
-                if compartment is None:
-                    raise BadRequestException(f"Cannot create compartment '{compart_id}'")
-            else:
-                compartment = Compartment(data["compartments"][compart_id])
-
-            used_comp_id = comp_id
-
-            # create compound
-            comp = Compound(
-                CompoundDict(
-                    id=used_comp_id,
-                    name=comp_data.get("name", ""),
-                    compartment=compartment,
-                    charge=comp_data.get("charge", None),
-                    mass=comp_data.get("mass", None),
-                    monoisotopic_mass=comp_data.get("monoisotopic_mass", None),
-                    formula=comp_data.get("formula", ""),
-                    inchi=comp_data.get("inchi", ""),
-                    inchikey=comp_data.get("inchikey", ""),
-                    chebi_id=comp_data.get("chebi_id", ""),
-                    kegg_id=comp_data.get("kegg_id", ""),
-                    layout=comp_data.get("layout")
-                ))
-
-            if not skip_orphans:
-                # add all compounds by default
-                try:
-                    net.add_compound(comp)
-                except Exception as err:
-                    raise BadRequestException(f"Cannot compound add {comp_data['id']}. Error: {err}")
-
-            if comp_id not in added_comps:
-                added_comps[comp_id] = comp
-            else:
-                raise BadRequestException(f"Compound id duplicate {comp_id}")
+            self._create_compound_from_dump(
+                net, comp_data, compartments=data["compartments"], added_comps=added_comps,
+                mapping_dict=mapping_dict, skip_orphans=skip_orphans)
 
         return net, added_comps
 
+    def _create_compound_from_dump(
+            self, net, comp_data: dict, *, compartments: dict, added_comps: dict, mapping_dict, skip_orphans):
+        """ Create a compound and add it to the network (if orphans are not skipped) """
+        from ...compound.compound import Compound
+
+        # loads biota info if it exists
+        comp_id = comp_data["id"]
+        if "compounds" in mapping_dict:
+            biota_comp = mapping_dict["compounds"].get(comp_id)
+            if biota_comp is not None:
+                for k in comp_data:
+                    if hasattr(biota_comp, k):
+                        if k != "id":
+                            comp_data[k] = getattr(biota_comp, k)
+
+        # create compartment
+        compart_id = comp_data["compartment"]
+        if compart_id == "":
+            # for some bigg models
+            # try to infer compartment from compound id
+            compart_id = comp_id.split("_")[-1]
+            compartment = Compartment.from_biota(bigg_id=compart_id)
+            if compartment is None:
+                raise BadRequestException(f"Cannot create compartment '{compart_id}'")
+        else:
+            compartment = Compartment(compartments[compart_id])
+
+        used_comp_id = comp_id
+
+        # create compound
+        comp = Compound(
+            CompoundDict(
+                id=used_comp_id,
+                name=comp_data.get("name", ""),
+                compartment=compartment,
+                charge=comp_data.get("charge", None),
+                mass=comp_data.get("mass", None),
+                monoisotopic_mass=comp_data.get("monoisotopic_mass", None),
+                formula=comp_data.get("formula", ""),
+                inchi=comp_data.get("inchi", ""),
+                inchikey=comp_data.get("inchikey", ""),
+                chebi_id=comp_data.get("chebi_id", ""),
+                kegg_id=comp_data.get("kegg_id", ""),
+                layout=comp_data.get("layout")
+            ))
+
+        if not skip_orphans:
+            # add all compounds by default
+            try:
+                net.add_compound(comp)
+            except Exception as err:
+                raise BadRequestException(f"Cannot compound add {comp_data['id']}. Error: {err}")
+
+        if comp_id not in added_comps:
+            added_comps[comp_id] = comp
+        else:
+            raise BadRequestException(f"Compound id duplicate {comp_id}")
+
     def _load_all_enzymes(self, data):
         # get all biota enzymes
         ec_numbers = []
         for rxn_data in data["reactions"]:
-            if self.is_bigg_data_format:
-                skip = False
-                for pref in self.BIGG_REACTION_PREFIX_TO_IGNORE:
-                    if rxn_data["id"].startswith(pref):
-                        skip = True
-                        break
-                if skip:
-                    continue
+            if self._is_enzyme_lookup_skipped(rxn_data):
+                continue
             ec_numbers.extend(rxn_data["ec_numbers"])
+        return self._load_enzymes(ec_numbers)
+
+    def _is_enzyme_lookup_skipped(self, rxn_data) -> bool:
+        if self.is_bigg_data_format:
+            for pref in self.BIGG_REACTION_PREFIX_TO_IGNORE:
+                if rxn_data["id"].startswith(pref):
+                    return True
+        return False
+
+    def _load_enzymes(self, ec_numbers: list[str]) -> dict[str, EnzymeDict]:
         ec_numbers = list(set(ec_numbers))
 
         query = BiotaEnzymeOrtholog.select().where(BiotaEnzymeOrtholog.ec_number.in_(ec_numbers))
@@ -138,17 +153,12 @@ class NetworkDataLoaderHelper(BaseHelper):
     def _creates_reactions_from_dump(
             self, net, data: 'NetworkDict', *, added_comps, mapping_dict):
 
-        from ...reaction.reaction import Reaction
-
         ckey = "compounds" if "compounds" in data else "metabolites"
         count = 0
         total_number_of_reactions = len(data["reactions"])
         total_number_of_prints = 3
         rxn_print_interval = int(total_number_of_reactions / total_number_of_prints) or 1
 
-        rxn_biota_helper = ReactionBiotaHelper()
-        rxn_biota_helper.attach_message_dispatcher(self._message_dispatcher)
-
         # load all enzymes if possible
         biota_enzymes_dict = self._load_all_enzymes(data)
 
@@ -158,54 +168,63 @@ class NetworkDataLoaderHelper(BaseHelper):
                 perc = int(100 * count/total_number_of_reactions)
                 self.log_info_message(f"... {perc}%")
 
-            enzyme_list = []
-            for ec_number in rxn_data["ec_numbers"]:
-                if ec_number in biota_enzymes_dict:
-                    enzyme_list.append(biota_enzymes_dict[ec_number])
-
-            # loads biota info if it exists
-            if "reactions" in mapping_dict:
-                biota_rxn = mapping_dict["reactions"].get(rxn_data["id"])
-                if biota_rxn is not None:
-                    rxn_data["rhea_id"] = biota_rxn.rhea_id
-
-            used_rxn_id = rxn_data["id"]
-
-            rxn = Reaction(
-                ReactionDict(
-                    id=used_rxn_id,
-                    name=rxn_data.get("name"),
-                    lower_bound=rxn_data.get("lower_bound", Reaction.lower_bound),
-                    upper_bound=rxn_data.get("upper_bound", Reaction.upper_bound),
-                    enzymes=enzyme_list,
-                    direction=rxn_data.get("direction", "B"),
-                    rhea_id=rxn_data.get("rhea_id", ""),
-                    gene_reaction_rule= rxn_data.get("gene_reaction_rule","")
-                ))
-            rxn.layout = rxn_data.get("layout", {})
-
-            if "data" in rxn_data:
-                rxn.set_data(rxn_data.get("data"))
-                # @TODO: check data simulations
-
-            for comp_id in rxn_data[ckey]:
-                comp = added_comps[comp_id]
-                if isinstance(rxn_data[ckey][comp_id], dict):
-                    stoich = float(rxn_data[ckey][comp_id].get("stoich"))
-                else:
-                    stoich = float(rxn_data[ckey][comp_id])  # for retro compatiblity
-                if stoich < 0:
-                    rxn.add_substrate(comp, stoich, net)
-                elif stoich > 0:
-                    rxn.add_product(comp, stoich, net)
-
-            if net.reaction_exists(rxn):
-                self.log_warning_message(f"The reaction {rxn.rhea_id} is duplicated. It is only added once.")
-            else:
-                net.add_reaction(rxn)
+            self._create_reaction_from_dump(
+                net, rxn_data, ckey=ckey, added_comps=added_comps,
+                biota_enzymes_dict=biota_enzymes_dict, mapping_dict=mapping_dict)
 
         return net
 
+    def _create_reaction_from_dump(
+            self, net, rxn_data: dict, *, ckey: str, added_comps: dict, biota_enzymes_dict: dict, mapping_dict):
+        """ Create a reaction and add it to the network """
+        from ...reaction.reaction import Reaction
+
+        enzyme_list = []
+        for ec_number in rxn_data["ec_numbers"]:
+            if ec_number in biota_enzymes_dict:
+                enzyme_list.append(biota_enzymes_dict[ec_number])
+
+        # loads biota info if it exists
+        if "reactions" in mapping_dict:
+            biota_rxn = mapping_dict["reactions"].get(rxn_data["id"])
+            if biota_rxn is not None:
+                rxn_data["rhea_id"] = biota_rxn.rhea_id
+
+        used_rxn_id = rxn_data["id"]
+
+        rxn = Reaction(
+            ReactionDict(
+                id=used_rxn_id,
+                name=rxn_data.get("name"),
+                lower_bound=rxn_data.get("lower_bound", Reaction.lower_bound),
+                upper_bound=rxn_data.get("upper_bound", Reaction.upper_bound),
+                enzymes=enzyme_list,
+                direction=rxn_data.get("direction", "B"),
+                rhea_id=rxn_data.get("rhea_id", ""),
+                gene_reaction_rule= rxn_data.get("gene_reaction_rule","")
+            ))
+        rxn.layout = rxn_data.get("layout", {})
+
+        if "data" in rxn_data:
+            rxn.set_data(rxn_data.get("data"))
+            # @TODO: check data simulations
+
+        for comp_id in rxn_data[ckey]:
+            comp = added_comps[comp_id]
+            if isinstance(rxn_data[ckey][comp_id], dict):
+                stoich = float(rxn_data[ckey][comp_id].get("stoich"))
+            else:
+                stoich = float(rxn_data[ckey][comp_id])  # for retro compatiblity
+            if stoich < 0:
+                rxn.add_substrate(comp, stoich, net)
+            elif stoich > 0:
+                rxn.add_product(comp, stoich, net)
+
+        if net.reaction_exists(rxn):
+            self.log_warning_message(f"The reaction {rxn.rhea_id} is duplicated. It is only added once.")
+        else:
+            net.add_reaction(rxn)
+
     def _loads_simulations_from_dump(self, net, data: 'NetworkDict'):
         """ Load simulations  """
         if "simulations" in data:
@@ -224,9 +243,9 @@ class NetworkDataLoaderHelper(BaseHelper):
               biomass_metabolite_id_user: str = None,
               add_biomass: bool = False) -> 'NetworkData':
         """ Load JSON data and create a Network  """
-        from ...compound.compound import Compound
         from ...network import NetworkData
 
+        Compartment.prefetch_biota_compartments()
         data = self._prepare_data(data, replace_unknown_compartments)
         net = NetworkData()
 
@@ -261,6 +280,149 @@ class NetworkDataLoaderHelper(BaseHelper):
             mapping_dict=mapping_dict
         )
 
+        return self.finalize_loads(
+            net,
+            biomass_reaction_id=biomass_reaction_id,
+            biomass_metabolite_id_user=biomass_metabolite_id_user,
+            add_biomass=add_biomass
+        )
+
+    def loads_file(self, file_path: str, *,
+                   biomass_reaction_id: str = None,
+                   skip_orphans: bool = False,
+                   replace_unknown_compartments: bool = False,
+                   biomass_metabolite_id_user: str = None,
+                   add_biomass: bool = False) -> 'NetworkData':
+        """
+        Load a JSON network dump file and create a Network, without loading the whole file in memory.
+
+        The file is read in three passes: the first one reads the compartments, the metadata, the ids of the
+        compounds and the EC numbers of the reactions, the second one creates the compounds and the last one
+        creates the reactions. The compounds and the reactions are created as they are read, and their raw
+        data are released immediately. The progress is reported by bytes read.
+
+        The file must be a network dump (i.e. with the `compartments`, `metabolites` and `reactions` at the root).
+        """
+        from ...network import NetworkData
+
+        Compartment.prefetch_biota_compartments()
+        net = NetworkData()
+        mapping_dict = {}
+        item_keys = {"metabolites", "compounds", "reactions"}
+        metadata_keys = {"name", "compartments", "simulations", "recon_tags"}
+
+        # pass 1: metadata, compound ids, EC numbers and environment compounds of the exchange reactions
+        self.log_info_message("Reading network metadata ...")
+        metadata = {}
+        ckey = "metabolites"
+        comp_ids = set()
+        rxn_ec_numbers = []
+        env_comp_ids = []
+        has_exchange_reactions = False
+        reader = self._create_stream_reader(file_path, "Reading network metadata", 0, 20)
+        for key, value in reader.iter_members(keys=item_keys | metadata_keys, stream_keys=item_keys):
+            if key in ("metabolites", "compounds"):
+                ckey = key
+                for comp_data in value:
+                    comp_ids.add(comp_data["id"])
+                    if not comp_data.get("chebi_id") and comp_data.get("annotation") is not None:
+                        self.is_bigg_data_format = True
+                metadata[key] = len(comp_ids) > 0
+            elif key == "reactions":
+                for rxn_data in value:
+                    to_keep, env_comp_id = self._get_reaction_status(rxn_data)
+                    if not to_keep:
+                        continue
+                    if env_comp_id is not None:
+                        has_exchange_reactions = True
+                        env_comp_ids.append(env_comp_id)
+                    self._prepare_reaction_data(rxn_data)
+                    rxn_ec_numbers.append((rxn_data["id"], rxn_data["ec_numbers"]))
+                metadata[key] = len(rxn_ec_numbers) > 0
+            else:
+                metadata[key] = value
+
+        if not metadata.get("compartments"):
+            raise BadRequestException("Invalid network dump. Compartments not found")
+        if not metadata.get(ckey):
+            raise BadRequestException("Invalid network dump. Metabolites not found")
+        if not metadata.get("reactions"):
+            raise BadRequestException("Invalid network dump. Reactions not found")
+
+        # the environment compounds of the exchange reactions are added if they do not exist (see _remove_ignored_reactions)
+        compartments = metadata["compartments"]
+        if has_exchange_reactions and isinstance(compartments, dict):
+            compartments.update({"env": self.ENVIRONMENT_COMPARTMENT_NAME})
+        new_env_comp_ids = {}
+        if isinstance(compartments, dict):
+            for env_comp_id in env_comp_ids:
+                if env_comp_id not in comp_ids:
+                    new_env_comp_ids[env_comp_id] = None
+        compartments = self._prepare_compartments(compartments, replace_unknown_compartments)
+
+        net.name = metadata.get("name", NetworkData.DEFAULT_NAME)
+        net = self._loads_simulations_from_dump(net, metadata)
+        net = self._loads_recon_tags_from_dump(net, metadata)
+
+        ec_numbers = []
+        for rxn_id, rxn_ec_number_list in rxn_ec_numbers:
+            if not self._is_enzyme_lookup_skipped({"id": rxn_id}):
+                ec_numbers.extend(rxn_ec_number_list)
+        del rxn_ec_numbers
+
+        # pass 2: compounds
+        self.log_info_message("Creating compounds ...")
+        added_comps = {}
+        reader = self._create_stream_reader(file_path, "Creating compounds", 20, 40)
+        for _, value in reader.iter_members(keys={ckey}, stream_keys={ckey}):
+            for comp_data in value:
+                self._prepare_compound_data(comp_data)
+                self._create_compound_from_dump(
+                    net, comp_data, compartments=compartments, added_comps=added_comps,
+                    mapping_dict=mapping_dict, skip_orphans=skip_orphans)
+        for env_comp_id in new_env_comp_ids:
+            comp_data = {'id': env_comp_id, 'compartment': 'env'}
+            self._prepare_compound_data(comp_data)
+            self._create_compound_from_dump(
+                net, comp_data, compartments=compartments, added_comps=added_comps,
+                mapping_dict=mapping_dict, skip_orphans=skip_orphans)
+
+        # pass 3: reactions
+        self.log_info_message("Creating reactions ...")
+        biota_enzymes_dict = self._load_enzymes(ec_numbers)
+        reader = self._create_stream_reader(file_path, "Creating reactions", 60, 40)
+        for _, value in reader.iter_members(keys={"reactions"}, stream_keys={"reactions"}):
+            for rxn_data in value:
+                to_keep, env_comp_id = self._get_reaction_status(rxn_data)
+                if not to_keep:
+                    continue
+                if env_comp_id in new_env_comp_ids:
+                    # only the first exchange reaction of the compound is updated (as in _remove_ignored_reactions)
+                    del new_env_comp_ids[env_comp_id]
+                    rxn_data["metabolites"].update({env_comp_id: 1.0})
+                self._prepare_reaction_data(rxn_data)
+                self._create_reaction_from_dump(
+                    net, rxn_data, ckey=ckey, added_comps=added_comps,
+                    biota_enzymes_dict=biota_enzymes_dict, mapping_dict=mapping_dict)
+
+        return self.finalize_loads(
+            net,
+            biomass_reaction_id=biomass_reaction_id,
+            biomass_metabolite_id_user=biomass_metabolite_id_user,
+            add_biomass=add_biomass
+        )
+
+    def _create_stream_reader(self, file_path: str, message: str, start: float, span: float) -> JSONStreamReader:
+        def _progress(bytes_read, total_bytes):
+            perc = start + span * bytes_read / (total_bytes or 1)
+            self.update_progress_value(perc, message=f"{message} ({bytes_read} / {total_bytes} bytes)")
+        return JSONStreamReader(file_path, progress_fn=_progress)
+
+    def finalize_loads(self, net, *, biomass_reaction_id: str = None, biomass_metabolite_id_user: str = None,
+                        add_biomass: bool = False) -> 'NetworkData':
+        """ Check the biomass of a loaded (or merged) network, or infer it, and classify its compounds """
+        from ...compound.compound import Compound
+
         # check if the biomass compartment exists
         if biomass_metabolite_id_user is not None:
             if biomass_metabolite_id_user != "":
@@ -288,7 +450,7 @@ class NetworkDataLoaderHelper(BaseHelper):
                     "No explicit biomass entity found. Trying to infer and add an explicit biomass entity ...")
                 if biomass_reaction_id:
                     self.log_warning_message(f'Looking for user biomass reaction "{biomass_reaction_id}" ...')
-                    if biomass_reaction_id in net.reactions.get_elements():
+                    if biomass_reaction_id in net.reactions:
                         rxn = net.reactions[biomass_reaction_id]
                         biomass = Compound(
                             CompoundDict(
@@ -314,6 +476,9 @@ class NetworkDataLoaderHelper(BaseHelper):
                             self.log_warning_message(
                                 f'Reaction "{rxn.id} ({rxn.name})" was automatically inferred as biomass reaction')
 
+        # classify the compounds once (cofactors, residues) to speed up the later dumps and cofactor-aware lookups
+        CompoundClassifierHelper.classify_compounds(net.compounds.peek_values())
+
         return net
 
     def _prepare_data(self, data, replace_unknown_compartments):
@@ -322,9 +487,24 @@ class NetworkDataLoaderHelper(BaseHelper):
         out_data = self._remove_ignored_reactions(out_data)
 
         # prepare compartment
-        if isinstance(data["compartments"], dict):
+        out_data["compartments"] = self._prepare_compartments(out_data["compartments"], replace_unknown_compartments)
+
+        # prepare compounds
+        ckey = "compounds" if "compounds" in data else "metabolites"
+        for comp_data in out_data[ckey]:
+            self._prepare_compound_data(comp_data)
+
+        # prepare reactions
+        for rxn_data in out_data["reactions"]:
+            self._prepare_reaction_data(rxn_data)
+
+        return out_data
+
+    def _prepare_compartments(self, compartments, replace_unknown_compartments) -> dict:
+        """ Prepare the compartments, by id """
+        if isinstance(compartments, dict):
             # -> is bigg data
-            for bigg_id in out_data["compartments"].keys():
+            for bigg_id in list(compartments.keys()):
                 compart = Compartment.from_biota(bigg_id=bigg_id)
                 if compart is None:
                     if replace_unknown_compartments:
@@ -335,7 +515,7 @@ class NetworkDataLoaderHelper(BaseHelper):
                     else:
                         raise BadRequestException(f"The compartment '{bigg_id}' is not known")
 
-                out_data["compartments"][bigg_id] = {
+                compartments[bigg_id] = {
                     "id": bigg_id,
                     "go_id": compart.go_id,
                     "name": compart.name
@@ -343,109 +523,117 @@ class NetworkDataLoaderHelper(BaseHelper):
             # append biomass compartment
             biomass_compart = Compartment.create_biomass_compartment()
             bigg_id = biomass_compart.bigg_id
-            out_data["compartments"][bigg_id] = {
+            compartments[bigg_id] = {
                 "id": bigg_id,
                 "go_id": biomass_compart.go_id,
                 "name": biomass_compart.name
             }
-        elif isinstance(data["compartments"], list):
-            out_data["compartments"] = {}
-            for compart_data in data["compartments"]:
+            return compartments
+        elif isinstance(compartments, list):
+            prepared_compartments = {}
+            for compart_data in compartments:
                 id_ = compart_data["id"]
-                out_data["compartments"][id_] = compart_data
+                prepared_compartments[id_] = compart_data
+            return prepared_compartments
         else:
             raise BadRequestException("Invalid compartment data")
 
-        # prepare compounds
-        ckey = "compounds" if "compounds" in data else "metabolites"
-        for comp_data in out_data[ckey]:
-            chebi_id = comp_data.get("chebi_id", "")
-            if chebi_id:
-                continue
+    def _prepare_compound_data(self, comp_data):
+        """ Prepare the data of a compound (chebi id) """
+        chebi_id = comp_data.get("chebi_id", "")
+        if chebi_id:
+            return
 
-            # it is maybe a bigg data format
-            annotation = comp_data.get("annotation")
+        # it is maybe a bigg data format
+        annotation = comp_data.get("annotation")
+        if annotation is None:
+            comp_data["chebi_id"] = None
+            return
+
+        self.is_bigg_data_format = True
+        if isinstance(annotation, list):
+            annotation = self._convert_bigg_annotation_list_to_dict(annotation)
+
+        alt_chebi_ids = annotation.get("chebi", []) or annotation.get("CHEBI", [])
+        if isinstance(alt_chebi_ids, str):
+            alt_chebi_ids = [alt_chebi_ids]
+
+        master_chebi_id = None
+        for id_ in alt_chebi_ids:
+            master_chebi_id = BiotaLookupHelper.retrieve_master_chebi_id(id_)
+            if master_chebi_id:
+                break
+
+        if master_chebi_id is not None:
+            comp_data["chebi_id"] = master_chebi_id
+        elif len(alt_chebi_ids) >= 1:
+            comp_data["chebi_id"] = alt_chebi_ids[0]
+        else:
+            comp_data["chebi_id"] = None
+
+    def _prepare_reaction_data(self, rxn_data):
+        """ Prepare the data of a reaction (EC numbers) """
+        if rxn_data.get("enzymes", []):
+            rxn_data['ec_numbers'] = [enzyme["ec_number"] for enzyme in rxn_data["enzymes"]]
+        elif rxn_data.get("enzyme", {}):
+            # TODO:  deprecated to delete later
+            rxn_data['ec_numbers'] = [rxn_data["enzyme"]["ec_number"]]
+        else:
+            rxn_data['ec_numbers'] = []
+            annotation = rxn_data.get("annotation")
             if annotation is None:
-                comp_data["chebi_id"] = None
-                continue
+                return
 
             self.is_bigg_data_format = True
             if isinstance(annotation, list):
                 annotation = self._convert_bigg_annotation_list_to_dict(annotation)
 
-            alt_chebi_ids = annotation.get("chebi", []) or annotation.get("CHEBI", [])
-            if isinstance(alt_chebi_ids, str):
-                alt_chebi_ids = [alt_chebi_ids]
-
-            master_chebi_id = None
-            for id_ in alt_chebi_ids:
-                master_chebi_id = BiotaCompoundLayout.retreive_master_chebi_id(id_)
-                if master_chebi_id:
-                    break
-
-            if master_chebi_id is not None:
-                comp_data["chebi_id"] = master_chebi_id
-            elif len(alt_chebi_ids) >= 1:
-                comp_data["chebi_id"] = alt_chebi_ids[0]
-            else:
-                comp_data["chebi_id"] = None
-
-        # prepare reactions
-        for rxn_data in out_data["reactions"]:
-            if rxn_data.get("enzymes", []):
-                rxn_data['ec_numbers'] = [enzyme["ec_number"] for enzyme in rxn_data["enzymes"]]
-            elif rxn_data.get("enzyme", {}):
-                # TODO:  deprecated to delete later
-                rxn_data['ec_numbers'] = [rxn_data["enzyme"]["ec_number"]]
-            else:
-                rxn_data['ec_numbers'] = []
-                annotation = rxn_data.get("annotation")
-                if annotation is None:
-                    continue
-
-                self.is_bigg_data_format = True
-                if isinstance(annotation, list):
-                    annotation = self._convert_bigg_annotation_list_to_dict(annotation)
+            ec_number = annotation.get("ec-code") or \
+                annotation.get("ec-number") or \
+                annotation.get("EC Number")
 
-                ec_number = annotation.get("ec-code") or \
-                    annotation.get("ec-number") or \
-                    annotation.get("EC Number")
-
-                if ec_number:
-                    if isinstance(ec_number, list):
-                        ec_numbers = ec_number
-                    else:
-                        ec_numbers = [ec_number]
-                    rxn_data['ec_numbers'] = ec_numbers
-
-            if rxn_data.get("gene_reaction_rule"):
-                rxn_data["gene_reaction_rule"] = rxn_data.get("gene_reaction_rule")
-
-        return out_data
+            if ec_number:
+                if isinstance(ec_number, list):
+                    ec_numbers = ec_number
+                else:
+                    ec_numbers = [ec_number]
+                rxn_data['ec_numbers'] = ec_numbers
+
+        if rxn_data.get("gene_reaction_rule"):
+            rxn_data["gene_reaction_rule"] = rxn_data.get("gene_reaction_rule")
+
+    def _get_reaction_status(self, rxn_data) -> tuple[bool, str]:
+        """
+        Returns True if the reaction must be kept (i.e. it is not a demand reaction), and the id of the
+        environment compound of the exchange reactions (`None` for the other reactions)
+        """
+        env_comp_id = None
+        for pref in self.BIGG_REACTION_PREFIX_TO_IGNORE:
+            if rxn_data["id"].startswith(pref):
+                if pref == "EX_":
+                    metabolite = next(iter(rxn_data["metabolites"]))
+                    env_comp_id = metabolite.split("_e")[0] + "_env"
+                else:
+                    return False, None
+        return True, env_comp_id
 
     def _remove_ignored_reactions(self, data):
         list_to_keep = []
+        ckey = "compounds" if "compounds" in data else "metabolites"
+        comp_ids = {meta.get("id") for meta in data.get(ckey, [])}
         for i, rxn_data in enumerate(data["reactions"]):
-            to_keep = True
-            for pref in self.BIGG_REACTION_PREFIX_TO_IGNORE:
-                if rxn_data["id"].startswith(pref):
-                    if pref == "EX_":
-                        metabolite = next(iter(rxn_data["metabolites"]))
-                        # Add compartment environment
-                        if isinstance(data["compartments"], dict):  # If there is the first loading
-                            data["compartments"].update({"env": "extracellular region (environment)"})
-                            # Create a new metabolite with the suffix "_env"
-                            new_metabolite = metabolite.split("_e")[0] + "_env"
-                            # Check if the new metabolite is already in the data["metabolites"]
-                            metabolite_found = any(new_metabolite in meta.values() for meta in data["metabolites"])
-                            if not metabolite_found:
-                                # Add this metabolite in the model
-                                data["metabolites"].append({'id': new_metabolite, 'compartment': 'env'})
-                                # Add this metabolite to the reaction EX_
-                                rxn_data["metabolites"].update({new_metabolite: 1.0})
-                    else:
-                        to_keep = False
-                        break
+            to_keep, new_metabolite = self._get_reaction_status(rxn_data)
+            if new_metabolite is not None:
+                # Add compartment environment
+                if isinstance(data["compartments"], dict):  # If there is the first loading
+                    data["compartments"].update({"env": self.ENVIRONMENT_COMPARTMENT_NAME})
+                    # Check if the new metabolite is already in the data["metabolites"]
+                    if new_metabolite not in comp_ids:
+                        # Add this metabolite in the model
+                        data[ckey].append({'id': new_metabolite, 'compartment': 'env'})
+                        comp_ids.add(new_metabolite)
+                        # Add this metabolite to the reaction EX_
+                        rxn_data["metabolites"].update({new_metabolite: 1.0})
             if to_keep:
                 list_to_keep.append(i)
 
@@ -0,0 +1,497 @@
+import gzip
+import math
+import re
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import quoteattr
+
+from gws_core import BadRequestException
+
+from ....helper.base_helper import BaseHelper
+from ...typing.network_typing import NetworkDict
+
+
+class NetworkDataSBMLHelper(BaseHelper):
+    """
+    NetworkDataSBMLHelper
+
+    Reads and writes the networks in the SBML format (level 3, FBC version 2), without the cobra environment:
+    * the reader parses the file incrementally (`iterparse`): the species and the reactions are converted on the
+    fly and removed from the XML tree, so the whole document is never held in memory. It returns a network dump
+    in the format of the cobra JSON models (see `NetworkDataLoaderHelper`),
+    * the writer streams a network dump (see `NetworkData.dumps`) to the file, element by element.
+
+    The files with the `.gz` extension are read and written with gzip compression.
+    The ids are encoded like cobra does (`M_`, `R_` and `G_` prefixes, invalid characters written `__<ord>__`).
+    """
+
+    SBML_NS = "http://www.sbml.org/sbml/level3/version1/core"
+    FBC_NS = "http://www.sbml.org/sbml/level3/version1/fbc/version2"
+    RDF_NS = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+    BQBIOL_NS = "http://biomodels.net/biology-qualifiers/"
+    IDENTIFIERS_URL = "https://identifiers.org/"
+    COMPOUND_PREFIX = "M_"
+    REACTION_PREFIX = "R_"
+    GENE_PREFIX = "G_"
+    DEFAULT_LOWER_BOUND_ID = "default_lb"
+    DEFAULT_UPPER_BOUND_ID = "default_ub"
+    ZERO_BOUND_ID = "zero_bound"
+    DEFAULT_LOWER_BOUND = -1000.0
+    DEFAULT_UPPER_BOUND = 1000.0
+
+    _ENCODED_CHAR_PATTERN = re.compile(r"__(\d+)__")
+    _INVALID_CHAR_PATTERN = re.compile(r"[^a-zA-Z0-9_]")
+    _IDENTIFIERS_PATTERN = re.compile(r"^https?://identifiers\.org/(.+)$")
+    _GENE_RULE_TOKEN_PATTERN = re.compile(r"\(|\)|[^\s()]+")
+    _PREFIXED_NAMESPACES = ("chebi", "go")
+
+    # -- A --
+
+    @classmethod
+    def _add_annotation_resource(cls, annotation: dict, resource: str):
+        """ Add an identifiers.org resource (`<ns>/<id>` or `<PREFIX>:<id>`) to an annotation dict """
+        match = cls._IDENTIFIERS_PATTERN.match(resource or "")
+        if match is None:
+            return
+        path = match.group(1)
+        if "/" in path:
+            namespace, id_ = path.split("/", 1)
+        elif ":" in path:
+            prefix, id_ = path.split(":", 1)
+            namespace = prefix.lower()
+            if namespace in cls._PREFIXED_NAMESPACES:
+                id_ = path
+        else:
+            return
+        annotation.setdefault(namespace, []).append(id_)
+
+    # -- D --
+
+    @classmethod
+    def decode_id(cls, id_: str, prefix: str = "") -> str:
+        """ Decode an SBML id (remove the prefix and replace the `__<ord>__` escape sequences) """
+        if prefix and id_.startswith(prefix):
+            id_ = id_[len(prefix):]
+        return cls._ENCODED_CHAR_PATTERN.sub(lambda match: chr(int(match.group(1))), id_)
+
+    def dump(self, data: NetworkDict, file_path: str, objective_reaction_id: str = None):
+        """
+        Write a network dump in an SBML file
+
+        :param data: The network dump (see `NetworkData.dumps`)
+        :type data: `NetworkDict`
+        :param file_path: The path of the file (compressed with gzip if the extension is `.gz`)
+        :type file_path: `str`
+        :param objective_reaction_id: The id of the reaction to maximize (e.g. the biomass reaction)
+        :type objective_reaction_id: `str`
+        """
+
+        compounds = data.get("metabolites") or data.get("compounds") or []
+        reactions = data.get("reactions") or []
+        compartments = data.get("compartments") or []
+        if isinstance(compartments, dict):
+            compartments = [{"id": id_, "name": name} for id_, name in compartments.items()]
+
+        # first pass on the reactions: flux bound parameters and gene products
+        parameters = {
+            self.DEFAULT_LOWER_BOUND_ID: self.DEFAULT_LOWER_BOUND,
+            self.DEFAULT_UPPER_BOUND_ID: self.DEFAULT_UPPER_BOUND,
+            self.ZERO_BOUND_ID: 0.0,
+        }
+        parameter_ids = {val: id_ for id_, val in parameters.items()}
+        bound_ids = []
+        gene_ids = {}
+        for rxn in reactions:
+            rxn_bound_ids = []
+            for name in ("lower_bound", "upper_bound"):
+                default = self.DEFAULT_LOWER_BOUND if name == "lower_bound" else self.DEFAULT_UPPER_BOUND
+                val = rxn.get(name)
+                val = default if val is None else float(val)
+                if val not in parameter_ids:
+                    param_id = self.encode_id(rxn["id"], self.REACTION_PREFIX) + "_" + name
+                    parameters[param_id] = val
+                    parameter_ids[val] = param_id
+                rxn_bound_ids.append(parameter_ids[val])
+            bound_ids.append(rxn_bound_ids)
+            for token in self._GENE_RULE_TOKEN_PATTERN.findall(rxn.get("gene_reaction_rule") or ""):
+                if token not in ("(", ")") and token.lower() not in ("and", "or"):
+                    gene_ids.setdefault(token, self.encode_id(token, self.GENE_PREFIX))
+
+        open_file = gzip.open if file_path.endswith(".gz") else open
+        with open_file(file_path, "wt", encoding="utf-8") as fp:
+            model_id = self.encode_id(data.get("name") or "network")
+            fp.write("<?xml version='1.0' encoding='UTF-8'?>\n")
+            fp.write(f'<sbml xmlns="{self.SBML_NS}" xmlns:fbc="{self.FBC_NS}" level="3" version="1" '
+                     'fbc:required="false">\n')
+            fp.write(f'  <model id={quoteattr(model_id)} name={quoteattr(data.get("name") or "")} '
+                     'fbc:strict="true">\n')
+
+            fp.write('    <fbc:listOfObjectives fbc:activeObjective="obj">\n')
+            fp.write('      <fbc:objective fbc:id="obj" fbc:type="maximize">\n')
+            fp.write("        <fbc:listOfFluxObjectives>\n")
+            if objective_reaction_id:
+                rxn_id = self.encode_id(objective_reaction_id, self.REACTION_PREFIX)
+                fp.write(f'          <fbc:fluxObjective fbc:reaction={quoteattr(rxn_id)} fbc:coefficient="1"/>\n')
+            fp.write("        </fbc:listOfFluxObjectives>\n")
+            fp.write("      </fbc:objective>\n")
+            fp.write("    </fbc:listOfObjectives>\n")
+
+            fp.write("    <listOfParameters>\n")
+            for param_id, val in parameters.items():
+                fp.write(f'      <parameter id={quoteattr(param_id)} value="{self._format_float(val)}" '
+                         'constant="true"/>\n')
+            fp.write("    </listOfParameters>\n")
+
+            fp.write("    <listOfCompartments>\n")
+            for compart in compartments:
+                compart_id = self.encode_id(compart["id"])
+                fp.write(f'      <compartment id={quoteattr(compart_id)} metaid={quoteattr(compart_id)} '
+                         f'name={quoteattr(compart.get("name") or "")} constant="true"')
+                if compart.get("go_id"):
+                    fp.write(">\n")
+                    self._write_annotation(fp, compart_id, [compart["go_id"]], indent=8)
+                    fp.write("      </compartment>\n")
+                else:
+                    fp.write("/>\n")
+            fp.write("    </listOfCompartments>\n")
+
+            fp.write("    <listOfSpecies>\n")
+            for comp in compounds:
+                comp_id = self.encode_id(comp["id"], self.COMPOUND_PREFIX)
+                fp.write(f'      <species id={quoteattr(comp_id)} metaid={quoteattr(comp_id)} '
+                         f'name={quoteattr(comp.get("name") or "")} '
+                         f'compartment={quoteattr(self.encode_id(comp["compartment"]))} constant="false" '
+                         'boundaryCondition="false" hasOnlySubstanceUnits="false"')
+                if comp.get("charge") not in (None, ""):
+                    fp.write(f' fbc:charge="{int(round(float(comp["charge"])))}"')
+                if comp.get("formula"):
+                    fp.write(f' fbc:chemicalFormula={quoteattr(comp["formula"])}')
+                resources = [comp.get("chebi_id"), *(comp.get("alt_chebi_ids") or [])]
+                if comp.get("kegg_id"):
+                    resources.append("kegg.compound/" + comp["kegg_id"])
+                if comp.get("inchikey"):
+                    resources.append("inchikey/" + comp["inchikey"])
+                resources = [val for val in resources if val]
+                if resources:
+                    fp.write(">\n")
+                    self._write_annotation(fp, comp_id, resources, indent=8)
+                    fp.write("      </species>\n")
+                else:
+                    fp.write("/>\n")
+            fp.write("    </listOfSpecies>\n")
+
+            if gene_ids:
+                fp.write("    <fbc:listOfGeneProducts>\n")
+                for gene, gene_id in gene_ids.items():
+                    fp.write(f'      <fbc:geneProduct fbc:id={quoteattr(gene_id)} fbc:label={quoteattr(gene)}/>\n')
+                fp.write("    </fbc:listOfGeneProducts>\n")
+
+            fp.write("    <listOfReactions>\n")
+            for rxn, (lower_bound_id, upper_bound_id) in zip(reactions, bound_ids):
+                self._write_reaction(fp, rxn, lower_bound_id, upper_bound_id, gene_ids,
+                                     is_reversible=parameters[lower_bound_id] < 0)
+            fp.write("    </listOfReactions>\n")
+
+            fp.write("  </model>\n")
+            fp.write("</sbml>\n")
+
+    # -- E --
+
+    @classmethod
+    def encode_id(cls, id_: str, prefix: str = "") -> str:
+        """ Encode an id as a valid SBML id (add the prefix and escape the invalid characters as `__<ord>__`) """
+        id_ = cls._INVALID_CHAR_PATTERN.sub(lambda match: f"__{ord(match.group(0))}__", id_)
+        if not prefix and id_[:1].isdigit():
+            id_ = "_" + id_
+        return prefix + id_
+
+    # -- F --
+
+    @staticmethod
+    def _format_float(val: float) -> str:
+        if math.isinf(val):
+            return "INF" if val > 0 else "-INF"
+        if math.isnan(val):
+            return "NaN"
+        return repr(float(val))
+
+    # -- G --
+
+    @staticmethod
+    def _get_attributes(elem: ET.Element) -> dict:
+        """ Get the attributes of an element by local name (the namespaces of the packages are ignored) """
+        return {key.rsplit("}", 1)[-1]: val for key, val in elem.attrib.items()}
+
+    @classmethod
+    def _get_annotation(cls, elem: ET.Element) -> dict:
+        annotation = {}
+        for child in elem.iter(f"{{{cls.RDF_NS}}}li"):
+            cls._add_annotation_resource(annotation, child.get(f"{{{cls.RDF_NS}}}resource"))
+        return annotation
+
+    @classmethod
+    def _get_gene_rule(cls, elem: ET.Element, gene_names: dict, is_nested: bool = False) -> str:
+        """ Convert a `fbc:geneProductAssociation` tree to a gene reaction rule """
+        tag = elem.tag.rsplit("}", 1)[-1]
+        if tag == "geneProductRef":
+            gene_id = cls._get_attributes(elem).get("geneProduct", "")
+            return gene_names.get(gene_id, cls.decode_id(gene_id, cls.GENE_PREFIX))
+        is_operator = tag in ("and", "or")
+        rules = [cls._get_gene_rule(child, gene_names, is_nested=is_operator) for child in elem]
+        rules = [rule for rule in rules if rule]
+        if is_operator:
+            rule = f" {tag} ".join(rules)
+            return f"({rule})" if is_nested and len(rules) > 1 else rule
+        return " ".join(rules)
+
+    # -- L --
+
+    def load(self, file_path: str) -> dict:
+        """
+        Read an SBML file
+
+        :param file_path: The path of the file (compressed with gzip if the extension is `.gz`)
+        :type file_path: `str`
+        :return: The network dump, in the format of the cobra JSON models (see `NetworkDataLoaderHelper.loads`)
+        :rtype: `dict`
+        """
+
+        parameters = {}
+        compartments = {}
+        compounds = []
+        boundary_comp_ids = set()
+        genes = {}
+        reactions = []
+        model = {}
+
+        open_file = gzip.open if file_path.endswith(".gz") else open
+        with open_file(file_path, "rb") as fp:
+            stack = []
+            try:
+                for event, elem in ET.iterparse(fp, events=("start", "end")):
+                    if event == "start":
+                        stack.append(elem)
+                        continue
+                    stack.pop()
+                    tag = elem.tag.rsplit("}", 1)[-1]
+                    if tag == "model":
+                        model = self._get_attributes(elem)
+                        continue
+                    if tag not in ("parameter", "compartment", "species", "geneProduct", "reaction"):
+                        continue
+                    attrs = self._get_attributes(elem)
+                    if tag == "parameter":
+                        # the global parameters only (not the parameters of the kinetic laws)
+                        if stack and stack[-1].tag.endswith("listOfParameters"):
+                            parameters[attrs.get("id")] = float(attrs.get("value", "nan"))
+                    elif tag == "compartment":
+                        compart_id = self.decode_id(attrs["id"])
+                        go_ids = self._get_annotation(elem).get("go", [])
+                        compartments[compart_id] = {
+                            "id": compart_id, "name": attrs.get("name", compart_id),
+                            "go_id": go_ids[0] if go_ids else None}
+                    elif tag == "species":
+                        comp_id = self.decode_id(attrs["id"], self.COMPOUND_PREFIX)
+                        if attrs.get("boundaryCondition") == "true":
+                            boundary_comp_ids.add(comp_id)
+                        else:
+                            compounds.append(self._load_compound(elem, attrs, comp_id))
+                    elif tag == "geneProduct":
+                        genes[attrs["id"]] = attrs.get("label") or self.decode_id(attrs["id"], self.GENE_PREFIX)
+                    else:
+                        reactions.append(self._load_reaction(elem, parameters, genes, boundary_comp_ids))
+                    # the element is processed, release it
+                    if stack:
+                        stack[-1].remove(elem)
+            except ET.ParseError as err:
+                raise BadRequestException(f"Cannot parse the SBML file {file_path}. Error: {err}") from err
+
+        if not model:
+            raise BadRequestException(f"Invalid SBML file {file_path}. Model not found")
+
+        if all(compart["go_id"] for compart in compartments.values()):
+            # written by gena, the compartments are known by their GO ids
+            compartment_data = list(compartments.values())
+        else:
+            # e.g. BiGG model, the compartments are known by their BiGG ids
+            compartment_data = {id_: compart["name"] for id_, compart in compartments.items()}
+
+        return {
+            "id": model.get("id", ""),
+            "name": model.get("name") or model.get("id") or "",
+            "compartments": compartment_data,
+            "metabolites": compounds,
+            "reactions": reactions,
+            "genes": [{"id": gene, "name": gene} for gene in genes.values()],
+        }
+
+    def _load_compound(self, elem: ET.Element, attrs: dict, comp_id: str) -> dict:
+        annotation = self._get_annotation(elem)
+        comp_data = {
+            "id": comp_id,
+            "name": attrs.get("name", ""),
+            "compartment": self.decode_id(attrs.get("compartment", "")),
+            "formula": attrs.get("chemicalFormula", ""),
+            "annotation": annotation,
+        }
+        if attrs.get("charge") is not None:
+            comp_data["charge"] = float(attrs["charge"])
+        if annotation.get("kegg.compound"):
+            comp_data["kegg_id"] = annotation["kegg.compound"][0]
+        inchikeys = annotation.get("inchikey") or annotation.get("inchi_key")
+        if inchikeys:
+            comp_data["inchikey"] = inchikeys[0]
+        return comp_data
+
+    def _load_reaction(self, elem: ET.Element, parameters: dict, genes: dict, boundary_comp_ids: set) -> dict:
+        attrs = self._get_attributes(elem)
+        is_reversible = attrs.get("reversible", "true") != "false"
+        lower_bound = parameters.get(attrs.get("lowerFluxBound"))
+        upper_bound = parameters.get(attrs.get("upperFluxBound"))
+        if lower_bound is None:
+            lower_bound = self.DEFAULT_LOWER_BOUND if is_reversible else 0.0
+        if upper_bound is None:
+            upper_bound = self.DEFAULT_UPPER_BOUND
+
+        metabolites = {}
+        gene_rule = ""
+        for child in elem:
+            tag = child.tag.rsplit("}", 1)[-1]
+            if tag in ("listOfReactants", "listOfProducts"):
+                sign = -1.0 if tag == "listOfReactants" else 1.0
+                for ref in child:
+                    ref_attrs = self._get_attributes(ref)
+                    comp_id = self.decode_id(ref_attrs.get("species", ""), self.COMPOUND_PREFIX)
+                    if comp_id in boundary_comp_ids:
+                        continue
+                    stoich = sign * float(ref_attrs.get("stoichiometry", 1.0))
+                    metabolites[comp_id] = metabolites.get(comp_id, 0.0) + stoich
+            elif tag == "geneProductAssociation":
+                gene_rule = self._get_gene_rule(child, genes)
+
+        annotation = self._get_annotation(elem)
+        rxn_data = {
+            "id": self.decode_id(attrs["id"], self.REACTION_PREFIX),
+            "name": attrs.get("name", ""),
+            "metabolites": {comp_id: stoich for comp_id, stoich in metabolites.items() if stoich != 0},
+            "lower_bound": lower_bound,
+            "upper_bound": upper_bound,
+            "gene_reaction_rule": gene_rule,
+            "annotation": annotation,
+        }
+        # the rhea id is only set if it is unambiguous (BiGG models give the ids of all the directions)
+        rhea_ids = annotation.get("rhea", [])
+        if len(rhea_ids) == 1:
+            rhea_id = rhea_ids[0]
+            rxn_data["rhea_id"] = rhea_id if rhea_id.startswith("RHEA") else "RHEA:" + rhea_id
+        return rxn_data
+
+    # -- P --
+
+    @classmethod
+    def _parse_gene_rule(cls, rule: str):
+        """ Parse a gene reaction rule as a tree of tuples `(operator, operands)`, the leaves are the genes """
+        tokens = cls._GENE_RULE_TOKEN_PATTERN.findall(rule or "")
+        position = 0
+
+        def parse_expression(operator: str):
+            nonlocal position
+            operand_operator = "and" if operator == "or" else None
+            operands = [parse_expression(operand_operator) if operand_operator else parse_factor()]
+            while position < len(tokens) and tokens[position].lower() == operator:
+                position += 1
+                operands.append(parse_expression(operand_operator) if operand_operator else parse_factor())
+            return operands[0] if len(operands) == 1 else (operator, operands)
+
+        def parse_factor():
+            nonlocal position
+            if position >= len(tokens):
+                raise BadRequestException(f"Invalid gene reaction rule '{rule}'")
+            token = tokens[position]
+            position += 1
+            if token == "(":
+                node = parse_expression("or")
+                if position >= len(tokens) or tokens[position] != ")":
+                    raise BadRequestException(f"Invalid gene reaction rule '{rule}'")
+                position += 1
+                return node
+            return token
+
+        if not tokens:
+            return None
+        tree = parse_expression("or")
+        if position != len(tokens):
+            raise BadRequestException(f"Invalid gene reaction rule '{rule}'")
+        return tree
+
+    # -- W --
+
+    def _write_annotation(self, fp, metaid: str, resources: list[str], indent: int):
+        pad = " " * indent
+        fp.write(f'{pad}<annotation>\n'
+                 f'{pad}  <rdf:RDF xmlns:rdf="{self.RDF_NS}" xmlns:bqbiol="{self.BQBIOL_NS}">\n'
+                 f'{pad}    <rdf:Description rdf:about={quoteattr("#" + metaid)}>\n'
+                 f'{pad}      <bqbiol:is>\n'
+                 f'{pad}        <rdf:Bag>\n')
+        for resource in resources:
+            fp.write(f'{pad}          <rdf:li rdf:resource={quoteattr(self.IDENTIFIERS_URL + resource)}/>\n')
+        fp.write(f'{pad}        </rdf:Bag>\n'
+                 f'{pad}      </bqbiol:is>\n'
+                 f'{pad}    </rdf:Description>\n'
+                 f'{pad}  </rdf:RDF>\n'
+                 f'{pad}</annotation>\n')
+
+    def _write_gene_rule(self, fp, node, gene_ids: dict, indent: int):
+        pad = " " * indent
+        if isinstance(node, str):
+            fp.write(f'{pad}<fbc:geneProductRef fbc:geneProduct={quoteattr(gene_ids[node])}/>\n')
+            return
+        operator, operands = node
+        fp.write(f"{pad}<fbc:{operator}>\n")
+        for operand in operands:
+            self._write_gene_rule(fp, operand, gene_ids, indent + 2)
+        fp.write(f"{pad}</fbc:{operator}>\n")
+
+    def _write_reaction(self, fp, rxn: dict, lower_bound_id: str, upper_bound_id: str, gene_ids: dict,
+                        is_reversible: bool):
+        rxn_id = self.encode_id(rxn["id"], self.REACTION_PREFIX)
+        fp.write(f'      <reaction id={quoteattr(rxn_id)} metaid={quoteattr(rxn_id)} '
+                 f'name={quoteattr(rxn.get("name") or "")} reversible="{"true" if is_reversible else "false"}" '
+                 f'fast="false" fbc:lowerFluxBound={quoteattr(lower_bound_id)} '
+                 f'fbc:upperFluxBound={quoteattr(upper_bound_id)}>\n')
+
+        resources = []
+        if rxn.get("rhea_id"):
+            resources.append(rxn["rhea_id"].replace("RHEA:", "rhea/"))
+        for enzyme in rxn.get("enzymes") or []:
+            if enzyme.get("ec_number"):
+                resources.append("ec-code/" + enzyme["ec_number"])
+        if resources:
+            self._write_annotation(fp, rxn_id, resources, indent=8)
+
+        reactants = []
+        products = []
+        for comp_id, stoich in (rxn.get("metabolites") or rxn.get("compounds") or {}).items():
+            if isinstance(stoich, dict):
+                stoich = stoich.get("stoich")
+            stoich = float(stoich)
+            if stoich < 0:
+                reactants.append((comp_id, -stoich))
+            elif stoich > 0:
+                products.append((comp_id, stoich))
+        for list_tag, refs in (("listOfReactants", reactants), ("listOfProducts", products)):
+            if not refs:
+                continue
+            fp.write(f"        <{list_tag}>\n")
+            for comp_id, stoich in refs:
+                comp_id = self.encode_id(comp_id, self.COMPOUND_PREFIX)
+                fp.write(f'          <speciesReference species={quoteattr(comp_id)} '
+                         f'stoichiometry="{self._format_float(stoich)}" constant="true"/>\n')
+            fp.write(f"        </{list_tag}>\n")
+
+        tree = self._parse_gene_rule(rxn.get("gene_reaction_rule"))
+        if tree is not None:
+            fp.write("        <fbc:geneProductAssociation>\n")
+            self._write_gene_rule(fp, tree, gene_ids, indent=10)
+            fp.write("        </fbc:geneProductAssociation>\n")
+
+        fp.write("      </reaction>\n")
@@ -0,0 +1,246 @@
+
+import numpy as np
+from scipy.sparse import csc_matrix, csr_matrix
+
+from ..compartment.compartment import Compartment
+from ..reaction.reaction import Reaction
+
+
+class NetworkCore:
+    """
+    Class that represents the compact core of a network.
+
+    The core is a read-only and array-based view of a network for the array-based algorithms (gap finding,
+    gap filling, graphs, bounds): the compounds, the reactions and the compartments are integer-indexed tables
+    (the compartment of each compound is stored as a code, i.e. the index of its compartment), the flags and
+    the bounds are numpy arrays and the stoichiometry is stored as a CSR matrix (compounds x reactions).
+
+    A core is either derived from a `NetworkData` (the compounds and reactions of the network remain the source
+    of truth, the core is cached until the network changes, see `NetworkData.get_core`), or read directly from
+    the arrays of a binary network file (see `from_arrays`), in which case no compound and no reaction is
+    created. It must not be modified.
+
+    :property compound_ids: The ids of the compounds (row order)
+    :type compound_ids: `list[str]`
+    :property compound_chebi_ids: The chebi ids of the compounds ("" if unknown)
+    :type compound_chebi_ids: `list[str]`
+    :property compound_compartments: The compartment codes of the compounds (-1 for the compounds used by
+    a reaction but not registered in the network)
+    :type compound_compartments: `numpy.ndarray`
+    :property compound_is_steady: True for the compounds of steady compartments
+    :type compound_is_steady: `numpy.ndarray`
+    :property compound_is_biomass: True for the compounds of the biomass compartment
+    :type compound_is_biomass: `numpy.ndarray`
+    :property compartment_ids: The ids of the compartments (code order)
+    :type compartment_ids: `list[str]`
+    :property compartment_is_steady: True for the steady compartments
+    :type compartment_is_steady: `numpy.ndarray`
+    :property compartment_is_biomass: True for the biomass compartment
+    :type compartment_is_biomass: `numpy.ndarray`
+    :property reaction_ids: The ids of the reactions (column order)
+    :type reaction_ids: `list[str]`
+    :property reaction_rhea_ids: The rhea ids of the reactions ("" if unknown)
+    :type reaction_rhea_ids: `list[str]`
+    :property reaction_lower_bounds: The lower bounds of the reactions
+    :type reaction_lower_bounds: `numpy.ndarray`
+    :property reaction_upper_bounds: The upper bounds of the reactions
+    :type reaction_upper_bounds: `numpy.ndarray`
+    :property S: The stoichiometric matrix
+    :type S: `scipy.sparse.csr_matrix`
+    """
+
+    compound_ids: list[str] = None
+    compound_chebi_ids: list[str] = None
+    compound_compartments: np.ndarray = None
+    compound_is_steady: np.ndarray = None
+    compound_is_biomass: np.ndarray = None
+    compartment_ids: list[str] = None
+    compartment_is_steady: np.ndarray = None
+    compartment_is_biomass: np.ndarray = None
+    reaction_ids: list[str] = None
+    reaction_rhea_ids: list[str] = None
+    reaction_lower_bounds: np.ndarray = None
+    reaction_upper_bounds: np.ndarray = None
+    S: csr_matrix = None
+
+    _compound_index: dict[str, int] = None
+    _reaction_index: dict[str, int] = None
+    _S_csc: csc_matrix = None
+
+    def __init__(self, network_data: 'NetworkData' = None):
+        if network_data is None:
+            return
+
+        S, comp_ids, rxn_ids = network_data.create_sparse_stoichiometric_matrix()
+        compartments = list(network_data.compartments.values())
+        compartment_codes = {compartment.id: k for k, compartment in enumerate(compartments)}
+
+        chebi_ids = []
+        codes = np.full(len(comp_ids), -1, dtype=np.int32)
+        for i, comp_id in enumerate(comp_ids):
+            comp = network_data.compounds.peek(comp_id)
+            if comp is None:
+                # compound used by a reaction but not registered in the network
+                chebi_ids.append("")
+                continue
+            chebi_ids.append(comp.chebi_id or "")
+            code = compartment_codes.get(comp.compartment.id)
+            if code is None:
+                code = compartment_codes[comp.compartment.id] = len(compartments)
+                compartments.append(comp.compartment)
+            codes[i] = code
+
+        rxns = list(network_data.reactions.peek_values())
+        self._set_data(
+            S, comp_ids, chebi_ids, codes,
+            compartment_ids=[compartment.id for compartment in compartments],
+            compartment_is_steady=[bool(compartment.is_steady) for compartment in compartments],
+            compartment_is_biomass=[compartment.is_biomass() for compartment in compartments],
+            rxn_ids=rxn_ids,
+            rhea_ids=[rxn.rhea_id or "" for rxn in rxns],
+            lower_bounds=[rxn.lower_bound for rxn in rxns],
+            upper_bounds=[rxn.upper_bound for rxn in rxns])
+
+    def _set_data(self, S: csr_matrix, comp_ids: list[str], chebi_ids: list[str], codes: np.ndarray, *,
+                  compartment_ids: list[str], compartment_is_steady: list[bool], compartment_is_biomass: list[bool],
+                  rxn_ids: list[str], rhea_ids: list[str], lower_bounds: list[float], upper_bounds: list[float]):
+        self.S = S
+        self.compound_ids = comp_ids
+        self.compound_chebi_ids = chebi_ids
+        self.compound_compartments = codes
+        self.compartment_ids = compartment_ids
+        # a last (false) flag is appended for the code -1 of the unregistered compounds
+        self.compartment_is_steady = np.array([*compartment_is_steady, False], dtype=bool)
+        self.compartment_is_biomass = np.array([*compartment_is_biomass, False], dtype=bool)
+        self.compound_is_steady = self.compartment_is_steady[codes]
+        self.compound_is_biomass = self.compartment_is_biomass[codes]
+        self.compartment_is_steady = self.compartment_is_steady[:-1]
+        self.compartment_is_biomass = self.compartment_is_biomass[:-1]
+        self.reaction_ids = rxn_ids
+        self.reaction_rhea_ids = rhea_ids
+        self.reaction_lower_bounds = np.array(lower_bounds, dtype=float)
+        self.reaction_upper_bounds = np.array(upper_bounds, dtype=float)
+        self._compound_index = {comp_id: i for i, comp_id in enumerate(comp_ids)}
+        self._reaction_index = {rxn_id: j for j, rxn_id in enumerate(rxn_ids)}
+
+        for array in (self.compound_compartments, self.compound_is_steady, self.compound_is_biomass,
+                      self.compartment_is_steady, self.compartment_is_biomass,
+                      self.reaction_lower_bounds, self.reaction_upper_bounds):
+            array.setflags(write=False)
+
+    # -- F --
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray]) -> 'NetworkCore':
+        """
+        Create the core of a network from the arrays of a binary network file, without creating the network
+        (see `NetworkDataBinaryHelper.load_arrays`)
+
+        :param arrays: The arrays of the binary file
+        :type arrays: `dict[str, numpy.ndarray]`
+        :return: The core
+        :rtype: `NetworkCore`
+        """
+
+        from .helper.network_data_binary_helper import NetworkDataBinaryHelper
+
+        binary_helper = NetworkDataBinaryHelper()
+        metadata = binary_helper.get_metadata(arrays)
+        S, comp_ids, rxn_ids = binary_helper.get_stoichiometric_matrix(arrays)
+
+        compartments = [Compartment.from_biota(go_id=compart_data["go_id"], default_other=True)
+                        for compart_data in metadata["compartments"]]
+        compartment_ids = [compart_data["id"] for compart_data in metadata["compartments"]]
+        compartment_codes = {compart_id: k for k, compart_id in enumerate(compartment_ids)}
+
+        compounds = {
+            comp_id: (chebi_id or "", compartment_codes.get(compart_id, -1))
+            for comp_id, chebi_id, compart_id in zip(
+                binary_helper.get_str_column(arrays, "compounds.id"),
+                binary_helper.get_str_column(arrays, "compounds.chebi_id"),
+                binary_helper.get_str_column(arrays, "compounds.compartment"))
+        }
+        chebi_ids = []
+        codes = np.full(len(comp_ids), -1, dtype=np.int32)
+        for i, comp_id in enumerate(comp_ids):
+            chebi_id, code = compounds.get(comp_id, ("", -1))
+            chebi_ids.append(chebi_id)
+            codes[i] = code
+
+        # the unknown bounds are the default bounds of the reactions
+        lower_bounds = np.nan_to_num(np.asarray(arrays["reactions.lower_bound"]), nan=Reaction.LOWER_BOUND)
+        upper_bounds = np.nan_to_num(np.asarray(arrays["reactions.upper_bound"]), nan=Reaction.UPPER_BOUND)
+
+        core = cls()
+        core._set_data(
+            S, comp_ids, chebi_ids, codes,
+            compartment_ids=compartment_ids,
+            compartment_is_steady=[bool(compartment.is_steady) if compartment else False
+                                   for compartment in compartments],
+            compartment_is_biomass=[compartment.is_biomass() if compartment else False
+                                    for compartment in compartments],
+            rxn_ids=rxn_ids,
+            rhea_ids=[rhea_id or "" for rhea_id in binary_helper.get_str_column(arrays, "reactions.rhea_id")],
+            lower_bounds=lower_bounds,
+            upper_bounds=upper_bounds)
+        return core
+
+    # -- G --
+
+    def get_compound_index(self, comp_id: str) -> int:
+        """ Get the index of a compound """
+        return self._compound_index[comp_id]
+
+    def get_reaction_index(self, rxn_id: str) -> int:
+        """ Get the index of a reaction """
+        return self._reaction_index[rxn_id]
+
+    def get_compound_compartment_id(self, index: int) -> str:
+        """ Get the id of the compartment of a compound ("" if the compound is not registered in the network) """
+        code = self.compound_compartments[index]
+        return self.compartment_ids[code] if code >= 0 else ""
+
+    def get_compound_stoichiometry(self, index: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the reactions of a compound
+
+        :param index: The index of the compound
+        :type index: `int`
+        :return: The indexes of the reactions and the related stoichiometric coefficients (read-only views)
+        :rtype: `tuple[numpy.ndarray, numpy.ndarray]`
+        """
+
+        start, end = self.S.indptr[index], self.S.indptr[index + 1]
+        return self.S.indices[start:end], self.S.data[start:end]
+
+    def get_reaction_stoichiometry(self, index: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the compounds of a reaction
+
+        :param index: The index of the reaction
+        :type index: `int`
+        :return: The indexes of the compounds and the related stoichiometric coefficients (read-only views)
+        :rtype: `tuple[numpy.ndarray, numpy.ndarray]`
+        """
+
+        S_csc = self.get_csc_matrix()
+        start, end = S_csc.indptr[index], S_csc.indptr[index + 1]
+        return S_csc.indices[start:end], S_csc.data[start:end]
+
+    def get_csc_matrix(self) -> csc_matrix:
+        """ Get the stoichiometric matrix in CSC format (reaction-major) """
+        if self._S_csc is None:
+            self._S_csc = self.S.tocsc()
+        return self._S_csc
+
+    def get_compound_ids_by_mask(self, mask: np.ndarray) -> list[str]:
+        """ Get the ids of the compounds selected by a boolean mask """
+        return [self.compound_ids[i] for i in np.flatnonzero(mask)]
+
+    def get_number_of_compounds(self) -> int:
+        """ Get number of compounds """
+        return len(self.compound_ids)
+
+    def get_number_of_reactions(self) -> int:
+        """ Get number of reactions """
+        return len(self.reaction_ids)
@@ -7,18 +7,25 @@ from gws_biota import Reaction as BiotaReaction
 from gws_biota import Taxonomy as BiotaTaxonomy
 from gws_core import BadRequestException, Logger, SerializableObjectJson, Table
 from pandas import DataFrame
+from scipy.sparse import coo_matrix, csr_matrix
 
 from ..compartment.compartment import Compartment
 from ..compound.compound import Compound
 from ..exceptions.compartment_exceptions import NoCompartmentFound
 from ..exceptions.compound_exceptions import CompoundDuplicate
 from ..exceptions.reaction_exceptions import ReactionDuplicate
+from ..helper.change_tracker_helper import ChangeTrackerHelper
+from ..helper.copy_on_write_dict import CopyOnWriteDict
+from ..helper.formula_helper import FormulaHelper
+from ..helper.numeric_helper import NumericHelper
 from ..helper.slugify_helper import SlugifyHelper
 from ..reaction.reaction import Reaction
-from ..typing.network_typing import NetworkDict, NetworkReconTagDict
+from ..typing.network_typing import FlatStoichiometricBlockDict, NetworkDict, NetworkReconTagDict
 from ..typing.simulation_typing import SimulationDict
 from .helper.network_data_dumper_helper import NetworkDataDumperHelper
 from .helper.network_data_loader_helper import NetworkDataLoaderHelper
+from .network_core import NetworkCore
+from .network_index import NetworkIndex
 
 
 class NetworkData(SerializableObjectJson):
@@ -43,13 +50,18 @@ class NetworkData(SerializableObjectJson):
     _ec_rxn_ids_map: dict[str, str] = None
     _rhea_rxn_ids_map: dict[str, str] = None
     _gpr_rxn_ids_map: dict[str, str] = None
+    _is_metadata_shared: bool = False
+    _stamps: dict[str, int] = None
+    _cached_data: dict[str, tuple] = None
+    _index: NetworkIndex = None
+    _index_key: tuple = None
 
     def __init__(self):
         super().__init__()
         if not self.name:
             self.name = self.DEFAULT_NAME
-            self.compounds = {}
-            self.reactions = {}
+            self.compounds = CopyOnWriteDict(copy_value_fn=self._copy_entity)
+            self.reactions = CopyOnWriteDict(copy_value_fn=self._copy_entity)
             self.compartments = {}
             self.simulations = {}
             self.recon_tags = NetworkReconTagDict(reactions={}, compounds={}, ec_numbers={})
@@ -59,6 +71,9 @@ class NetworkData(SerializableObjectJson):
             self._rhea_rxn_ids_map = {}
             self._gpr_rxn_ids_map = {}
 
+            self._stamps = ChangeTrackerHelper.create_stamps()
+            self._cached_data = {}
+
     def serialize(self) -> NetworkDict:
         """
         Serialize
@@ -88,6 +103,7 @@ class NetworkData(SerializableObjectJson):
         :param sim: The simulation dictionary
         :type sim: `SimulationDict`,
         """
+        self._unshare_metadata()
         id_ = sim["id"]
         self.simulations[id_] = {
             "id": id_,
@@ -110,10 +126,17 @@ class NetworkData(SerializableObjectJson):
         if not comp.compartment:
             raise NoCompartmentFound("No compartment defined for the compound")
 
+        index = self._get_index_if_valid()
         self.compounds[comp.id] = comp
         self.add_compartment(comp.compartment)
+        ChangeTrackerHelper.register(comp, self._stamps)
+        ChangeTrackerHelper.notify(self._stamps)
+        if index is not None:
+            index.add_compound(comp)
+            self._index_key = self._get_index_key()
 
         # update maps
+        self._unshare_metadata()
         if comp.chebi_id:
             if comp.compartment.go_id not in self._compartment_chebi_ids:
                 self._compartment_chebi_ids[comp.compartment.go_id] = {}
@@ -147,9 +170,16 @@ class NetworkData(SerializableObjectJson):
                 self.add_compound(comp)
 
         # add the reaction
+        index = self._get_index_if_valid()
         self.reactions[rxn.id] = rxn
+        ChangeTrackerHelper.register_reaction(rxn, self._stamps)
+        ChangeTrackerHelper.notify(self._stamps)
+        if index is not None:
+            index.add_reaction(rxn)
+            self._index_key = self._get_index_key()
 
         # update maps
+        self._unshare_metadata()
         if rxn.rhea_id:
             self._rhea_rxn_ids_map[rxn.rhea_id] = rxn.id
         if rxn.gene_reaction_rule:
@@ -162,51 +192,176 @@ class NetworkData(SerializableObjectJson):
     def add_compartment(self, compartment: Compartment):
         if not isinstance(compartment, Compartment):
             raise BadRequestException("The compartment must an instance of Compartment")
-        self.compartments[compartment.id] = compartment
+        if self.compartments.get(compartment.id) is not compartment:
+            self.compartments[compartment.id] = compartment
+            ChangeTrackerHelper.notify(self._stamps, ChangeTrackerHelper.TOPOLOGY)
 
     # -- B --
 
     # -- C --
 
     def copy(self) -> 'NetworkData':
+        """
+        Copy the network data
+
+        No compound or reaction is copied: the compounds, the reactions and the metadata (maps, recon tags
+        and simulations) are shared with the copy. A compound or a reaction is only copied when it is
+        accessed for writing in one of the networks (copy-on-write, see `CopyOnWriteDict`), and the metadata
+        are copied on their first update. A compound or a reaction referenced before the copy is shared by
+        both networks and must be accessed again through the network to be modified.
+
+        :return: The copy
+        :rtype: `NetworkData`
+        """
+
+        if not isinstance(self.compounds, CopyOnWriteDict):
+            self.compounds = CopyOnWriteDict(self.compounds, copy_value_fn=self._copy_entity)
+        if not isinstance(self.reactions, CopyOnWriteDict):
+            self.reactions = CopyOnWriteDict(self.reactions, copy_value_fn=self._copy_entity)
+
         net_data: NetworkData = NetworkData()
         net_data.name = self.name
-        net_data.compounds = {k: v.copy() for k, v in self.compounds.items()}
-        net_data.reactions = {k: v.copy() for k, v in self.reactions.items()}
+        net_data.compounds = self.compounds.copy(copy_value_fn=net_data._copy_entity)
+        net_data.reactions = self.reactions.copy(copy_value_fn=net_data._copy_entity)
         net_data.compartments = {k: v.copy() for k, v in self.compartments.items()}
-        net_data.simulations = copy.deepcopy(self.simulations)
-        net_data.recon_tags = copy.deepcopy(self.recon_tags)
+        net_data.simulations = self.simulations
+        net_data.recon_tags = self.recon_tags
 
-        net_data._compartment_chebi_ids = copy.deepcopy(self._compartment_chebi_ids)
-        net_data._ec_rxn_ids_map = copy.deepcopy(self._ec_rxn_ids_map)
-        net_data._rhea_rxn_ids_map = copy.deepcopy(self._rhea_rxn_ids_map)
-        net_data._gpr_rxn_ids_map = copy.deepcopy(self._gpr_rxn_ids_map)
+        net_data._compartment_chebi_ids = self._compartment_chebi_ids
+        net_data._ec_rxn_ids_map = self._ec_rxn_ids_map
+        net_data._rhea_rxn_ids_map = self._rhea_rxn_ids_map
+        net_data._gpr_rxn_ids_map = self._gpr_rxn_ids_map
+
+        self._is_metadata_shared = True
+        net_data._is_metadata_shared = True
+
+        # the data derived from the network remain valid for the copy (the indexes are mutable and are
+        # recreated on demand)
+        net_data._stamps = dict(self._stamps)
+        net_data._cached_data = dict(self._cached_data)
         return net_data
 
+    def _copy_entity(self, entity: Compound | Reaction) -> Compound | Reaction:
+        """ Copy a compound or a reaction shared with other networks before its update in this network """
+        entity = entity.copy()
+        if isinstance(entity, Reaction):
+            ChangeTrackerHelper.register_reaction(entity, self._stamps)
+        else:
+            ChangeTrackerHelper.register(entity, self._stamps)
+        return entity
+
+    def compute_mass_and_charge_balance(self) -> DataFrame:
+        """
+        Compute the mass, charge and element balances of all the reactions of the network.
+
+        The balances are computed at once from the stoichiometric matrix, with the convention of
+        `Reaction.compute_mass_and_charge_balance` (substrates minus products). The balance of a reaction is NaN
+        if the value (or formula) of one of its compounds is unknown. The result is cached until the network
+        changes and must therefore not be modified.
+
+        :return: The balances (rows: reactions, columns: `mass`, `charge` and one column per element)
+        :rtype: `DataFrame`
+        """
+
+        return self._get_cached_data(
+            "mass_and_charge_balance",
+            self._compute_mass_and_charge_balance,
+            channels=(ChangeTrackerHelper.TOPOLOGY, ChangeTrackerHelper.CHEMISTRY)
+        )
+
+    def _compute_mass_and_charge_balance(self) -> DataFrame:
+        def _to_float(val):
+            if isinstance(val, (int, float)) and not isinstance(val, bool):
+                return float(val)
+            if isinstance(val, str) and NumericHelper.isfloat(val):
+                return float(val)
+            return np.nan
+
+        S, comp_ids, rxn_ids = self.create_sparse_stoichiometric_matrix()
+        values = np.full((len(comp_ids), 2), np.nan)
+        formulas = [None] * len(comp_ids)
+        elements = {}
+        for i, comp_id in enumerate(comp_ids):
+            comp = self.compounds.peek(comp_id)
+            if comp is None:
+                # compound used by a reaction but not registered in the network
+                continue
+            values[i, 0] = _to_float(comp.mass)
+            values[i, 1] = _to_float(comp.charge)
+            formulas[i] = FormulaHelper.parse(comp.formula)
+            for element in (formulas[i] or {}):
+                elements.setdefault(element, len(elements))
+
+        element_counts = np.zeros((len(comp_ids), len(elements)))
+        for i, formula in enumerate(formulas):
+            if formula is None:
+                element_counts[i, :] = np.nan
+                continue
+            for element, count in formula.items():
+                element_counts[i, elements[element]] = count
+
+        # only the non-zero stoichiometric coefficients are involved in the products
+        S_t = S.transpose().tocsr()
+        return DataFrame(
+            index=rxn_ids,
+            columns=["mass", "charge", *elements],
+            data=np.hstack([-(S_t @ values), -(S_t @ element_counts)])
+        )
+
     def create_stoichiometric_matrix(self) -> DataFrame:
         """
         Create the full stoichiometric matrix of the network
         """
-        rxn_ids = list(self.reactions.keys())
-        comp_ids = list(self.compounds.keys())
-        S = DataFrame(
+
+        S, comp_ids, rxn_ids = self.create_sparse_stoichiometric_matrix()
+        return DataFrame(
             index=comp_ids,
             columns=rxn_ids,
-            data=np.zeros((len(comp_ids), len(rxn_ids)))
+            data=S.toarray()
         )
 
-        for rxn_id, rxn in self.reactions.items():
-            for substrate in rxn.substrates.values():
-                comp_id = substrate.compound.id
-                stoich = substrate.stoich
-                S.at[comp_id, rxn_id] -= stoich
+    def create_sparse_stoichiometric_matrix(self) -> tuple[csr_matrix, list[str], list[str]]:
+        """
+        Create the full stoichiometric matrix of the network as a sparse matrix.
 
-            for product in rxn.products.values():
-                comp_id = product.compound.id
-                stoich = product.stoich
-                S.at[comp_id, rxn_id] += stoich
+        The matrix is cached until the network changes and must therefore not be modified.
 
-        return S
+        :return: The stoichiometric matrix, the ids of the compounds (rows) and the ids of the reactions (columns)
+        :rtype: `tuple[csr_matrix, list[str], list[str]]`
+        """
+
+        return self._get_cached_data(
+            "stoichiometric_matrix",
+            self._create_sparse_stoichiometric_matrix,
+            channels=(ChangeTrackerHelper.TOPOLOGY,)
+        )
+
+    def _create_sparse_stoichiometric_matrix(self) -> tuple[csr_matrix, list[str], list[str]]:
+        rxn_ids = list(self.reactions.keys())
+        comp_ids = list(self.compounds.keys())
+        comp_index = {comp_id: i for i, comp_id in enumerate(comp_ids)}
+
+        rows = []
+        cols = []
+        data = []
+        for j, rxn in enumerate(self.reactions.peek_values()):
+            for sign, reaction_compounds in ((-1.0, rxn.substrates), (1.0, rxn.products)):
+                for reaction_compound in reaction_compounds.values():
+                    comp_id = reaction_compound.compound.id
+                    if comp_id not in comp_index:
+                        # compound not registered in the network
+                        comp_index[comp_id] = len(comp_ids)
+                        comp_ids.append(comp_id)
+                    rows.append(comp_index[comp_id])
+                    cols.append(j)
+                    data.append(sign * reaction_compound.stoich)
+
+        # duplicate entries are summed
+        S = coo_matrix(
+            (np.array(data, dtype=float), (np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64))),
+            shape=(len(comp_ids), len(rxn_ids))
+        ).tocsr()
+        return S, comp_ids, rxn_ids
 
     def create_steady_stoichiometric_matrix(self, ignore_cofactors=False) -> DataFrame:
         """
@@ -217,7 +372,7 @@ class NetworkData(SerializableObjectJson):
         """
 
         S = self.create_stoichiometric_matrix()
-        names = list(self.get_steady_compounds(ignore_cofactors=ignore_cofactors).keys())
+        names = self._get_steady_compound_ids(ignore_cofactors=ignore_cofactors)
         return S.loc[names, :]
 
     def create_non_steady_stoichiometric_matrix(self, include_biomass=True, ignore_cofactors=False) -> DataFrame:
@@ -229,7 +384,7 @@ class NetworkData(SerializableObjectJson):
         """
 
         S = self.create_stoichiometric_matrix()
-        names = list(self.get_non_steady_compounds(ignore_cofactors=ignore_cofactors).keys())
+        names = self._get_steady_compound_ids(ignore_cofactors=ignore_cofactors, steady=False)
         return S.loc[names, :]
 
     def create_input_stoichiometric_matrix(self, include_biomass=True, ignore_cofactors=False) -> DataFrame:
@@ -299,12 +454,15 @@ class NetworkData(SerializableObjectJson):
 
         return comp.id in self.compounds
 
-    def reaction_exists(self, rxn: Reaction) -> bool:
+    def reaction_exists(self, rxn: Reaction, check_signature: bool = False) -> bool:
         """
         Check that a reaction exists in the network
 
         :param rxn: The reaction
         :type rxn: `gws.gena.Reaction`
+        :param check_signature: If True, the reaction also exists if a reaction with the same signature (i.e. a
+        duplicate with another id, see `Reaction.get_signature`) exists
+        :type check_signature: `bool`
         :return: True if the reaction exists, False otherwise
         :rtype: `bool`
         """
@@ -312,7 +470,11 @@ class NetworkData(SerializableObjectJson):
         if not isinstance(rxn, Reaction):
             raise BadRequestException("The reaction must be an instance of Reaction")
 
-        return rxn.id in self.reactions
+        if rxn.id in self.reactions:
+            return True
+        if check_signature:
+            return rxn.get_signature() in self._get_index().signature_reaction_ids
+        return False
 
     # -- E --
 
@@ -357,6 +519,43 @@ class NetworkData(SerializableObjectJson):
         Logger.info(f"{nb_rxn} reaction loaded. Done!")
         return net_data
 
+    def create_flat_stoichiometric_block(self) -> FlatStoichiometricBlockDict:
+        """
+        Create the block of the network in the stoichiometric matrix of a multi-network twin.
+
+        The ids of the compounds and reactions are flattened. Extracellular environment compounds are
+        shared by all the networks of a twin. The block is cached until the network changes.
+
+        :return: The block
+        :rtype: `FlatStoichiometricBlockDict`
+        """
+
+        return self._get_cached_data(
+            "flat_stoichiometric_block",
+            self._create_flat_stoichiometric_block,
+            channels=(ChangeTrackerHelper.TOPOLOGY,),
+            extra_key=self.name
+        )
+
+    def _create_flat_stoichiometric_block(self) -> FlatStoichiometricBlockDict:
+        S, comp_ids, rxn_ids = self.create_sparse_stoichiometric_matrix()
+        flat_comp_ids = []
+        is_shared = np.zeros(len(comp_ids), dtype=bool)
+        for i, comp_id in enumerate(comp_ids):
+            comp = self.compounds.peek(comp_id)
+            if comp is not None and comp.compartment.is_extracellular_region_environment():
+                flat_comp_ids.append(comp_id)
+                is_shared[i] = True
+            else:
+                flat_comp_ids.append(self.name + self.DELIMITER + comp_id)
+
+        return FlatStoichiometricBlockDict(
+            matrix=S,
+            compound_ids=flat_comp_ids,
+            reaction_ids=[self.name + self.DELIMITER + rxn_id for rxn_id in rxn_ids],
+            is_shared_compound=is_shared
+        )
+
     def flatten_reaction_id(self, rxn: Reaction) -> str:
         """ Flatten the id of a reaction """
         if not isinstance(rxn, Reaction):
@@ -402,6 +601,52 @@ class NetworkData(SerializableObjectJson):
 
     # -- G --
 
+    def _get_cached_data(self, name: str, create_fn, channels: tuple = ChangeTrackerHelper.CHANNELS, extra_key=None):
+        """
+        Get data derived from the network. The data are created using `create_fn` and cached until
+        the network changes on one of the given channels.
+        """
+
+        key = (ChangeTrackerHelper.get_key(self._stamps, channels), extra_key)
+        cached = self._cached_data.get(name)
+        if cached is None or cached[0] != key:
+            cached = (key, create_fn())
+            self._cached_data[name] = cached
+        return cached[1]
+
+    def _get_index(self) -> NetworkIndex:
+        """ Get the secondary indexes of the network. They are created if they are not valid. """
+        if self._get_index_if_valid() is None:
+            self._index = NetworkIndex.create(self)
+            self._index_key = self._get_index_key()
+        return self._index
+
+    def _get_index_if_valid(self) -> NetworkIndex:
+        """ Get the secondary indexes if they are up to date with the network, `None` otherwise """
+        if self._index is not None and self._index_key == self._get_index_key():
+            return self._index
+        return None
+
+    def _get_index_key(self) -> tuple:
+        return ChangeTrackerHelper.get_key(self._stamps, (ChangeTrackerHelper.TOPOLOGY,))
+
+    def get_core(self) -> NetworkCore:
+        """
+        Get the compact core of the network, i.e. a read-only and array-based view derived from the network.
+
+        The core is cached until the topology or the bounds of the network change and must therefore not be
+        modified.
+
+        :return: The core
+        :rtype: `NetworkCore`
+        """
+
+        return self._get_cached_data(
+            "core",
+            lambda: NetworkCore(self),
+            channels=(ChangeTrackerHelper.TOPOLOGY, ChangeTrackerHelper.BOUNDS)
+        )
+
     def get_compound_recon_tag(self, comp_id: str, tag_name: str = None):
         """
         Get a compound recon_tag value a compound id and a recon_tag name.
@@ -581,15 +826,15 @@ class NetworkData(SerializableObjectJson):
 
     def get_reactions_related_to_chebi_id(self, chebi_id: str) -> list[Reaction]:
         """ Get the reactions related to a compound with having a given CheBI ID """
-        rxns = []
         comps = self.get_compounds_by_chebi_id(chebi_id)
         if not comps:
-            return rxns
-        for rxn in self.reactions.values():
-            for comp in comps:
-                if comp.id in rxn.products or comp.id in rxn.substrates:
-                    rxns.append(rxn)
-        return rxns
+            return []
+        index = self._get_index()
+        rxn_ids = {}
+        for comp in comps:
+            for rxn_id in index.get_reaction_ids_of_compound(comp.id):
+                rxn_ids[rxn_id] = None
+        return [self.reactions[rxn_id] for rxn_id in rxn_ids]
 
     def get_biomass_reaction(self) -> Reaction:
         """
@@ -599,9 +844,9 @@ class NetworkData(SerializableObjectJson):
         :rtype: `gena.network.Reaction` or `None`
         """
 
-        for rxn in self.reactions.values():
-            if rxn.is_biomass_reaction():
-                return rxn
+        index = self._get_index()
+        for rxn_id in index.biomass_reaction_ids:
+            return self.reactions[rxn_id]
         return None
 
     def get_biomass_compound(self) -> Compound:
@@ -612,9 +857,9 @@ class NetworkData(SerializableObjectJson):
         :rtype: `gena.network.Compound`
         """
 
-        for comp in self.compounds.values():
-            if comp.is_biomass():
-                return comp
+        index = self._get_index()
+        for comp_id in index.biomass_compound_ids:
+            return self.compounds[comp_id]
         return None
 
     def get_compounds_by_compartments(self, compartment_go_ids: list[str] = None) -> dict[str, Compound]:
@@ -625,12 +870,26 @@ class NetworkData(SerializableObjectJson):
         :rtype: List[`gena.network.Compound`]
         """
 
+        index = self._get_index()
         comps = {}
-        for comp_id, comp in self.compounds.items():
-            if comp.compartment.go_id in compartment_go_ids:
-                comps[comp_id] = comp
+        for go_id in compartment_go_ids:
+            for comp_id in index.compartment_compound_ids.get(go_id, {}):
+                comps[comp_id] = self.compounds[comp_id]
         return comps
 
+    def get_duplicate_reaction_ids(self, rxn: Reaction) -> list[str]:
+        """
+        Get the ids of the reactions of the network that have the same signature as a reaction (see
+        `Reaction.get_signature`)
+
+        :param rxn: The reaction
+        :type rxn: `gws.gena.Reaction`
+        :return: The ids of the duplicate reactions (including the reaction if it is in the network)
+        :rtype: `list[str]`
+        """
+
+        return self._get_index().get_reaction_ids_of_signature(rxn.get_signature())
+
     def get_steady_compounds(self, ignore_cofactors=False) -> dict[str, Compound]:
         """
         Get the steady compounds
@@ -639,14 +898,8 @@ class NetworkData(SerializableObjectJson):
         :rtype: List[`gena.network.Compound`]
         """
 
-        comps = {}
-        for comp_id, comp in self.compounds.items():
-            if comp.is_steady():
-                if ignore_cofactors and comp.is_cofactor():
-                    continue
-                else:
-                    comps[comp_id] = comp
-        return comps
+        comp_ids = self._get_steady_compound_ids(ignore_cofactors=ignore_cofactors)
+        return {comp_id: self.compounds[comp_id] for comp_id in comp_ids}
 
     def get_non_steady_compounds(self, ignore_cofactors=False) -> dict[str, Compound]:
         """
@@ -656,14 +909,15 @@ class NetworkData(SerializableObjectJson):
         :rtype: List[`gena.network.Compound`]
         """
 
-        comps = {}
-        for comp_id, comp in self.compounds.items():
-            if not comp.is_steady():
-                if ignore_cofactors and comp.is_cofactor():
-                    continue
-                else:
-                    comps[comp_id] = comp
-        return comps
+        comp_ids = self._get_steady_compound_ids(ignore_cofactors=ignore_cofactors, steady=False)
+        return {comp_id: self.compounds[comp_id] for comp_id in comp_ids}
+
+    def _get_steady_compound_ids(self, ignore_cofactors=False, steady=True) -> list[str]:
+        index = self._get_index()
+        comp_ids = index.steady_compound_ids if steady else index.non_steady_compound_ids
+        if ignore_cofactors:
+            return [comp_id for comp_id in comp_ids if not self.compounds.peek(comp_id).is_cofactor()]
+        return list(comp_ids)
 
     def get_reaction_bounds(self) -> DataFrame:
         """
@@ -673,14 +927,12 @@ class NetworkData(SerializableObjectJson):
         :rtype: `DataFrame`
         """
 
-        bounds = DataFrame(
-            index=self.get_reaction_ids(),
+        core = self.get_core()
+        return DataFrame(
+            index=list(core.reaction_ids),
             columns=["lb", "ub"],
-            data=np.zeros((len(self.reactions), 2))
+            data=np.column_stack([core.reaction_lower_bounds, core.reaction_upper_bounds])
         )
-        for rxn_id, rxn in self.reactions.items():
-            bounds.loc[rxn_id, :] = [rxn.lower_bound, rxn.upper_bound]
-        return bounds
 
     def get_number_of_reactions(self) -> int:
         """ Get number of reactions """
@@ -699,7 +951,7 @@ class NetworkData(SerializableObjectJson):
         helper = GapFinderHelper()
         dem = helper.find_deadend_compound_ids(self)
         urxn = {}
-        for rxn_id, rxn in self.reactions.items():
+        for rxn_id, rxn in self.reactions.peek_items():
             balance = rxn.compute_mass_and_charge_balance()
             if (balance["charge"] is not None and balance["charge"] > 0) or \
                     (balance["mass"] is not None and balance["mass"] > 0):
@@ -743,7 +995,7 @@ class NetworkData(SerializableObjectJson):
             stats["compounds"][comp_id] = {
                 "count": 0
             }
-        for rxn in self.reactions.values():
+        for rxn in self.reactions.peek_values():
             for comp_id in rxn.products:
                 stats["compounds"][comp_id]["count"] += 1
             for comp_id in rxn.substrates:
@@ -756,7 +1008,7 @@ class NetworkData(SerializableObjectJson):
     # -- H --
 
     def has_sink(self) -> bool:
-        for comp in self.compounds.values():
+        for comp in self.compounds.peek_values():
             if comp.is_sink():
                 return True
 
@@ -784,6 +1036,28 @@ class NetworkData(SerializableObjectJson):
             add_biomass=add_biomass
         )
 
+    @classmethod
+    def loads_file(
+            cls, file_path: str, *,
+            biomass_reaction_id: str = None,
+            skip_orphans: bool = False,
+            replace_unknown_compartments: bool = False,
+            biomass_metabolite_id_user: str = None,
+            add_biomass: bool = False,
+            message_dispatcher=None) -> 'NetworkData':
+        """ Load a JSON network dump file and create a Network. The file is read incrementally. """
+
+        helper = NetworkDataLoaderHelper()
+        helper.attach_message_dispatcher(message_dispatcher)
+        return helper.loads_file(
+            file_path,
+            biomass_reaction_id=biomass_reaction_id,
+            skip_orphans=skip_orphans,
+            replace_unknown_compartments=replace_unknown_compartments,
+            biomass_metabolite_id_user=biomass_metabolite_id_user,
+            add_biomass=add_biomass
+        )
+
     # -- N --
 
     # -- P --
@@ -802,15 +1076,28 @@ class NetworkData(SerializableObjectJson):
             raise BadRequestException("The compound id must be a string")
 
         comp = self.compounds[comp_id]
+        index = self._get_index()
+        rxn_ids = index.get_reaction_ids_of_compound(comp_id)
 
-        for rxn in self.reactions.values():
+        for rxn_id in rxn_ids:
+            rxn = self.reactions.peek(rxn_id)
+            if rxn is None:
+                continue
             if comp_id in rxn.products:
-                rxn.remove_product(comp)
+                self.reactions[rxn_id].remove_product(comp)
                 continue
             if comp_id in rxn.substrates:
-                rxn.remove_substrate(comp)
+                self.reactions[rxn_id].remove_substrate(comp)
 
         del self.compounds[comp_id]
+        ChangeTrackerHelper.notify(self._stamps)
+
+        index.remove_compound(comp)
+        for rxn_id in rxn_ids:
+            rxn = self.reactions.peek(rxn_id)
+            if rxn is not None:
+                index.update_reaction(rxn)
+        self._index_key = self._get_index_key()
 
     def remove_reaction(self, rxn_id: str):
         """
@@ -823,7 +1110,13 @@ class NetworkData(SerializableObjectJson):
         if not isinstance(rxn_id, str):
             raise BadRequestException("The reaction id must be a string")
 
+        index = self._get_index_if_valid()
+        rxn = self.reactions.peek(rxn_id)
         del self.reactions[rxn_id]
+        ChangeTrackerHelper.notify(self._stamps)
+        if index is not None:
+            index.remove_reaction(rxn)
+            self._index_key = self._get_index_key()
 
     def get_compound_stats_as_json(self, **kwargs) -> dict:
         """ Get compound stats as JSON """
@@ -833,7 +1126,7 @@ class NetworkData(SerializableObjectJson):
         """ Get compound stats as table """
         dict_ = self.generate_stats()["compounds"]
         for comp_id in dict_.keys():
-            dict_[comp_id]["chebi_id"] = self.compounds[comp_id].chebi_id
+            dict_[comp_id]["chebi_id"] = self.compounds.peek(comp_id).chebi_id
 
         df = DataFrame.from_dict(dict_, columns=["count", "frequency", "chebi_id"], orient="index")
         df = df.sort_values(by=['frequency'], ascending=False)
@@ -843,7 +1136,7 @@ class NetworkData(SerializableObjectJson):
     def get_total_abs_flux_as_table(self) -> Table:
         """ Get the total absolute flux as table """
         total_flux = 0
-        for rxn in self.reactions.values():
+        for rxn in self.reactions.peek_values():
             flux_estimates = rxn.get_data_slot("flux_estimates")
             if flux_estimates is not None:
                 total_flux += abs(flux_estimates["values"][0])
@@ -858,7 +1151,49 @@ class NetworkData(SerializableObjectJson):
 
     # -- S --
 
+    def set_sparse_stoichiometric_matrix(self, S: csr_matrix, comp_ids: list[str], rxn_ids: list[str]) -> bool:
+        """
+        Set the sparse stoichiometric matrix of the network when it is already known (e.g. assembled from the
+        blocks of a twin, see `TwinHelper.create_block_stoichiometric_matrix`), instead of building it from the
+        reactions. The rows and columns are reordered as the compounds and reactions of the network. The matrix
+        is cached like the one of `create_sparse_stoichiometric_matrix`, until the network changes.
+
+        :param S: The stoichiometric matrix
+        :type S: `csr_matrix`
+        :param comp_ids: The ids of the compounds (rows)
+        :type comp_ids: `list[str]`
+        :param rxn_ids: The ids of the reactions (columns)
+        :type rxn_ids: `list[str]`
+        :return: False if the compounds or the reactions do not match the ones of the network (nothing is set)
+        :rtype: `bool`
+        """
+
+        net_comp_ids = list(self.compounds.keys())
+        net_rxn_ids = list(self.reactions.keys())
+        if len(comp_ids) != len(net_comp_ids) or len(rxn_ids) != len(net_rxn_ids):
+            return False
+        comp_index = {comp_id: i for i, comp_id in enumerate(comp_ids)}
+        rxn_index = {rxn_id: j for j, rxn_id in enumerate(rxn_ids)}
+        if any(comp_id not in comp_index for comp_id in net_comp_ids) or \
+                any(rxn_id not in rxn_index for rxn_id in net_rxn_ids):
+            return False
+
+        rows = [comp_index[comp_id] for comp_id in net_comp_ids]
+        cols = [rxn_index[rxn_id] for rxn_id in net_rxn_ids]
+        self._set_cached_data(
+            "stoichiometric_matrix",
+            (S[rows, :][:, cols].tocsr(), net_comp_ids, net_rxn_ids),
+            channels=(ChangeTrackerHelper.TOPOLOGY,)
+        )
+        return True
+
+    def _set_cached_data(self, name: str, data, channels: tuple = ChangeTrackerHelper.CHANNELS, extra_key=None):
+        """ Set data derived from the network, cached until the network changes on one of the given channels """
+        key = (ChangeTrackerHelper.get_key(self._stamps, channels), extra_key)
+        self._cached_data[name] = (key, data)
+
     def set_recon_tags(self, recon_tags: NetworkReconTagDict) -> dict:
+        self._unshare_metadata()
         self.recon_tags = recon_tags
 
     # -- T --
@@ -871,7 +1206,7 @@ class NetworkData(SerializableObjectJson):
         """
 
         _str = ""
-        for rxn in self.reactions.values():
+        for rxn in self.reactions.peek_values():
             _str += "\n" + rxn.to_str()
         return _str
 
@@ -915,7 +1250,7 @@ class NetworkData(SerializableObjectJson):
         ]
 
         table = {}
-        for rxn in self.reactions.values():
+        for rxn in self.reactions.peek_values():
             data = {}
             for k in column_names:
                 data[k] = []
@@ -1047,12 +1382,25 @@ class NetworkData(SerializableObjectJson):
 
     # -- U --
 
+    def _unshare_metadata(self):
+        """ Creates private copies of the metadata shared with other copies of the network before their update """
+        if not self._is_metadata_shared:
+            return
+        self.simulations = copy.deepcopy(self.simulations)
+        self.recon_tags = copy.deepcopy(self.recon_tags)
+        self._compartment_chebi_ids = {k: dict(v) for k, v in self._compartment_chebi_ids.items()}
+        self._ec_rxn_ids_map = dict(self._ec_rxn_ids_map)
+        self._rhea_rxn_ids_map = dict(self._rhea_rxn_ids_map)
+        self._gpr_rxn_ids_map = dict(self._gpr_rxn_ids_map)
+        self._is_metadata_shared = False
+
     def update_ec_recon_tag(self, tag_id, tag: dict):
         """
         Update a ec recon tag
         """
         if not isinstance(tag, dict):
             raise BadRequestException("The tag must be a dictionary")
+        self._unshare_metadata()
         if "ec_numbers" not in self.recon_tags:
             self.recon_tags["ec_numbers"] = {}
         if tag_id not in self.recon_tags["ec_numbers"]:
@@ -1066,6 +1414,7 @@ class NetworkData(SerializableObjectJson):
 
         if not isinstance(tag, dict):
             raise BadRequestException("The tag must be a dictionary")
+        self._unshare_metadata()
         if "reactions" not in self.recon_tags:
             self.recon_tags["reactions"] = {}
         if tag_id not in self.recon_tags["reactions"]:
@@ -1078,6 +1427,7 @@ class NetworkData(SerializableObjectJson):
         """
         if not isinstance(tag, dict):
             raise BadRequestException("The tag must be a dictionary")
+        self._unshare_metadata()
         if "compounds" not in self.recon_tags:
             self.recon_tags["compounds"] = {}
         if tag_id not in self.recon_tags["compounds"]:
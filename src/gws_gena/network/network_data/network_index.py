@@ -0,0 +1,137 @@
+
+from ..compound.compound import Compound
+from ..reaction.reaction import Reaction
+
+
+class NetworkIndex:
+    """
+    Class that represents the secondary indexes of a network.
+
+    The indexes are used for the common lookups (reactions of a compound, biomass reaction and compound,
+    compounds of a compartment, steady and non-steady compounds). They only store ids, in insertion order, and
+    are maintained by the `NetworkData` when compounds and reactions are added or removed.
+
+    :property compound_reaction_ids: The ids of the reactions of each compound
+    :type compound_reaction_ids: `dict[str, dict[str, None]]`
+    :property compartment_compound_ids: The ids of the compounds of each compartment (by GO id)
+    :type compartment_compound_ids: `dict[str, dict[str, None]]`
+    :property signature_reaction_ids: The ids of the reactions of each signature (see `Reaction.get_signature`)
+    :type signature_reaction_ids: `dict[tuple, dict[str, None]]`
+    """
+
+    compound_reaction_ids: dict[str, dict[str, None]] = None
+    biomass_reaction_ids: dict[str, None] = None
+    biomass_compound_ids: dict[str, None] = None
+    compartment_compound_ids: dict[str, dict[str, None]] = None
+    steady_compound_ids: dict[str, None] = None
+    non_steady_compound_ids: dict[str, None] = None
+    signature_reaction_ids: dict[tuple, dict[str, None]] = None
+    _reaction_signatures: dict[str, tuple] = None
+
+    def __init__(self):
+        self.compound_reaction_ids = {}
+        self.biomass_reaction_ids = {}
+        self.biomass_compound_ids = {}
+        self.compartment_compound_ids = {}
+        self.steady_compound_ids = {}
+        self.non_steady_compound_ids = {}
+        self.signature_reaction_ids = {}
+        self._reaction_signatures = {}
+
+    # -- A --
+
+    def add_compound(self, comp: Compound):
+        """ Index a compound """
+        comp_id = comp.id
+        go_id = comp.compartment.go_id
+        if go_id not in self.compartment_compound_ids:
+            self.compartment_compound_ids[go_id] = {}
+        self.compartment_compound_ids[go_id][comp_id] = None
+
+        if comp.is_steady():
+            self.steady_compound_ids[comp_id] = None
+        else:
+            self.non_steady_compound_ids[comp_id] = None
+        if comp.is_biomass():
+            self.biomass_compound_ids[comp_id] = None
+
+    def add_reaction(self, rxn: Reaction):
+        """ Index a reaction """
+        for reaction_compounds in (rxn.substrates, rxn.products):
+            for comp_id in reaction_compounds:
+                if comp_id not in self.compound_reaction_ids:
+                    self.compound_reaction_ids[comp_id] = {}
+                self.compound_reaction_ids[comp_id][rxn.id] = None
+        self.update_reaction(rxn)
+
+    # -- C --
+
+    @classmethod
+    def create(cls, network_data: 'NetworkData') -> 'NetworkIndex':
+        """ Create the indexes of a network """
+        index = cls()
+        for comp in network_data.compounds.peek_values():
+            index.add_compound(comp)
+        for rxn in network_data.reactions.peek_values():
+            index.add_reaction(rxn)
+        return index
+
+    # -- G --
+
+    def get_reaction_ids_of_compound(self, comp_id: str) -> list[str]:
+        """ Get the ids of the reactions of a compound """
+        return list(self.compound_reaction_ids.get(comp_id, {}))
+
+    def get_reaction_ids_of_signature(self, signature: tuple) -> list[str]:
+        """ Get the ids of the reactions with a given signature """
+        return list(self.signature_reaction_ids.get(signature, {}))
+
+    # -- R --
+
+    def remove_compound(self, comp: Compound) -> list[str]:
+        """
+        Remove a compound from the indexes
+
+        :return: The ids of the reactions of the compound
+        :rtype: `list[str]`
+        """
+
+        comp_id = comp.id
+        compartment_comp_ids = self.compartment_compound_ids.get(comp.compartment.go_id, {})
+        compartment_comp_ids.pop(comp_id, None)
+        self.steady_compound_ids.pop(comp_id, None)
+        self.non_steady_compound_ids.pop(comp_id, None)
+        self.biomass_compound_ids.pop(comp_id, None)
+        return list(self.compound_reaction_ids.pop(comp_id, {}))
+
+    def remove_reaction(self, rxn: Reaction):
+        """ Remove a reaction from the indexes """
+        for reaction_compounds in (rxn.substrates, rxn.products):
+            for comp_id in reaction_compounds:
+                self.compound_reaction_ids.get(comp_id, {}).pop(rxn.id, None)
+        self.biomass_reaction_ids.pop(rxn.id, None)
+        self._remove_reaction_signature(rxn.id)
+
+    def _remove_reaction_signature(self, rxn_id: str):
+        signature = self._reaction_signatures.pop(rxn_id, None)
+        if signature is not None:
+            rxn_ids = self.signature_reaction_ids[signature]
+            rxn_ids.pop(rxn_id, None)
+            if not rxn_ids:
+                del self.signature_reaction_ids[signature]
+
+    # -- U --
+
+    def update_reaction(self, rxn: Reaction):
+        """ Update the biomass status and the signature of a reaction """
+        if rxn.is_biomass_reaction():
+            self.biomass_reaction_ids[rxn.id] = None
+        else:
+            self.biomass_reaction_ids.pop(rxn.id, None)
+
+        self._remove_reaction_signature(rxn.id)
+        signature = rxn.get_signature()
+        self._reaction_signatures[rxn.id] = signature
+        if signature not in self.signature_reaction_ids:
+            self.signature_reaction_ids[signature] = {}
+        self.signature_reaction_ids[signature][rxn.id] = None
@@ -16,6 +16,8 @@ from gws_core import (
 from pandas import DataFrame
 
 from ..network import Network
+from ..network_data.helper.network_data_binary_helper import NetworkDataBinaryHelper
+from ..network_data.helper.network_data_sbml_helper import NetworkDataSBMLHelper
 
 
 @exporter_decorator(
@@ -26,7 +28,7 @@ from ..network import Network
     style=TypingStyle.material_icon(material_icon_name="cloud_upload", background_color="#d9d9d9"),
 )
 class NetworkExporter(ResourceExporter):
-    ALLOWED_FILE_FORMATS = ["json", "csv", "tsv", "txt", "xls", "xlsx"]
+    ALLOWED_FILE_FORMATS = ["json", "npz", "xml", "xml.gz", "csv", "tsv", "txt", "xls", "xlsx"]
     DEFAULT_FILE_FORMAT = "json"
     config_specs: ConfigSpecs = ConfigSpecs(
         {
@@ -52,10 +54,20 @@ class NetworkExporter(ResourceExporter):
         """
 
         file_name = params.get_value("file_name", resource.name or "network")
-        file_format = FileHelper.normalize_extension(params.get_value("file_format", "json"))
+        file_format = params.get_value("file_format", "json")
+        if file_format != "xml.gz":
+            file_format = FileHelper.normalize_extension(file_format)
         file_path = os.path.join(dest_dir, file_name + "." + file_format)
 
-        if file_format in ["xls", "xlsx"]:
+        if file_format == "npz":
+            # binary format, can be memory-mapped (see NetworkDataBinaryHelper)
+            NetworkDataBinaryHelper().dump(resource.dumps(), file_path)
+        elif file_format in ["xml", "xml.gz"]:
+            # SBML (level 3, FBC version 2), compressed with gzip for xml.gz
+            biomass_rxn = resource.get_biomass_reaction()
+            NetworkDataSBMLHelper().dump(
+                resource.dumps(), file_path, objective_reaction_id=biomass_rxn.id if biomass_rxn else None)
+        elif file_format in ["xls", "xlsx"]:
             table: DataFrame = resource.to_dataframe()
             table.to_excel(file_path)
         else:
@@ -14,10 +14,12 @@ from gws_core import (
 )
 
 from ..network import Network
+from ..network_data.helper.network_data_binary_helper import NetworkDataBinaryHelper
+from ..network_data.helper.network_data_sbml_helper import NetworkDataSBMLHelper
 
 
 @importer_decorator("NetworkImporter", human_name="Network importer", source_type=File,
-                    target_type=Network, supported_extensions=["json"],
+                    target_type=Network, supported_extensions=["json", "npz", "xml", "sbml", "gz"],
                     style=TypingStyle.material_icon(material_icon_name="cloud_download", background_color="#d9d9d9"))
 class NetworkImporter(ResourceImporter):
     """ Network Importer Task
@@ -37,6 +39,11 @@ class NetworkImporter(ResourceImporter):
 
     If your model comes from the BIGG database, you don't need to modify your model, this task will import it correctly automatically.
 
+    Networks exported in the binary format (npz) are also supported.
+
+    SBML files (level 3, FBC version 2, `.xml`, `.sbml` or gzip-compressed `.xml.gz`, `.sbml.gz`) are read directly, without
+    converting them to JSON first (see `ConvertXmlToJson`).
+
     """
 
     config_specs: ConfigSpecs = ConfigSpecs({
@@ -57,7 +64,12 @@ class NetworkImporter(ResourceImporter):
         BoolParam(
             human_name="skip orphans compounds", default_value=False,
             visibility=BoolParam.PROTECTED_VISIBILITY,
-            short_description="Set True to skip orphan compounds"), })
+            short_description="Set True to skip orphan compounds"),
+        "streaming":
+        BoolParam(
+            human_name="Streaming import", default_value=False,
+            visibility=BoolParam.PROTECTED_VISIBILITY,
+            short_description="Set True to read the JSON file incrementally and limit the memory usage (for very large raw network dumps)"), })
 
     def import_from_path(self, source: File, params: ConfigParams, target_type: type[Network]) -> Network:
         """
@@ -76,6 +88,7 @@ class NetworkImporter(ResourceImporter):
         biomass_metabolite_id_user = params.get_value(
             "biomass_metabolite_id_user", None)
         add_biomass = params.get_value("add_biomass", False)
+        streaming = params.get_value("streaming", False)
 
         if (add_biomass is True and biomass_metabolite_id_user):
             raise Exception(
@@ -84,6 +97,42 @@ class NetworkImporter(ResourceImporter):
             raise Exception(
                 "A biomass metabolite must be present in the network. Set the biomass_metabolite_id_user parameter with your metabolite or set add_biomass to True.")
 
+        if source.path.endswith(".gz") and not source.path.endswith((".xml.gz", ".sbml.gz")):
+            # "gz" is a supported extension for the compressed SBML files only
+            raise BadRequestException(
+                f"The compressed file {source.path} is not supported. Only the `.xml.gz` and `.sbml.gz` SBML files "
+                "can be imported.")
+
+        if source.path.endswith(".npz"):
+            # binary network dump (see NetworkExporter)
+            data = NetworkDataBinaryHelper().load(source.path, mmap_mode="r")
+            return Network.loads(
+                data,
+                skip_orphans=skip_orphans,
+                replace_unknown_compartments=replace_unknown_compartments,
+                biomass_metabolite_id_user=biomass_metabolite_id_user,
+                add_biomass=add_biomass)
+
+        if source.path.endswith((".xml", ".sbml", ".xml.gz", ".sbml.gz")):
+            # SBML model (see NetworkExporter), read incrementally
+            data = NetworkDataSBMLHelper().load(source.path)
+            return Network.loads(
+                data,
+                skip_orphans=skip_orphans,
+                replace_unknown_compartments=replace_unknown_compartments,
+                biomass_metabolite_id_user=biomass_metabolite_id_user,
+                add_biomass=add_biomass)
+
+        if streaming:
+            # raw network dump, read incrementally
+            return Network.loads_file(
+                source.path,
+                skip_orphans=skip_orphans,
+                replace_unknown_compartments=replace_unknown_compartments,
+                biomass_metabolite_id_user=biomass_metabolite_id_user,
+                add_biomass=add_biomass,
+                message_dispatcher=self.message_dispatcher)
+
         with open(source.path, encoding="utf-8") as fp:
             try:
                 data = json.load(fp)
@@ -1,6 +1,8 @@
 
 from gws_core import (
+    BoolParam,
     ConfigParams,
+    ConfigSpecs,
     InputSpec,
     InputSpecs,
     OutputSpec,
@@ -32,11 +34,19 @@ class NetworkMerger(Task):
     output_specs = OutputSpecs({'network': OutputSpec(Network, human_name="Merged network",
                                                       short_description="The merged network")})
 
-    def run(self, _: ConfigParams, inputs: TaskInputs) -> TaskOutputs:
+    config_specs = ConfigSpecs({
+        'skip_duplicates':
+        BoolParam(
+            default_value=False, human_name="Skip duplicate reactions",
+            short_description="Set True to skip the reactions of the second network that have the same compounds and stoichiometry as a reaction of the first network (with another id)")
+    })
+
+    def run(self, params: ConfigParams, inputs: TaskInputs) -> TaskOutputs:
         net1 = inputs['network_1']
         net2 = inputs['network_2']
 
         merger_helper = NetworkMergerHelper()
         merger_helper.attach_message_dispatcher(self.message_dispatcher)
-        net = merger_helper.merge(destination_network=net1, source_network=net2)
+        net = merger_helper.merge(
+            destination_network=net1, source_network=net2, skip_duplicates=params["skip_duplicates"])
         return {'network': net}
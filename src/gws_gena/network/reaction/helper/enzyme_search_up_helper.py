@@ -1,22 +1,25 @@
 
-
 from gws_biota import Enzyme as BiotaEnzyme
 from gws_biota import Taxonomy as BiotaTaxonomy
 from gws_core import BadRequestException
 
 from ....helper.base_helper import BaseHelper
+from ...helper.biota_fetch_helper import BiotaFetchHelper
+from ...helper.biota_lookup_helper import BiotaLookupHelper
 
 
 class EnzymeSearchUpHelper(BaseHelper):
     """ SearchUpHelper """
 
+    BATCH_SIZE = 500
+
     @classmethod
     def search(cls, ec_number, tax_id, tax_search_method='bottom_up') -> list:
         """
         Search the ec_number at a given taxonomy level. If not found goes at higher taxonomy levels to find it
         """
         if tax_id:
-            tax = BiotaTaxonomy.get_or_none(BiotaTaxonomy.tax_id == tax_id)
+            tax = BiotaLookupHelper.get_taxonomy(tax_id)
             if tax is None:
                 raise BadRequestException(f"No taxonomy found with tax_id {tax_id}")
 
@@ -31,36 +34,102 @@ class EnzymeSearchUpHelper(BaseHelper):
         else:
             return []
 
+    @classmethod
+    def search_in_bulk(cls, ec_numbers: list[str], tax_id: str = None,
+                       tax_search_method: str = 'bottom_up') -> dict[str, list]:
+        """
+        Search a list of ec_numbers (see `search`). The enzymes are fetched with set-based queries and the
+        bottom-up search is done for all the ec_numbers at once. Only the ec_numbers that are not found
+        (e.g. deprecated ec_numbers) are searched one by one.
+
+        :return: The enzymes found, by ec_number
+        :rtype: `dict[str, list[BiotaEnzyme]]`
+        """
+
+        tax = None
+        if tax_id:
+            tax = BiotaLookupHelper.get_taxonomy(tax_id)
+            if tax is None:
+                raise BadRequestException(f"No taxonomy found with tax_id {tax_id}")
+
+        ec_numbers = list(dict.fromkeys(ec_numbers))
+        def _fetch(batch):
+            query = BiotaEnzyme.select(BiotaEnzyme.id, BiotaEnzyme.ec_number).where(BiotaEnzyme.ec_number.in_(batch))
+            if tax is not None:
+                query = query.where(BiotaEnzyme.tax_id == tax.tax_id)
+            return list(query)
+
+        enzymes = {}
+        for enzyme in BiotaFetchHelper.fetch_in_batches(_fetch, ec_numbers, cls.BATCH_SIZE):
+            enzymes.setdefault(enzyme.ec_number, []).append(enzyme)
+
+        if tax is not None and tax_search_method == 'bottom_up':
+            missing_ec_numbers = [ec_number for ec_number in ec_numbers if ec_number not in enzymes]
+            enzymes.update(cls.search_up_in_bulk(missing_ec_numbers, tax))
+
+        for ec_number in ec_numbers:
+            if ec_number in enzymes:
+                continue
+            if tax is not None:
+                query = cls.search(ec_number, tax_id, tax_search_method=tax_search_method)
+            else:
+                query = BiotaEnzyme.select_and_follow_if_deprecated(ec_number=ec_number, fields=['id', 'ec_number'])
+            if len(query) > 0:
+                enzymes[ec_number] = list(query)
+
+        return enzymes
+
     @classmethod
     def search_up(cls, ec_number, tax):
-        """ Search for unique enzymes (i.e. enzyme orthologs) with ec_numbers at the higher taxonomy level """
-        found_query = []
+        """
+        Search for unique enzymes (i.e. enzyme orthologs) with ec_numbers at the higher taxonomy level.
+
+        The enzymes are grouped by ec_number (a deprecated ec_number is followed and may give several groups).
+        Each group gives the enzyme of its closest ancestor taxonomy, independently of the other groups (see
+        `_select_in_lineage`), so several groups can be matched at the same taxonomy rank.
+        """
         query = BiotaEnzyme.select_and_follow_if_deprecated(ec_number=ec_number)
         tab = {}
         for e in query:
-            if e.ec_number not in tab:
-                tab[e.ec_number] = []
-            tab[e.ec_number].append(e)
-        for t in tax.ancestors:
-            is_found = False
-            for _, ec in enumerate(tab):
-                e_group = tab[ec]
-                for e in e_group:
-                    if t.rank == "no rank":
-                        continue
-                    if getattr(e, "tax_"+t.rank, None) == t.tax_id:
-                        found_query.append(e)
-                        is_found = True
-                        break  # -> stop at this taxonomy rank
-                if is_found:
-                    del tab[ec]
-                    break
-        # add remaining enzyme
-        for e_group in tab.values():
-            for e in e_group:
-                found_query.append(e)
-                break
+            tab.setdefault(e.ec_number, []).append(e)
+        found_query = [cls._select_in_lineage(e_group, tax) for e_group in tab.values()]
         if found_query:
             query = found_query
 
         return query
+
+    @classmethod
+    def search_up_in_bulk(cls, ec_numbers: list[str], tax: BiotaTaxonomy) -> dict[str, list]:
+        """
+        Search a list of ec_numbers at the higher taxonomy levels (see `search_up`), in one pass over the
+        candidate enzymes. The deprecated ec_numbers are not followed (see `search_up`).
+
+        :return: The enzymes found, by ec_number
+        :rtype: `dict[str, list[BiotaEnzyme]]`
+        """
+
+        tab = {}
+        for e in BiotaFetchHelper.fetch_in_batches(
+                lambda batch: list(BiotaEnzyme.select().where(BiotaEnzyme.ec_number.in_(batch))),
+                ec_numbers, cls.BATCH_SIZE):
+            tab.setdefault(e.ec_number, []).append(e)
+        return {ec_number: [cls._select_in_lineage(e_group, tax)] for ec_number, e_group in tab.items()}
+
+    @classmethod
+    def _select_in_lineage(cls, e_group: list, tax: BiotaTaxonomy):
+        """
+        Select the enzyme of the closest ancestor taxonomy (the first enzyme if no ancestor matches).
+        The enzymes are indexed by rank column, so each ancestor is matched with a lookup.
+        """
+
+        ancestors = [t for t in BiotaLookupHelper.get_taxonomy_lineage(tax.tax_id)[1:] if t.rank != "no rank"]
+        ranks = {t.rank for t in ancestors}
+        index = {}
+        for e in e_group:
+            for rank in ranks:
+                index.setdefault((rank, getattr(e, "tax_"+rank, None)), e)
+        for t in ancestors:
+            e = index.get((t.rank, t.tax_id))
+            if e is not None:
+                return e
+        return e_group[0]
@@ -5,13 +5,17 @@ from gws_biota import Compound as BiotaCompound
 from gws_biota import Enzyme as BiotaEnzyme
 from gws_biota import EnzymeOrtholog as BiotaEnzymeOrtholog
 from gws_biota import Reaction as BiotaReaction
-from gws_biota import Taxonomy as BiotaTaxo
+from gws_core import BadRequestException
 
 from ....helper.base_helper import BaseHelper
 from ...compartment.compartment import Compartment
+from ...helper.biota_fetch_helper import BiotaFetchHelper
+from ...helper.biota_lookup_helper import BiotaLookupHelper
+from ...helper.biota_template_cache import BiotaTemplateCache
 from ...typing.compound_typing import CompoundDict
 from ...typing.enzyme_typing import EnzymeDict
 from ...typing.reaction_typing import ReactionDict
+from .enzyme_search_up_helper import EnzymeSearchUpHelper
 
 EQN_SPLIT_REGEXP = re.compile(r" <?=>? ")
 OLIG_REGEXP = re.compile(r"\((n(\+\d)?)\)$")
@@ -20,6 +24,8 @@ OLIG_REGEXP = re.compile(r"\((n(\+\d)?)\)$")
 class ReactionBiotaHelper(BaseHelper):
     """ ReactionBiotaHelper """
 
+    BATCH_SIZE = 500
+
     def create_oligomer_if_required_and_add_to_reaction(
             self, biota_comps: list[BiotaCompound], stoich, rxn: 'Reaction', is_product: bool,
             compartment_go_id=None, alt_litteral_compound_name=None, oligomerization=None):
@@ -98,17 +104,11 @@ class ReactionBiotaHelper(BaseHelper):
                 })
 
                 if load_taxonomy:
-                    tax = BiotaTaxo.get_or_none(BiotaTaxo.tax_id == enzyme.tax_id)
-                    if tax:
-                        enzyme_dict["tax"][tax.rank] = {
-                            "tax_id": tax.tax_id,
-                            "name": tax.get_name()
+                    for t in BiotaLookupHelper.get_taxonomy_lineage(enzyme.tax_id):
+                        enzyme_dict["tax"][t.rank] = {
+                            "tax_id": t.tax_id,
+                            "name": t.get_name()
                         }
-                        for t in tax.ancestors:
-                            enzyme_dict["tax"][t.rank] = {
-                                "tax_id": t.tax_id,
-                                "name": t.get_name()
-                            }
 
                 if enzyme.related_deprecated_enzyme:
                     enzyme_dict["related_deprecated_enzyme"] = {
@@ -125,13 +125,29 @@ class ReactionBiotaHelper(BaseHelper):
 
         return enzyme_list
 
-    def create_reaction_from_biota(self, rhea_rxn: BiotaReaction):
-        """ Create a reaction """
+    def create_reaction_from_biota(self, rhea_rxn: BiotaReaction, enzymes: list[BiotaEnzyme] = None,
+                                   compounds: dict[str, BiotaCompound] = None):
+        """
+        Create a reaction
+
+        :param rhea_rxn: The biota reaction
+        :type rhea_rxn: `BiotaReaction`
+        :param enzymes: The enzymes of the reaction, if already fetched. The enzymes of the reaction are fetched
+        if not given.
+        :type enzymes: `list[BiotaEnzyme]`
+        :param compounds: Prefetched biota compounds, by chebi id. The compounds that are not given are fetched.
+        :type compounds: `dict[str, BiotaCompound]`
+        """
 
         from ...reaction.reaction import Reaction
 
+        if enzymes is None:
+            enzymes = rhea_rxn.enzymes
+        if compounds is None:
+            compounds = {}
+
         enzyme_list: list[EnzymeDict] = self.create_reaction_enzyme_dict_from_biota(
-            rhea_rxn.enzymes, load_taxonomy=False)
+            enzymes, load_taxonomy=False)
 
         rxn: Reaction = Reaction(
             ReactionDict(
@@ -164,8 +180,11 @@ class ReactionBiotaHelper(BaseHelper):
 
             biota_comps = []
             for id_ in chebi_ids:
-                comp_tab = BiotaCompound.search_by_chebi_ids([id_])
-                biota_comps.append(comp_tab[0])
+                if id_ in compounds:
+                    biota_comps.append(compounds[id_])
+                else:
+                    comp_tab = BiotaCompound.search_by_chebi_ids([id_])
+                    biota_comps.append(comp_tab[0])
                 # try:
                 #     comp_tab = BiotaCompound.search_by_chebi_ids([id_])
                 #     biota_comps.append(comp_tab[0])
@@ -204,8 +223,11 @@ class ReactionBiotaHelper(BaseHelper):
 
             biota_comps = []
             for id_ in chebi_ids:
-                comp_tab = BiotaCompound.search_by_chebi_ids([id_])
-                biota_comps.append(comp_tab[0])
+                if id_ in compounds:
+                    biota_comps.append(compounds[id_])
+                else:
+                    comp_tab = BiotaCompound.search_by_chebi_ids([id_])
+                    biota_comps.append(comp_tab[0])
                 # try:
                 #     comp_tab = BiotaCompound.search_by_chebi_ids([id_])
                 #     biota_comps.append(comp_tab[0])
@@ -234,3 +256,143 @@ class ReactionBiotaHelper(BaseHelper):
             count += 1
 
         return rxn
+
+    def create_reaction_from_biota_template(self, rhea_rxn: BiotaReaction):
+        """ Create a reaction, copied from its template if the reaction was already created (see `BiotaTemplateCache`) """
+        rxn = BiotaTemplateCache.get_reaction(rhea_rxn.rhea_id)
+        if rxn is None:
+            rxn = self.create_reaction_from_biota(rhea_rxn)
+            BiotaTemplateCache.set_reaction(rhea_rxn.rhea_id, rxn)
+        return rxn
+
+    def create_reactions_from_ec_numbers(
+            self, ec_numbers: list[str], tax_id: str = None,
+            tax_search_method: str = 'bottom_up') -> tuple[dict[str, list['Reaction']], dict[str, str]]:
+        """
+        Create the reactions of a list of EC numbers (see `Reaction.from_biota`).
+
+        The enzymes, their reactions and the compounds of the reactions are fetched in bulk, by phase, then the
+        reactions are built in memory. A reaction shared by several EC numbers is built once.
+
+        :return: The reactions by EC number, and the errors by EC number (for the EC numbers with no reaction)
+        :rtype: `tuple[dict[str, list[Reaction]], dict[str, str]]`
+        """
+
+        ec_numbers = list(dict.fromkeys(ec_numbers))
+        errors = {}
+
+        # enzymes
+        self.update_progress_value(0, message=f"Fetching the enzymes of {len(ec_numbers)} EC numbers ...")
+        try:
+            enzymes = EnzymeSearchUpHelper.search_in_bulk(ec_numbers, tax_id, tax_search_method=tax_search_method)
+        except BadRequestException as err:
+            return {}, {ec_number: str(err) for ec_number in ec_numbers}
+        for ec_number in ec_numbers:
+            if ec_number not in enzymes:
+                if tax_id:
+                    errors[ec_number] = f"No enzyme found with ec_number {ec_number} and tax_id {tax_id}"
+                else:
+                    errors[ec_number] = f"No enzyme found with ec_number {ec_number}"
+
+        # reactions
+        self.update_progress_value(30, message="Fetching the reactions of the enzymes ...")
+        through_model, rxn_field, enzyme_field = self._get_reaction_enzyme_fields()
+        enzyme_ids = list({enzyme.id for enzyme_group in enzymes.values() for enzyme in enzyme_group})
+        rxn_ids_by_enzyme = {}
+        for enzyme_id, rxn_id in BiotaFetchHelper.fetch_in_batches(
+                lambda batch: list(through_model.select(enzyme_field, rxn_field).where(
+                    enzyme_field.in_(batch)).tuples()),
+                enzyme_ids, self.BATCH_SIZE):
+            rxn_ids_by_enzyme.setdefault(enzyme_id, []).append(rxn_id)
+
+        rxn_ids_by_ec = {}
+        for ec_number, enzyme_group in enzymes.items():
+            rxn_ids = {}
+            for enzyme in enzyme_group:
+                rxn_ids.update(dict.fromkeys(rxn_ids_by_enzyme.get(enzyme.id, [])))
+            if rxn_ids:
+                rxn_ids_by_ec[ec_number] = list(rxn_ids)
+            else:
+                errors[ec_number] = f"No biota reactions found with ec_number {ec_number}"
+
+        all_rxn_ids = list({rxn_id for rxn_ids in rxn_ids_by_ec.values() for rxn_id in rxn_ids})
+        biota_rxns = {}
+        for biota_rxn in BiotaFetchHelper.fetch_in_batches(
+                lambda batch: list(BiotaReaction.select().where(BiotaReaction.id.in_(batch))),
+                all_rxn_ids, self.BATCH_SIZE):
+            biota_rxns[biota_rxn.id] = biota_rxn
+
+        # the reactions already created are copied from their templates
+        built_rxns = {}
+        for rxn_id, biota_rxn in biota_rxns.items():
+            rxn = BiotaTemplateCache.get_reaction(biota_rxn.rhea_id)
+            if rxn is not None:
+                built_rxns[rxn_id] = rxn
+        uncached_rxn_ids = [rxn_id for rxn_id in biota_rxns if rxn_id not in built_rxns]
+
+        # enzymes of the reactions (only the first enzyme of each EC number is used)
+        enzyme_ids_by_rxn = {}
+        for rxn_id, enzyme_id, ec_number in BiotaFetchHelper.fetch_in_batches(
+                lambda batch: list(through_model.select(rxn_field, enzyme_field, BiotaEnzyme.ec_number).join(
+                    BiotaEnzyme, on=(enzyme_field == BiotaEnzyme.id)).where(rxn_field.in_(batch)).tuples()),
+                uncached_rxn_ids, self.BATCH_SIZE):
+            enzyme_ids_by_rxn.setdefault(rxn_id, {}).setdefault(ec_number, enzyme_id)
+        rxn_enzymes = {}
+        enzyme_ids = list({enzyme_id for ids in enzyme_ids_by_rxn.values() for enzyme_id in ids.values()})
+        for enzyme in BiotaFetchHelper.fetch_in_batches(
+                lambda batch: list(BiotaEnzyme.select().where(BiotaEnzyme.id.in_(batch))),
+                enzyme_ids, self.BATCH_SIZE):
+            rxn_enzymes[enzyme.id] = enzyme
+
+        # compounds
+        self.update_progress_value(60, message=f"Fetching the compounds of {len(uncached_rxn_ids)} reactions ...")
+        chebi_ids = [id_ for rxn_id in uncached_rxn_ids for id_ in self._get_equation_chebi_ids(biota_rxns[rxn_id])]
+        compounds = BiotaLookupHelper.get_compounds_by_chebi_ids(chebi_ids)
+
+        # build the reactions
+        self.update_progress_value(80, message=f"Building {len(uncached_rxn_ids)} reactions ...")
+        reactions = {}
+        for ec_number, rxn_ids in rxn_ids_by_ec.items():
+            rxns = []
+            for rxn_id in rxn_ids:
+                if rxn_id not in built_rxns:
+                    try:
+                        built_rxns[rxn_id] = self.create_reaction_from_biota(
+                            biota_rxns[rxn_id],
+                            enzymes=[rxn_enzymes[id_] for id_ in enzyme_ids_by_rxn.get(rxn_id, {}).values()],
+                            compounds=compounds)
+                        BiotaTemplateCache.set_reaction(biota_rxns[rxn_id].rhea_id, built_rxns[rxn_id])
+                    except BadRequestException as err:
+                        built_rxns[rxn_id] = err
+                if isinstance(built_rxns[rxn_id], BadRequestException):
+                    errors[ec_number] = str(built_rxns[rxn_id])
+                    rxns = []
+                    break
+                rxns.append(built_rxns[rxn_id])
+            if rxns:
+                reactions[ec_number] = rxns
+
+        self.update_progress_value(100, message="Reactions created")
+        return reactions, errors
+
+    @staticmethod
+    def _get_equation_chebi_ids(rhea_rxn: BiotaReaction) -> list[str]:
+        chebi_ids = []
+        for side in re.split(EQN_SPLIT_REGEXP, rhea_rxn.data["source_equation"]):
+            for term in side.split(" + "):
+                chebi_ids.extend(term.split(" ")[-1].split(","))
+        return chebi_ids
+
+    @staticmethod
+    def _get_reaction_enzyme_fields():
+        """ Get the through model of the reaction-enzyme relation, and its foreign keys """
+        through_model = BiotaReaction.enzymes.get_through_model()
+        rxn_field = None
+        enzyme_field = None
+        for field in through_model._meta.sorted_fields:
+            rel_model = getattr(field, "rel_model", None)
+            if rel_model is BiotaReaction:
+                rxn_field = field
+            elif rel_model is BiotaEnzyme:
+                enzyme_field = field
+        return through_model, rxn_field, enzyme_field
@@ -23,24 +23,24 @@ class ReactionKnockOutHelper(BaseHelper):
         found_id = []
 
         if isinstance(reactions, list):
-            for rxn_id, rxn in new_net.reactions.items():
-                rhea_id = rxn.rhea_id
-                ec_number_tab = []
-                for enzyme in rxn.enzymes:
-                    ec_number_tab.append(enzyme.get("ec_number"))
-
-                for _, ko_id_str in enumerate(reactions):
-                    if ko_delimiter:
-                        ko_ids = ko_id_str.split(ko_delimiter)
-                    else:
-                        ko_ids = [ko_id_str]
-                    all_ids.extend(ko_ids)
-
-                    for ko_id in ko_ids:
-                        if ko_id in [rxn_id, rhea_id, *ec_number_tab]:
-                            rxn.lower_bound = -self.FLUX_EPSILON
-                            rxn.upper_bound = self.FLUX_EPSILON
-                            found_id.append(ko_id)
+            ko_ids = []
+            for ko_id_str in reactions:
+                if ko_delimiter:
+                    ko_ids.extend(ko_id_str.split(ko_delimiter))
+                else:
+                    ko_ids.append(ko_id_str)
+            all_ids.extend(ko_ids)
+            ko_ids = set(ko_ids)
+
+            # only the knocked out reactions are copied (the others are shared with the original network)
+            for rxn_id, rxn in new_net.reactions.peek_items():
+                rxn_ids = {rxn_id, rxn.rhea_id, *[enzyme.get("ec_number") for enzyme in rxn.enzymes]}
+                matched_ids = ko_ids & rxn_ids
+                if matched_ids:
+                    rxn = new_net.reactions[rxn_id]
+                    rxn.lower_bound = -self.FLUX_EPSILON
+                    rxn.upper_bound = self.FLUX_EPSILON
+                    found_id.extend(matched_ids)
         else:
             raise Exception("the reactions param must be a list of string")
 
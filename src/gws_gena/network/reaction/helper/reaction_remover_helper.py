@@ -13,7 +13,8 @@ class ReactionRemoverHelper(BaseHelper):
             self, network: Network, reaction_table: Table,
             reverse_remove: bool = False) -> Network:
         """ Remove a list of reactions for a network """
-        rxn_series = network.reactions.copy()
+        # snapshot of the reactions (read-only), the network is updated while iterating
+        rxn_series = dict(network.reactions.peek_items())
 
         #Retrieve column names
         ec_number_name = TransformerECNumberTable.ec_number_name
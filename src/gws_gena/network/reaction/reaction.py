@@ -10,9 +10,11 @@ from gws_core import BadRequestException
 from ..compound.compound import Compound
 from ..exceptions.compound_exceptions import ProductDuplicateException, SubstrateDuplicateException
 from ..exceptions.reaction_exceptions import InvalidReactionException
+from ..helper.biota_template_cache import BiotaTemplateCache
+from ..helper.change_tracker_helper import ChangeTrackerHelper
 from ..helper.numeric_helper import NumericHelper
 from ..reaction.helper.reaction_biota_helper import ReactionBiotaHelper
-from ..reaction.reaction_compound import Product, Substrate
+from ..reaction.reaction_compound import BaseReactionCompound, Product, Substrate
 from ..typing.enzyme_typing import EnzymeDict
 from ..typing.pathway_typing import ReactionPathwayDict
 from ..typing.reaction_typing import ReactionDict
@@ -60,6 +62,19 @@ class Reaction:
     layout: BiotaReactionLayoutDict = None
     gene_reaction_rule: str = ""
 
+    # last mass and charge balance, valid for the stamp it was computed with
+    _balance: tuple = None
+
+    _TRACKED_ATTRIBUTES = {
+        "id": ChangeTrackerHelper.TOPOLOGY,
+        "direction": ChangeTrackerHelper.TOPOLOGY,
+        "rhea_id": ChangeTrackerHelper.TOPOLOGY,
+        "substrates": ChangeTrackerHelper.TOPOLOGY,
+        "products": ChangeTrackerHelper.TOPOLOGY,
+        "lower_bound": ChangeTrackerHelper.BOUNDS,
+        "upper_bound": ChangeTrackerHelper.BOUNDS,
+    }
+
     def __init__(self, dict_: ReactionDict = None):
         if dict_ is None:
             dict_ = {}
@@ -106,6 +121,12 @@ class Reaction:
         if self.gene_reaction_rule is None:
             self.gene_reaction_rule = ""
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        channel = self._TRACKED_ATTRIBUTES.get(name)
+        if channel is not None:
+            ChangeTrackerHelper.notify_entity_change(self, channel)
+
     # -- A --
 
     def add_data_slot(self, slot: str, data: dict):
@@ -144,6 +165,7 @@ class Reaction:
         if (network is not None) and (not network.compound_exists(comp)):
             network.add_compound(comp)
         self.substrates[comp.id] = Substrate(comp, stoich)
+        self._notify_reaction_compounds_change(self.substrates[comp.id])
 
     def add_product(
             self, comp: Compound, stoich: float, network: Union['Network', 'NetworkData'] = None, update_if_exists=False):
@@ -178,6 +200,7 @@ class Reaction:
             network.add_compound(comp)
 
         self.products[comp.id] = Product(comp, stoich)
+        self._notify_reaction_compounds_change(self.products[comp.id])
 
     # -- C --
 
@@ -203,7 +226,26 @@ class Reaction:
         return rxn
 
     def compute_mass_and_charge_balance(self) -> dict:
-        """ Compute the mass and charge balance of a reaction """
+        """
+        Compute the mass and charge balance of a reaction
+
+        The balance is cached until the stoichiometry of the reaction or the mass and charge of its compounds change.
+        """
+
+        stamp = ChangeTrackerHelper.get_entity_stamp(self)
+        for reaction_compounds in (self.substrates, self.products):
+            for reaction_compound in reaction_compounds.values():
+                stamp = max(stamp,
+                            ChangeTrackerHelper.get_entity_stamp(reaction_compound),
+                            ChangeTrackerHelper.get_entity_stamp(reaction_compound.compound))
+
+        balance = self._balance
+        if balance is None or balance[0] != stamp:
+            balance = (stamp, self._compute_mass_and_charge_balance())
+            self._balance = balance
+        return dict(balance[1])
+
+    def _compute_mass_and_charge_balance(self) -> dict:
         def _compute_blance(val, stoich, comp_val):
             if isinstance(val, float):
                 if isinstance(comp_val, str) and len(comp_val) != 0:
@@ -279,14 +321,17 @@ class Reaction:
         rxn_biota_helper = ReactionBiotaHelper()
 
         if biota_reaction:
-            return [rxn_biota_helper.create_reaction_from_biota(rhea_rxn=biota_reaction)]
+            return [rxn_biota_helper.create_reaction_from_biota_template(rhea_rxn=biota_reaction)]
         elif rhea_id:
+            rxn = BiotaTemplateCache.get_reaction(rhea_id)
+            if rxn is not None:
+                return [rxn]
             query = BiotaReaction.select().where(BiotaReaction.rhea_id == rhea_id)
             if len(query) == 0:
                 raise BadRequestException(f"No reaction found with rhea_id {rhea_id}")
             else:
                 biota_reaction = query[0]
-                return [rxn_biota_helper.create_reaction_from_biota(rhea_rxn=biota_reaction)]
+                return [rxn_biota_helper.create_reaction_from_biota_template(rhea_rxn=biota_reaction)]
         elif ec_number:
             biota_reaction_dict = {}
             if tax_id:
@@ -312,7 +357,7 @@ class Reaction:
 
             rxns = []
             for biota_reaction in biota_reaction_dict.values():
-                rxns.append(rxn_biota_helper.create_reaction_from_biota(rhea_rxn=biota_reaction))
+                rxns.append(rxn_biota_helper.create_reaction_from_biota_template(rhea_rxn=biota_reaction))
             return rxns
         else:
             raise BadRequestException("Invalid parameters")
@@ -344,7 +389,33 @@ class Reaction:
         """ Set data """
         return self.data.get(slot, default)
 
+    def get_signature(self) -> tuple:
+        """
+        Get the canonical signature of the reaction, i.e. its stoichiometry (the sorted ids of the compounds with
+        their coefficients, negative for the substrates), its direction and the set of its compartments.
+        The reactions with the same signature are duplicates, whatever their ids. A reaction written the other way
+        round has the same signature.
+
+        :rtype: `tuple`
+        """
 
+        stoichs = {}
+        compartments = set()
+        for comp_id, substrate in self.substrates.items():
+            stoichs[comp_id] = stoichs.get(comp_id, 0.0) - substrate.stoich
+            compartments.add(substrate.compound.compartment.id)
+        for comp_id, product in self.products.items():
+            stoichs[comp_id] = stoichs.get(comp_id, 0.0) + product.stoich
+            compartments.add(product.compound.compartment.id)
+
+        direction = self.direction
+        stoichiometry = tuple(sorted(stoichs.items()))
+        reversed_stoichiometry = tuple((comp_id, -stoich) for comp_id, stoich in stoichiometry)
+        if direction == "L":
+            direction, stoichiometry = "R", reversed_stoichiometry
+        elif direction == "B":
+            stoichiometry = min(stoichiometry, reversed_stoichiometry)
+        return (stoichiometry, direction, tuple(sorted(compartments)))
 
     # -- I --
 
@@ -370,6 +441,16 @@ class Reaction:
         """ is empty """
         return not self.has_substrates() and not self.has_products()
 
+    # -- N --
+
+    def _notify_reaction_compounds_change(self, added_reaction_compound: BaseReactionCompound = None):
+        """ Notify the networks of the reaction that its substrates or products changed """
+        if added_reaction_compound is not None:
+            for stamps in ChangeTrackerHelper.get_owner_stamps(self):
+                ChangeTrackerHelper.register(added_reaction_compound, stamps)
+                ChangeTrackerHelper.register(added_reaction_compound.compound, stamps)
+        ChangeTrackerHelper.notify_entity_change(self, ChangeTrackerHelper.TOPOLOGY)
+
     # -- P --
 
     # -- R --
@@ -387,6 +468,7 @@ class Reaction:
 
         # remove the compound from the reaction
         del self.substrates[comp.id]
+        self._notify_reaction_compounds_change()
 
     def remove_product(self, comp: Compound):
         """
@@ -401,6 +483,7 @@ class Reaction:
 
         # remove the compound from the reaction
         del self.products[comp.id]
+        self._notify_reaction_compounds_change()
 
     def get_related_biota_reaction(self):
         """
@@ -1,3 +1,4 @@
+from ..helper.change_tracker_helper import ChangeTrackerHelper
 
 
 class BaseReactionCompound:
@@ -5,10 +6,21 @@ class BaseReactionCompound:
     stoich: float = None
     compound: 'Compound' = None
 
+    _TRACKED_ATTRIBUTES = {
+        "stoich": ChangeTrackerHelper.TOPOLOGY,
+        "compound": ChangeTrackerHelper.TOPOLOGY,
+    }
+
     def __init__(self, compound, stoich):
         self.compound = compound
         self.stoich = abs(float(stoich))
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        channel = self._TRACKED_ATTRIBUTES.get(name)
+        if channel is not None:
+            ChangeTrackerHelper.notify_entity_change(self, channel)
+
     def copy(self):
         """ Deep copy """
         cls = type(self)
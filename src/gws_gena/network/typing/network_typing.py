@@ -1,6 +1,9 @@
 
 from typing import TypedDict
 
+from numpy import ndarray
+from scipy.sparse import csr_matrix
+
 from .compartment_typing import CompartmentDict
 from .compound_typing import CompoundDict
 from .reaction_typing import ReactionDict
@@ -17,3 +20,9 @@ class NetworkDict(TypedDict):
     reactions: list[ReactionDict]
     compartments: list[CompartmentDict]
     recon_tags: NetworkReconTagDict
+
+class FlatStoichiometricBlockDict(TypedDict):
+    matrix: csr_matrix
+    compound_ids: list[str]
+    reaction_ids: list[str]
+    is_shared_compound: ndarray
@@ -0,0 +1,190 @@
+import json
+import os
+import sqlite3
+
+from ...helper.base_helper import BaseHelper
+from ...network.compartment.compartment import Compartment
+from ...network.compound.compound import Compound
+from ...network.reaction.reaction import Reaction
+from ...network.typing.compartment_typing import CompartmentDict
+from ...network.typing.compound_typing import CompoundDict
+from ...network.typing.reaction_typing import ReactionDict
+from ...unicell.unicell import Unicell
+
+
+class ReconCacheHelper(BaseHelper):
+    """
+    ReconCacheHelper
+
+    Persistent cache of the reactions created from the EC numbers during the reconstruction. The reactions are
+    stored as templates (JSON), by `(tax_id, ec_number, tax_search_method, biota version)`, in a SQLite
+    database. The errors of the EC numbers without reaction are not cached: they are searched again by the
+    next reconstructions.
+
+    The database is shared by the processes of the machine (in the data directory of gena by default, see
+    `Unicell.get_data_dir`). If it cannot be opened, a warning is logged and the reactions are created without
+    cache.
+    """
+
+    FILE_NAME = "recon_cache.sqlite"
+    BATCH_SIZE = 500
+
+    file_path: str = None
+    _is_disabled: bool = False
+
+    def __init__(self, file_path: str = None):
+        super().__init__()
+        # the default file is resolved on the first access, the warnings are then sent to the attached dispatcher
+        self.file_path = file_path
+
+    # -- C --
+
+    def _connect(self) -> sqlite3.Connection | None:
+        """ Open the database, or return None if the cache is not available """
+        if self._is_disabled:
+            return None
+        connection = None
+        try:
+            if self.file_path is None:
+                data_dir = os.path.join(Unicell.get_data_dir(), "recon")
+                if not os.path.exists(data_dir):
+                    os.makedirs(data_dir)
+                self.file_path = os.path.join(data_dir, self.FILE_NAME)
+            connection = sqlite3.connect(self.file_path, timeout=30)
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS ec_reactions ("
+                "tax_id TEXT NOT NULL, ec_number TEXT NOT NULL, tax_search_method TEXT NOT NULL, "
+                "biota_version TEXT NOT NULL, templates TEXT NOT NULL, "
+                "PRIMARY KEY (tax_id, ec_number, tax_search_method, biota_version))"
+            )
+        except (OSError, ValueError, sqlite3.Error) as err:
+            if connection is not None:
+                connection.close()
+            self._disable(err)
+            return None
+        return connection
+
+    # -- D --
+
+    def _disable(self, err: Exception):
+        self._is_disabled = True
+        self.log_warning_message(f"The recon cache is not available ({err}), the reactions are created without cache")
+
+    @staticmethod
+    def _dump_compound(comp: Compound) -> dict:
+        return {
+            "id": comp.id,
+            "name": comp.name,
+            "charge": comp.charge,
+            "mass": comp.mass,
+            "monoisotopic_mass": comp.monoisotopic_mass,
+            "formula": comp.formula,
+            "inchi": comp.inchi,
+            "compartment": {"id": comp.compartment.id, "go_id": comp.compartment.go_id},
+            "chebi_id": comp.chebi_id,
+            "alt_chebi_ids": comp.alt_chebi_ids,
+            "kegg_id": comp.kegg_id,
+            "inchikey": comp.inchikey,
+            "layout": comp.layout,
+        }
+
+    @classmethod
+    def _dump_reaction(cls, rxn: Reaction) -> dict:
+        return {
+            "id": rxn.id,
+            "name": rxn.name,
+            "direction": rxn.direction,
+            "lower_bound": rxn.lower_bound,
+            "upper_bound": rxn.upper_bound,
+            "rhea_id": rxn.rhea_id,
+            "enzymes": rxn.enzymes,
+            "data": rxn.data,
+            "layout": rxn.layout,
+            "gene_reaction_rule": rxn.gene_reaction_rule,
+            "substrates": [[cls._dump_compound(val.compound), val.stoich] for val in rxn.substrates.values()],
+            "products": [[cls._dump_compound(val.compound), val.stoich] for val in rxn.products.values()],
+        }
+
+    # -- G --
+
+    def get_reactions(self, ec_numbers: list[str], tax_id: str, tax_search_method: str) -> dict[str, list[Reaction]]:
+        """
+        Get the cached reactions of a list of EC numbers
+
+        :return: The reactions by EC number. The EC numbers that are not cached are absent.
+        :rtype: `dict[str, list[Reaction]]`
+        """
+
+        version = Unicell.get_biota_version()
+        ec_numbers = list(dict.fromkeys(ec_numbers))
+        reactions = {}
+        connection = self._connect()
+        if connection is None:
+            return reactions
+        try:
+            with connection:
+                for i in range(0, len(ec_numbers), self.BATCH_SIZE):
+                    batch = ec_numbers[i:i + self.BATCH_SIZE]
+                    rows = connection.execute(
+                        "SELECT ec_number, templates FROM ec_reactions "
+                        "WHERE tax_id = ? AND tax_search_method = ? AND biota_version = ? "
+                        f"AND ec_number IN ({', '.join('?' * len(batch))})",
+                        (tax_id or "", tax_search_method, version, *batch)
+                    ).fetchall()
+                    for ec_number, templates in rows:
+                        reactions[ec_number] = [self._load_reaction(data) for data in json.loads(templates)]
+        except sqlite3.Error as err:
+            self._disable(err)
+            return {}
+        finally:
+            connection.close()
+
+        self.log_info_message(
+            f"Recon cache: {len(reactions)} hits, {len(ec_numbers) - len(reactions)} misses (biota version {version})")
+        return reactions
+
+    # -- L --
+
+    @staticmethod
+    def _load_compound(data: dict) -> Compound:
+        data = {**data, "compartment": Compartment(CompartmentDict(**data["compartment"]))}
+        return Compound(CompoundDict(**data))
+
+    @classmethod
+    def _load_reaction(cls, data: dict) -> Reaction:
+        substrates = data.pop("substrates")
+        products = data.pop("products")
+        rxn = Reaction(ReactionDict(**data))
+        for comp_data, stoich in substrates:
+            rxn.add_substrate(cls._load_compound(comp_data), stoich)
+        for comp_data, stoich in products:
+            rxn.add_product(cls._load_compound(comp_data), stoich)
+        return rxn
+
+    # -- S --
+
+    def set_reactions(self, reactions: dict[str, list[Reaction]], tax_id: str, tax_search_method: str):
+        """
+        Cache the reactions of a list of EC numbers
+
+        :param reactions: The reactions by EC number
+        :type reactions: `dict[str, list[Reaction]]`
+        """
+
+        connection = self._connect()
+        if connection is None:
+            return
+
+        version = Unicell.get_biota_version()
+        rows = []
+        for ec_number, rxns in reactions.items():
+            templates = json.dumps([self._dump_reaction(rxn) for rxn in rxns])
+            rows.append((tax_id or "", ec_number, tax_search_method, version, templates))
+
+        try:
+            with connection:
+                connection.executemany("INSERT OR REPLACE INTO ec_reactions VALUES (?, ?, ?, ?, ?)", rows)
+        except sqlite3.Error as err:
+            self._disable(err)
+        finally:
+            connection.close()
@@ -13,9 +13,11 @@ from ...network.compartment.compartment import Compartment
 from ...network.compound.compound import Compound
 from ...network.exceptions.reaction_exceptions import ReactionDuplicate
 from ...network.network import Network
+from ...network.reaction.helper.reaction_biota_helper import ReactionBiotaHelper
 from ...network.reaction.reaction import Reaction
 from ...network.typing.compound_typing import CompoundDict
 from ...network.typing.reaction_typing import ReactionDict
+from .recon_cache_helper import ReconCacheHelper
 
 
 class ReconHelper(BaseHelper):
@@ -82,7 +84,7 @@ class ReconHelper(BaseHelper):
         #We create a copy of the network, each metabolite extra must have a metabolite env
         new_net = net.copy()
         #We parse the compounds of the network
-        for compound,info in net.compounds.items():
+        for compound,info in net.compounds.peek_items():
             if (compound.endswith('_extracellular space (theoretical supernatant)')):
                 if (info.compartment.go_id == "GO:0005615"):
                     name_env = compound.rsplit('_', 1)[0]
@@ -108,63 +110,64 @@ class ReconHelper(BaseHelper):
 
         total_enzymes = len(ec_list)
         self.log_info_message(f"{total_enzymes} enzymes to process")
-        counter = 1
-        nb_interval = int(total_enzymes/10) + 1
-        perc = 0
-        self.update_progress_value(perc, message=f"enzyme {counter} ...")
 
-        for ec in ec_list:
-            ec = str(ec).strip()
+        ec_list = [str(ec).strip() for ec in ec_list]
+        complete_ec_list = [ec for ec in ec_list if ec and "-" not in ec]
 
+        # only the EC numbers that are not cached are fetched
+        cache_helper = ReconCacheHelper()
+        cache_helper.attach_message_dispatcher(self._message_dispatcher)
+        rxns_by_ec = cache_helper.get_reactions(complete_ec_list, tax_id, tax_search_method)
+        errors_by_ec = {}
+        missing_ec_list = [ec for ec in complete_ec_list if ec not in rxns_by_ec]
+        if missing_ec_list:
+            rxn_biota_helper = ReactionBiotaHelper()
+            rxn_biota_helper.attach_message_dispatcher(self._message_dispatcher)
+            new_rxns_by_ec, new_errors_by_ec = rxn_biota_helper.create_reactions_from_ec_numbers(
+                missing_ec_list, tax_id=tax_id, tax_search_method=tax_search_method)
+            cache_helper.set_reactions(new_rxns_by_ec, tax_id, tax_search_method)
+            rxns_by_ec.update(new_rxns_by_ec)
+            errors_by_ec.update(new_errors_by_ec)
+
+        for ec in ec_list:
             ec_tag = {
                 "ec_number": ec,
                 "reactions": [],
                 "errors": [],
                 "is_partial_ec_number": None
             }
-            if (counter % nb_interval) == 0:
-                perc = 100*(counter/total_enzymes)
-                self.update_progress_value(perc, message=f"enzyme {counter} ...")
-            counter += 1
 
             is_incomplete_ec = (not ec) or ("-" in ec)
             if is_incomplete_ec:
                 ec_tag["is_partial_ec_number"] = True
                 ec_tag["errors"].append("Partial ec number")
+            elif ec in errors_by_ec:
+                Logger.debug(f"An non-blocking error occured: {errors_by_ec[ec]}")
+                ec_tag["errors"].append(errors_by_ec[ec])
             else:
-                try:
-                    rxns = Reaction.from_biota(ec_number=ec, tax_id=tax_id, tax_search_method=tax_search_method)
-                    for rxn in rxns:
-                        ec_tag["reactions"].append(rxn.id)
-
-                        rnx_tag = {
-                            "id": rxn.id,
-                            "original_ec": ec,
-                            "errors": []
-                        }
-                        try:
-                            # check that is it not a transferred
-                            # for i, enz in enumerate(rxn.enzymes):
-                            #     if ec != enz["ec_number"]:
-                            #         rxn.enzymes[i]["related_deprecated_enzyme"] = ec
-                            #         rnx_tag["errors"].append(f"related_deprecated_enzyme: {ec}")
-                            net.add_reaction(rxn)
-                        except BadRequestException as err:
-                            Logger.debug(f"An non-blocking error occured: {err}")
-                            ec_tag["errors"].append(str(err))
-                            rnx_tag["errors"].append(str(err))
-
-                        net.update_reaction_recon_tag(rxn.id, rnx_tag)
-                except BadRequestException as err:
-                    Logger.debug(f"An non-blocking error occured: {err}")
-                    ec_tag["errors"].append(str(err))
+                for rxn in rxns_by_ec.get(ec, []):
+                    ec_tag["reactions"].append(rxn.id)
+
+                    rnx_tag = {
+                        "id": rxn.id,
+                        "original_ec": ec,
+                        "errors": []
+                    }
+                    try:
+                        net.add_reaction(rxn)
+                    except BadRequestException as err:
+                        Logger.debug(f"An non-blocking error occured: {err}")
+                        ec_tag["errors"].append(str(err))
+                        rnx_tag["errors"].append(str(err))
+
+                    net.update_reaction_recon_tag(rxn.id, rnx_tag)
 
             net.update_ec_recon_tag(ec, ec_tag)
 
         #We create a copy of the network, each metabolite extra must have a metabolite env
         new_net = net.copy()
         #We parse the compounds of the network
-        for compound,info in net.compounds.items():
+        for compound,info in net.compounds.peek_items():
             if (compound.endswith('_extracellular space (theoretical supernatant)')):
                 if (info.compartment.go_id == "GO:0005615"):
                     name_env = compound.rsplit('_', 1)[0]
@@ -6,6 +6,7 @@ from gws_core import (
     InputSpecs,
     OutputSpec,
     OutputSpecs,
+    SelectParam,
     StrParam,
     Task,
     TaskInputs,
@@ -26,6 +27,9 @@ class GapFiller(Task):
 
     This process iteratively fills gaps related to dead-end compounds using the biota DB.
     A gap is detected if a steady compound is a dead-end compound.
+
+    With the `optimization` method, the network is embedded in the universal (unicell) network and a minimal set
+    of universal reactions that unblocks the blocked reactions (or the biomass reaction) is added.
     """
 
     input_specs = InputSpecs({
@@ -40,7 +44,17 @@ class GapFiller(Task):
         'tax_id':
         StrParam(
             default_value=None, human_name="Taxonomy ID",
-            short_description="The taxonomy id used to fill gaps (Warning: Not active)")
+            short_description="The taxonomy id of the reactions used to fill gaps (all the reactions if not given)"),
+        'method':
+        SelectParam(
+            options=[GapFillerHelper.NEIGHBORHOOD_METHOD, GapFillerHelper.OPTIMIZATION_METHOD],
+            default_value=GapFillerHelper.NEIGHBORHOOD_METHOD, human_name="Method",
+            short_description="The gap filling method: neighborhood of the dead-ends or optimization (LP)"),
+        'target':
+        SelectParam(
+            options=[GapFillerHelper.DEAD_END_TARGET, GapFillerHelper.BIOMASS_TARGET],
+            default_value=GapFillerHelper.DEAD_END_TARGET, human_name="Target",
+            short_description="The reactions to unblock with the optimization method: dead-ends or biomass")
     })
 
     def run(self, params: ConfigParams, inputs: TaskInputs) -> TaskOutputs:
@@ -49,7 +63,6 @@ class GapFiller(Task):
 
         helper = GapFillerHelper()
         helper.attach_message_dispatcher(self.message_dispatcher)
-        # net = helper.fill_gaps(net, tax_id=tax_id)
-        net = helper.fill_gaps(net)
+        net = helper.fill_gaps(net, tax_id=tax_id, method=params["method"], target=params["target"])
 
         return {'network': net}
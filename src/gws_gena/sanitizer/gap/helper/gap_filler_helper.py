@@ -1,24 +1,70 @@
 
-from gws_biota.unicell.unicell_service import UnicellService as BiotaUnicellService
+import numpy as np
+from gws_core import BadRequestException
 from pandas import DataFrame
+from scipy.optimize import linprog
+from scipy.sparse import coo_matrix, hstack, identity
 
 from ....helper.base_helper import BaseHelper
+from ....network.compound.compound import Compound
+from ....network.helper.biota_lookup_helper import BiotaLookupHelper
 from ....network.network import Network
 from ....network.reaction.reaction import Reaction
+from ....unicell.unicell import Unicell
 from ..helper.gap_finder_helper import GapFinderHelper
 
 
 class GapFillerHelper(BaseHelper):
-    """ GapFinderHelper """
+    """
+    GapFillerHelper
 
-    def fill_gaps(self, net: Network, tax_id: str = None, weight: str = None) -> DataFrame:
+    Two methods are available to fill the gaps:
+    * `neighborhood`: the reactions of the unicell that connect the dead-end compounds to the other compounds of
+    the network (radius-1 neighborhood) are added,
+    * `optimization`: the network is embedded in the universal (unicell) problem and a minimal weighted set of
+    universal reactions that unblocks the blocked reactions (or the biomass reaction) is found with a single LP
+    (relaxation of the fastGapFill problem).
+    """
+
+    NEIGHBORHOOD_METHOD = "neighborhood"
+    OPTIMIZATION_METHOD = "optimization"
+    DEAD_END_TARGET = "dead_ends"
+    BIOMASS_TARGET = "biomass"
+
+    # minimal flux of the reactions to unblock
+    EPSILON = 1e-3
+    # reward of each unblocked reaction, relative to the weight of the universal reactions
+    UNBLOCKING_REWARD = 1e3
+    # maximal absolute flux of the universal reactions
+    MAX_FLUX = 1e3
+
+    def fill_gaps(self, net: Network, tax_id: str = None, weight: str = None, method: str = NEIGHBORHOOD_METHOD,
+                  target: str = DEAD_END_TARGET) -> DataFrame:
         """ Find all gaps """
 
-        rhea_ids = self.find_gap_filling_rhea_ids(net, tax_id=tax_id, weight=weight)
+        if method == self.OPTIMIZATION_METHOD:
+            rhea_ids = self.find_gap_filling_rhea_ids_by_optimization(net, tax_id=tax_id, target=target)
+        elif method == self.NEIGHBORHOOD_METHOD:
+            rhea_ids = self.find_gap_filling_rhea_ids(net, tax_id=tax_id, weight=weight)
+        else:
+            raise BadRequestException(f"Invalid gap filling method '{method}'")
+
+        biota_reactions = BiotaLookupHelper.get_reactions_by_rhea_ids(rhea_ids)
+        # the compounds of the biota reactions are matched to the network compounds by chebi id and compartment
+        # (e.g. the compounds of the networks with BiGG ids)
+        net_comps = {}
+        for comp in net.compounds.values():
+            for chebi_id in [comp.chebi_id, *comp.alt_chebi_ids]:
+                if chebi_id:
+                    net_comps.setdefault((chebi_id, comp.compartment.id), comp)
+
         count = 0
         for rhea_id in rhea_ids:
-            rxns = Reaction.from_biota(rhea_id=rhea_id)
+            if rhea_id not in biota_reactions:
+                raise BadRequestException(f"No reaction found with rhea_id {rhea_id}")
+            rxns = Reaction.from_biota(biota_reaction=biota_reactions[rhea_id])
             if not net.reaction_exists(rxns[0]):
+                self._attach_to_network_compounds(rxns[0], net_comps)
                 count += 1
                 net.add_reaction(rxns[0])
                 net.update_reaction_recon_tag(rxns[0].id, {"is_from_gap_fill": True})
@@ -26,6 +72,20 @@ class GapFillerHelper(BaseHelper):
         self.log_info_message(f"{count} reaction(s) added")
         return net
 
+    @staticmethod
+    def _attach_to_network_compounds(rxn: Reaction, net_comps: dict[tuple[str, str], Compound]):
+        """ Replace the compounds of a reaction by the network compounds with the same chebi id and compartment """
+        for val in list(rxn.substrates.values()):
+            net_comp = net_comps.get((val.compound.chebi_id, val.compound.compartment.id))
+            if net_comp is not None and net_comp.id != val.compound.id:
+                rxn.remove_substrate(val.compound)
+                rxn.add_substrate(net_comp, val.stoich, update_if_exists=True)
+        for val in list(rxn.products.values()):
+            net_comp = net_comps.get((val.compound.chebi_id, val.compound.compartment.id))
+            if net_comp is not None and net_comp.id != val.compound.id:
+                rxn.remove_product(val.compound)
+                rxn.add_product(net_comp, val.stoich, update_if_exists=True)
+
     def find_gap_filling_rhea_ids(self, net: Network, tax_id: str = None, weight: str = None, partial: bool = True):
         """ Fill gaps """
 
@@ -37,29 +97,24 @@ class GapFillerHelper(BaseHelper):
         else:
             self.log_info_message(f"{len(dead_ends)} dead-end metabolite(s) found")
 
-        unicell = BiotaUnicellService.create_unicell_skeleton(tax_id=tax_id)
+        unicell = Unicell.create_graph(tax_id=tax_id)
         nodes = []
         for comp_id in dead_ends:
             comp = net.compounds[comp_id]
             if comp.is_cofactor():
                 continue
-            # if comp.chebi_id not in unicell.get_compound_id_list():
+            # if not unicell.has_node(comp.chebi_id):
             #     self.log_warning_message(
             #         f"Compound {comp.chebi_id} is not found in the unicell. It is skipped!")
             #     continue
-            if comp.chebi_id in unicell.get_compound_id_list():
+            if unicell.has_node(comp.chebi_id):
                 nodes.append(comp.chebi_id)
-        unicell_subgraph = unicell.neigbors_subgraph(nodes, radius=1)
+        unicell_subgraph = unicell.find_neighborhood(nodes, radius=1)
 
         # only select edge able to fill gaps
-        chebi_id_list = []
-        for comp in net.compounds.values():
-            chebi_id_list.append(comp.chebi_id)
-
-        added_edges = []
-        for edge in unicell_subgraph.edges:
-            if (edge[0] in chebi_id_list) and (edge[1] in chebi_id_list):
-                added_edges.append(edge)
+        chebi_ids = {comp.chebi_id for comp in net.compounds.values()}
+        added_edges = unicell_subgraph[
+            unicell_subgraph["source"].isin(chebi_ids) & unicell_subgraph["target"].isin(chebi_ids)]
 
         # net_graph = Graph(net)
         # nxgraph = copy.deepcopy(net_graph.get_nx_graph())
@@ -67,6 +122,122 @@ class GapFillerHelper(BaseHelper):
         # added_edges = list(nx.k_edge_augmentation(
         #     nxgraph, k=1, avail=unicell_subgraph.edges, weight=weight, partial=partial))
 
-        added_edge_data = [unicell_subgraph.get_edge_data(*edge) for edge in added_edges]
-        rhea_ids = [data["rhea_id"] for data in added_edge_data]
-        return list(set(rhea_ids))
+        return list({rhea_id for rhea_id in added_edges["rhea_id"] if rhea_id})
+
+    def find_gap_filling_rhea_ids_by_optimization(
+            self, net: Network, tax_id: str = None, target: str = DEAD_END_TARGET,
+            weights: dict[str, float] = None) -> list[str]:
+        """
+        Find a minimal weighted set of universal reactions to fill the gaps, with a single LP
+
+        The network is embedded in the universal problem (see `Unicell.create_universal_problem`): the compounds
+        are matched by chebi id and compartment. The LP minimizes the weighted sum of the absolute fluxes of the
+        universal reactions minus a reward for each target reaction carrying a flux of at least `EPSILON`.
+
+        :param net: The network
+        :type net: `Network`
+        :param tax_id: The taxonomy id of the universal reactions (all the reactions of biota if not given)
+        :type tax_id: `str`
+        :param target: The reactions to unblock: `dead_ends` (the blocked reactions of the network) or `biomass`
+        (the biomass reaction)
+        :type target: `str`
+        :param weights: The weights of the universal reactions, by rhea id (Defaults to 1)
+        :type weights: `dict[str, float]`
+        :return: The rhea ids of the universal reactions to add
+        :rtype: `list[str]`
+        """
+
+        core = net.get_core()
+        lower_bounds, upper_bounds = core.reaction_lower_bounds, core.reaction_upper_bounds
+        if target == self.BIOMASS_TARGET:
+            biomass_rxn = net.get_biomass_reaction()
+            if biomass_rxn is None:
+                raise BadRequestException("No biomass reaction found")
+            target_indexes = [core.get_reaction_index(biomass_rxn.id)]
+        elif target == self.DEAD_END_TARGET:
+            gaps = GapFinderHelper().analyze_gaps(net)
+            target_indexes = [core.get_reaction_index(rxn_id) for rxn_id in gaps["blocked_reaction_ids"]]
+        else:
+            raise BadRequestException(f"Invalid gap filling target '{target}'")
+
+        # reactions that cannot carry any flux are not unblocked
+        target_indexes = [j for j in target_indexes if upper_bounds[j] > 0 or lower_bounds[j] < 0]
+        if len(target_indexes) == 0:
+            self.log_info_message("No blocked reactions found")
+            return []
+        self.log_info_message(f"{len(target_indexes)} reaction(s) to unblock")
+
+        # embed the network in the universal problem
+        problem = Unicell.create_universal_problem(tax_id=tax_id)
+        net_rhea_ids = {rhea_id for rhea_id in core.reaction_rhea_ids if rhea_id}
+        universal_indexes = np.array(
+            [j for j, rhea_id in enumerate(problem["rhea_ids"]) if rhea_id and rhea_id not in net_rhea_ids],
+            dtype=np.int64)
+
+        compound_index = {}
+        for i, (comp_id, chebi_id) in enumerate(zip(core.compound_ids, core.compound_chebi_ids)):
+            if core.compound_compartments[i] >= 0:
+                compound_index.setdefault((chebi_id or comp_id, core.get_compound_compartment_id(i)), i)
+        nb_net_comps = core.get_number_of_compounds()
+        nb_rows = nb_net_comps
+        row_map = np.empty(len(problem["compound_keys"]), dtype=np.int64)
+        for i, key in enumerate(problem["compound_keys"]):
+            row = compound_index.get(key)
+            if row is None:
+                row = compound_index[key] = nb_rows
+                nb_rows += 1
+            row_map[i] = row
+
+        # only the steady compounds are balanced (the universal compounds that are not in the network are steady)
+        is_steady = np.ones(nb_rows, dtype=bool)
+        is_steady[:nb_net_comps] = core.compound_is_steady
+        steady_rows = np.flatnonzero(is_steady)
+
+        S_net = core.S.tocoo()
+        S_net = coo_matrix((S_net.data, (S_net.row, S_net.col)), shape=(nb_rows, S_net.shape[1])).tocsr()
+        S_universal = problem["S"][:, universal_indexes].tocoo()
+        S_universal = coo_matrix(
+            (S_universal.data, (row_map[S_universal.row], S_universal.col)),
+            shape=(nb_rows, len(universal_indexes))).tocsr()
+
+        # variables: network fluxes, forward and backward fluxes of the universal reactions, unblocking levels
+        nb_net_rxns, nb_universal, nb_targets = S_net.shape[1], len(universal_indexes), len(target_indexes)
+        A_eq = hstack([
+            S_net[steady_rows, :], S_universal[steady_rows, :], -S_universal[steady_rows, :],
+            coo_matrix((len(steady_rows), nb_targets))
+        ]).tocsr()
+        b_eq = np.zeros(len(steady_rows))
+
+        # z_k <= d_k * v_k, with d_k the direction in which the target reaction can carry a flux
+        directions = np.array([1.0 if upper_bounds[j] > 0 else -1.0 for j in target_indexes])
+        A_ub = hstack([
+            coo_matrix((-directions, (np.arange(nb_targets), target_indexes)), shape=(nb_targets, nb_net_rxns)),
+            coo_matrix((nb_targets, 2 * nb_universal)),
+            identity(nb_targets, format="coo")
+        ]).tocsr()
+        b_ub = np.zeros(nb_targets)
+
+        weights = weights or {}
+        universal_weights = np.array(
+            [weights.get(problem["rhea_ids"][j], 1.0) for j in universal_indexes], dtype=float)
+        c = np.concatenate([
+            np.zeros(nb_net_rxns), universal_weights, universal_weights,
+            np.full(nb_targets, -self.UNBLOCKING_REWARD * universal_weights.max(initial=1.0))
+        ])
+        bounds = np.vstack([
+            np.column_stack([lower_bounds, upper_bounds]),
+            np.tile([0.0, self.MAX_FLUX], (2 * nb_universal, 1)),
+            np.tile([0.0, self.EPSILON], (nb_targets, 1))
+        ])
+
+        res = linprog(c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq, bounds=bounds, method="highs")
+        if res.status != 0:
+            raise BadRequestException(f"The gap filling problem cannot be solved: {res.message}")
+
+        fluxes = res.x[nb_net_rxns:nb_net_rxns + nb_universal] + res.x[nb_net_rxns + nb_universal:-nb_targets]
+        nb_unblocked = int(np.sum(res.x[-nb_targets:] >= self.EPSILON * (1 - 1e-6)))
+        rhea_ids = sorted({problem["rhea_ids"][universal_indexes[j]]
+                           for j in np.flatnonzero(fluxes > self.EPSILON * 1e-3)})
+        self.log_info_message(
+            f"{nb_unblocked} of {nb_targets} reaction(s) unblocked with {len(rhea_ids)} universal reaction(s)")
+        return rhea_ids
@@ -1,34 +1,140 @@
 
 
-import pandas as pd
-from pandas import DataFrame, Series
+from collections import deque
+from typing import TypedDict
+
+import numpy as np
+from pandas import DataFrame
 
 from ....helper.base_helper import BaseHelper
 from ....network.network import Network
+from ....network.network_data.network_data import NetworkData
+
+
+class GapAnalysisDict(TypedDict):
+    orphan_compound_ids: list[str]
+    deadend_compound_ids: list[str]
+    not_produced_compound_ids: list[str]
+    not_consumed_compound_ids: list[str]
+    blocked_compound_ids: list[str]
+    blocked_reaction_ids: list[str]
 
 
 class GapFinderHelper(BaseHelper):
-    """ GapFinderHelper """
+    """
+    GapFinderHelper
 
-    def find_gaps(self, network: Network) -> DataFrame:
-        """ Find all gaps """
-        mat: DataFrame = network.create_stoichiometric_matrix()
-        mat[mat != 0] = 1
-        sum_ = mat.sum(axis=1)
-        orphan_mat: Series = (sum_ == 0)
-        deadend_mat: Series = (sum_ <= 1)
+    Finds the gaps of a network on its sparse stoichiometric matrix (see `NetworkCore`). The steady compounds are
+    analyzed in a single pass:
+    * orphan: the compound is not used by any reaction,
+    * dead-end: the compound is used by at most one reaction,
+    * not produced (resp. not consumed): no reaction can produce (resp. consume) the compound, given the bounds
+    of the reactions,
+    * blocked: the compound cannot be at steady state with a non-zero flux. The blocked compounds block their
+    reactions, which can in turn block other compounds (the cascade is propagated with a queue).
+
+    The analysis is cached on the network until the network changes.
+    """
+
+    # -- A --
+
+    def analyze_gaps(self, network: Network) -> GapAnalysisDict:
+        """
+        Find all the categories of gaps at once
+
+        :param network: The network
+        :type network: `Network`
+        :return: The ids of the orphan, dead-end, not produced, not consumed and blocked compounds, and the ids
+        of the blocked reactions
+        :rtype: `GapAnalysisDict`
+        """
+
+        table, blocked_reaction_ids = self._get_gap_analysis(network)
+        return GapAnalysisDict(
+            orphan_compound_ids=list(table.index[table["is_orphan"]]),
+            deadend_compound_ids=list(table.index[table["is_dead_end"]]),
+            not_produced_compound_ids=list(table.index[table["is_not_produced"]]),
+            not_consumed_compound_ids=list(table.index[table["is_not_consumed"]]),
+            blocked_compound_ids=list(table.index[table["is_blocked"]]),
+            blocked_reaction_ids=list(blocked_reaction_ids),
+        )
+
+    @staticmethod
+    def _analyze_gaps(network_data: NetworkData) -> tuple[DataFrame, list[str]]:
+        core = network_data.get_core()
+        S = core.S
+        lower_bounds, upper_bounds = core.reaction_lower_bounds, core.reaction_upper_bounds
+        nb_comps = core.get_number_of_compounds()
+
+        # direction-aware incidence: a reaction produces (resp. consumes) a compound if it can carry a flux
+        # in the direction that produces (resp. consumes) it
+        rows = np.repeat(np.arange(nb_comps), np.diff(S.indptr))
+        cols = S.indices
+        stoichs = S.data
+        is_used = stoichs != 0
+        forward = upper_bounds[cols] > 0
+        backward = lower_bounds[cols] < 0
+        produces = is_used & (((stoichs > 0) & forward) | ((stoichs < 0) & backward))
+        consumes = is_used & (((stoichs < 0) & forward) | ((stoichs > 0) & backward))
+        is_active = is_used & (forward | backward)
 
-        deadend_mat = pd.concat([
-            deadend_mat.to_frame(name="is_dead_end"),
-            orphan_mat.to_frame(name="is_orphan"),
-        ], axis=1)
+        nb_reactions = np.bincount(rows[is_used], minlength=nb_comps)
+        is_not_produced = np.bincount(rows[produces], minlength=nb_comps) == 0
+        is_not_consumed = np.bincount(rows[consumes], minlength=nb_comps) == 0
 
-        data = network.get_steady_compounds()
-        names = list(data.keys())
-        names = [k for k in names if k in deadend_mat.index]
-        deadend_mat = deadend_mat.loc[names, :]
+        # counters updated by the cascade
+        nb_producers = np.bincount(rows[produces], minlength=nb_comps)
+        nb_consumers = np.bincount(rows[consumes], minlength=nb_comps)
+        nb_active_reactions = np.bincount(rows[is_active], minlength=nb_comps)
 
-        return deadend_mat
+        is_steady = core.compound_is_steady
+
+        def is_blocked(i) -> bool:
+            # a compound with a single reaction forces the flux of this reaction to zero
+            return nb_producers[i] == 0 or nb_consumers[i] == 0 or nb_active_reactions[i] <= 1
+
+        compound_is_blocked = is_steady & (is_not_produced | is_not_consumed | (nb_active_reactions <= 1))
+        reaction_is_blocked = ~(upper_bounds > 0) & ~(lower_bounds < 0)
+
+        # propagate the cascade
+        S_csc = core.get_csc_matrix()
+        queue = deque(np.flatnonzero(compound_is_blocked).tolist())
+        while queue:
+            i = queue.popleft()
+            for j in S.indices[S.indptr[i]:S.indptr[i + 1]]:
+                if reaction_is_blocked[j]:
+                    continue
+                reaction_is_blocked[j] = True
+                is_forward, is_backward = upper_bounds[j] > 0, lower_bounds[j] < 0
+                start, end = S_csc.indptr[j], S_csc.indptr[j + 1]
+                for k, stoich in zip(S_csc.indices[start:end], S_csc.data[start:end]):
+                    if stoich == 0 or compound_is_blocked[k]:
+                        continue
+                    nb_active_reactions[k] -= 1
+                    if (stoich > 0 and is_forward) or (stoich < 0 and is_backward):
+                        nb_producers[k] -= 1
+                    if (stoich < 0 and is_forward) or (stoich > 0 and is_backward):
+                        nb_consumers[k] -= 1
+                    if is_steady[k] and is_blocked(k):
+                        compound_is_blocked[k] = True
+                        queue.append(k)
+
+        table = DataFrame({
+            "is_dead_end": nb_reactions[steady_indexes] <= 1,
+            "is_orphan": nb_reactions[steady_indexes] == 0,
+            "is_not_produced": is_not_produced[steady_indexes],
+            "is_not_consumed": is_not_consumed[steady_indexes],
+            "is_blocked": compound_is_blocked[steady_indexes],
+        }, index=steady_ids)
+        blocked_reaction_ids = [core.reaction_ids[j] for j in np.flatnonzero(reaction_is_blocked)]
+        return table, blocked_reaction_ids
+
+    # -- F --
+
+    def find_gaps(self, network: Network) -> DataFrame:
+        """ Find all gaps """
+        table, _ = self._get_gap_analysis(network)
+        return table.copy()
 
     # def has_deadend_compounds(self, network: Network) -> bool:
     #     """ Returns True if the network has deadend metabolites; False otherwise """
@@ -36,12 +142,22 @@ class GapFinderHelper(BaseHelper):
 
     def find_orphan_compound_ids(self, network: Network) -> list[str]:
         """ Find only orphan compounds as list """
-        df = self.find_gaps(network)
-        comp_ids = [idx for idx in df.index if df.at[idx, "is_orphan"]]
-        return comp_ids
+        return self.analyze_gaps(network)["orphan_compound_ids"]
 
     def find_deadend_compound_ids(self, network: Network) -> list[str]:
         """ Find dead-end compounds as list """
-        df = self.find_gaps(network)
-        comp_ids = [idx for idx in df.index if df.at[idx, "is_dead_end"]]
-        return comp_ids
+        return self.analyze_gaps(network)["deadend_compound_ids"]
+
+    def find_blocked_compound_ids(self, network: Network) -> list[str]:
+        """ Find the blocked compounds (including the compounds blocked by the cascade) as list """
+        return self.analyze_gaps(network)["blocked_compound_ids"]
+
+    def find_blocked_reaction_ids(self, network: Network) -> list[str]:
+        """ Find the blocked reactions (including the reactions blocked by the cascade) as list """
+        return self.analyze_gaps(network)["blocked_reaction_ids"]
+
+    # -- G --
+
+    def _get_gap_analysis(self, network: Network) -> tuple[DataFrame, list[str]]:
+        network_data = network.network_data if isinstance(network, Network) else network
+        return network_data._get_cached_data("gap_analysis", lambda: self._analyze_gaps(network_data))
@@ -1,6 +1,5 @@
 
 
-import networkx as nx
 from gws_core import BadRequestException, Table
 from pandas import DataFrame
 
@@ -15,24 +14,27 @@ class IsolateFinderHelper(BaseHelper):
 
     def find_isolates(self, network: Network) -> tuple[Table, Table]:
         graph = Graph(network=network)
-        nxgraph = graph.get_nx_graph()
 
         biomass = network.get_biomass_compound()
         if biomass is None:
             raise BadRequestException("No biomass defined")
 
+        # compounds connected to the biomass (the graph is undirected, one traversal from the biomass is enough)
+        if graph.has_node(biomass.id):
+            connected_comp_ids = graph.get_connected_component(biomass.id)
+        else:
+            connected_comp_ids = set()
+
         # compound table
         comp_data = []
-        rxn_ids = []
-        for comp in network.compounds.values():
-            has_path = nx.has_path(nxgraph, comp.id, biomass.id)
-            if has_path:
+        rxn_ids = {}
+        for comp in network.compounds.peek_values():
+            if comp.id in connected_comp_ids:
                 continue
             comp_data.append([comp.id, comp.chebi_id, comp.name])
-            for edge in nxgraph.edges(comp.id):
-                rxn_id = nxgraph.get_edge_data(*edge)["rxn_id"]
-                if rxn_id not in rxn_ids:
-                    rxn_ids.append(rxn_id)
+            if graph.has_node(comp.id):
+                for _, _, rxn_id in graph.get_edges(comp.id):
+                    rxn_ids[rxn_id] = True
 
         comp_data = DataFrame(comp_data, columns=["id", "chebi_id", "name"])
         comp_table = Table(comp_data)
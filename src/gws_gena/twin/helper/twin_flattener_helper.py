@@ -1,5 +1,6 @@
 
 from ..flat_twin import FlatTwin, Twin
+from .twin_helper import TwinHelper
 
 # ####################################################################
 #
@@ -12,9 +13,19 @@ class TwinFalltenerHelper:
     """ TwinFalltenerHelper """
     @classmethod
     def flatten(cls, twin: Twin) -> FlatTwin:
-        """ Flatten the digital twin """
+        """
+        Flatten the digital twin
+
+        The stoichiometric matrix of the flat network is assembled from the blocks of the networks of the twin
+        (see `TwinHelper.create_block_stoichiometric_matrix`), which are cached by each network.
+        """
+
         data = twin.dumps_flat()
-        return FlatTwin.loads(data)
+        flat_twin = FlatTwin.loads(data)
+        blocks = TwinHelper.create_block_stoichiometric_matrix(twin)
+        flat_twin.get_flat_network().network_data.set_sparse_stoichiometric_matrix(
+            blocks["S"], blocks["compound_ids"], blocks["reaction_ids"])
+        return flat_twin
 
     @classmethod
     def dumps_flat(cls, twin: Twin) -> dict:
@@ -30,6 +41,12 @@ class TwinFalltenerHelper:
         for net in twin.networks.values():
             net_data = net.dumps()
 
+            # the flat ids are given by the (cached) block of the network in the twin stoichiometric matrix
+            _, comp_ids, rxn_ids = net.network_data.create_sparse_stoichiometric_matrix()
+            block = net.network_data.create_flat_stoichiometric_block()
+            flat_comp_ids = dict(zip(comp_ids, block["compound_ids"]))
+            flat_rxn_ids = dict(zip(rxn_ids, block["reaction_ids"]))
+
             # flatten all compartments ids
             for current_compart_data in net_data["compartments"]:
                 compart_id = current_compart_data["id"]
@@ -42,8 +59,7 @@ class TwinFalltenerHelper:
             # flatten all compound ids
             for current_met_data in net_data["metabolites"]:
                 original_met_id = current_met_data["id"]
-                met = net.compounds[original_met_id]
-                current_met_data["id"] = net.flatten_compound_id(met)
+                current_met_data["id"] = flat_comp_ids[original_met_id]
 
                 compart_id = current_met_data["compartment"]
                 compart = net.compartments[compart_id]
@@ -55,8 +71,7 @@ class TwinFalltenerHelper:
             # flatten all reaction ids
             for current_rxn_data in net_data["reactions"]:
                 original_rxn_id = current_rxn_data["id"]
-                rxn = net.reactions[original_rxn_id]
-                current_rxn_data["id"] = net.flatten_reaction_id(rxn)
+                current_rxn_data["id"] = flat_rxn_ids[original_rxn_id]
 
                 _rxn_mapping[current_rxn_data["id"]] = {
                     "network_name": net.name,
@@ -69,9 +84,7 @@ class TwinFalltenerHelper:
 
                 current_rxn_stoichs = {}
                 for original_met_id, stoich in current_rxn_data["metabolites"].items():
-                    met = net.compounds[original_met_id]
-                    flat_met_id = net.flatten_compound_id(met)
-                    current_rxn_stoichs[flat_met_id] = stoich
+                    current_rxn_stoichs[flat_comp_ids[original_met_id]] = stoich
 
                 current_rxn_data["metabolites"] = current_rxn_stoichs
                 all_rxn_data.append(current_rxn_data)
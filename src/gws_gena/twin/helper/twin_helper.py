@@ -7,6 +7,7 @@ import pandas
 from gws_core import BadRequestException
 from pandas import DataFrame
 from scipy.linalg import null_space
+from scipy.sparse import coo_matrix, csr_matrix
 
 from ...context.helper.context_builder_helper import ContextBuilderHelper
 from ...network.reaction.reaction import Reaction
@@ -36,6 +37,14 @@ class ReducedMatrices(TypedDict):
     K: DataFrame
     EFM: DataFrame
 
+class BlockStoichiometricMatrix(TypedDict):
+    S: csr_matrix
+    compound_ids: list[str]
+    reaction_ids: list[str]
+    shared_compound_ids: list[str]
+    row_ranges: dict[str, tuple[int, int]]
+    column_ranges: dict[str, tuple[int, int]]
+
 
 class TwinHelper:
 
@@ -78,6 +87,87 @@ class TwinHelper:
         flat_net = next(iter(flat_twin.networks.values()))
         return flat_net.create_stoichiometric_matrix()
 
+    @ classmethod
+    def create_block_stoichiometric_matrix(cls, twin: Twin) -> BlockStoichiometricMatrix:
+        """
+        Creates the sparse stoichiometric matrix of a (multi-network) twin as a block matrix.
+
+        Each network gives a diagonal block made of its compounds (rows) and reactions (columns), in the
+        order of the networks of the twin. The extracellular environment compounds are shared by the networks:
+        they are not part of the diagonal blocks and give the coupling rows placed at the bottom of the matrix.
+        The block of each network is cached by the network, so only the blocks of the networks that
+        changed are recomputed. The ids of the compounds and reactions are flattened as in `Twin.flatten`.
+
+        :param twin: A twin object
+        :type twin: `Twin`
+        :returns: The block stoichiometric matrix and the ranges of rows and columns of each network
+        :rtype: `BlockStoichiometricMatrix`
+        """
+
+        if not isinstance(twin, Twin):
+            raise BadRequestException("A twin is required")
+
+        compound_ids = []
+        reaction_ids = []
+        shared_compound_index = {}
+        row_ranges = {}
+        column_ranges = {}
+        all_rows, all_cols, all_data, all_is_shared = [], [], [], []
+        nb_rows = 0
+        nb_cols = 0
+        for net in twin.networks.values():
+            block = net.network_data.create_flat_stoichiometric_block()
+            S = block["matrix"].tocoo()
+            is_shared = block["is_shared_compound"]
+
+            # private rows are numbered after the previous blocks, shared rows are numbered
+            # in the coupling rows (shifted after the loop)
+            row_map = np.zeros(len(is_shared), dtype=np.int64)
+            private_idx = np.flatnonzero(~is_shared)
+            row_map[private_idx] = nb_rows + np.arange(len(private_idx))
+            for i in np.flatnonzero(is_shared):
+                comp_id = block["compound_ids"][i]
+                if comp_id not in shared_compound_index:
+                    shared_compound_index[comp_id] = len(shared_compound_index)
+                row_map[i] = shared_compound_index[comp_id]
+
+            compound_ids.extend(block["compound_ids"][i] for i in private_idx)
+            reaction_ids.extend(block["reaction_ids"])
+            row_ranges[net.name] = (nb_rows, nb_rows + len(private_idx))
+            column_ranges[net.name] = (nb_cols, nb_cols + S.shape[1])
+
+            all_rows.append(row_map[S.row])
+            all_cols.append(S.col + nb_cols)
+            all_data.append(S.data)
+            all_is_shared.append(is_shared[S.row])
+            nb_rows += len(private_idx)
+            nb_cols += S.shape[1]
+
+        if all_rows:
+            rows = np.concatenate(all_rows)
+            is_shared = np.concatenate(all_is_shared)
+            rows[is_shared] += nb_rows
+            cols = np.concatenate(all_cols)
+            data = np.concatenate(all_data)
+        else:
+            rows = cols = np.zeros(0, dtype=np.int64)
+            data = np.zeros(0)
+
+        shared_compound_ids = list(shared_compound_index.keys())
+        S = coo_matrix(
+            (data, (rows, cols)),
+            shape=(nb_rows + len(shared_compound_ids), nb_cols)
+        ).tocsr()
+
+        return BlockStoichiometricMatrix(
+            S=S,
+            compound_ids=[*compound_ids, *shared_compound_ids],
+            reaction_ids=reaction_ids,
+            shared_compound_ids=shared_compound_ids,
+            row_ranges=row_ranges,
+            column_ranges=column_ranges
+        )
+
     @ classmethod
     def create_steady_stoichiometric_matrix(cls, flat_twin: FlatTwin, ignore_cofactors=False) -> DataFrame:
         """
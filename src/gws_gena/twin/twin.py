@@ -124,6 +124,13 @@ class Twin(ResourceSet):
         twin.network_contexts = self.network_contexts.copy()
         return twin
 
+    def create_block_stoichiometric_matrix(self) -> dict:
+        """
+        Create the sparse block stoichiometric matrix of the twin (see `TwinHelper.create_block_stoichiometric_matrix`)
+        """
+        from .helper.twin_helper import TwinHelper
+        return TwinHelper.create_block_stoichiometric_matrix(self)
+
     # -- D --
 
     def dumps(self, deep=False) -> dict:
@@ -1,36 +1,137 @@
 import json
 import os
-import pickle
+import time
+from typing import TypedDict
 
-from gws_core import Logger
+import numpy as np
+from gws_biota import Compound as BiotaCompound
+from gws_biota import Enzyme as BiotaEnzyme
+from gws_biota import Reaction as BiotaReaction
+from gws_biota import Taxonomy as BiotaTaxonomy
+from gws_core import BadRequestException, Logger, Settings
 from pandas import DataFrame
+from scipy.sparse import csc_matrix
 
-from gws_gena import DataProvider
-
+from ..network.graph.graph import Graph
+from ..network.helper.biota_lookup_helper import BiotaLookupHelper
+from ..network.helper.lru_cache import LRUCache
 from ..network.network import Network
+from ..network.network_data.helper.network_data_binary_helper import NetworkDataBinaryHelper
+from ..network.network_data.network_core import NetworkCore
+from ..network.typing.network_typing import NetworkDict
+from ..test.data_provider import DataProvider
+
+
+class UnicellLookupTablesDict(TypedDict):
+    version: str
+    compound_chebi_ids: frozenset[str]
+    reaction_rhea_ids: frozenset[str]
+
+
+class UnicellProblemDict(TypedDict):
+    S: csc_matrix
+    compound_keys: list[tuple[str, str]]
+    rhea_ids: list[str]
 
 
 class Unicell:
+
+    VERSION_CHECK_INTERVAL = 300  # seconds
+
+    # process-level cache of the lookup tables
+    _lookup_tables: UnicellLookupTablesDict = None
+    _biota_version: tuple[float, str] = None
+    # process-level cache of the network cores, by store file
+    _cores = LRUCache(4)
+    # process-level cache of the graphs, by store file
+    _graphs = LRUCache(4)
+    # process-level cache of the universal problems, by store file
+    _problems = LRUCache(4)
+
     @classmethod
-    def create_network(cls, tax_id: str = None, refresh: bool = False) -> Network:
-        data_dir = os.path.join(DataProvider.get_test_data_dir(), "unicell")
-        if tax_id:
-            file_path = os.path.join(data_dir, f"network_{tax_id}.pkl")
-        else:
-            file_path = os.path.join(data_dir, "network_all.pkl")
+    def get_data_dir(cls) -> str:
+        """
+        Get the directory of the data persisted by gena (e.g. the unicell store, the reconstruction cache)
+
+        The directory is the `data_dir` variable of the gws_gena settings if it is set, the `gws_gena` directory
+        of the data directory of the lab otherwise. The test data directory is only used as a fallback, when the
+        data directory of the lab is not available.
+        """
+
+        settings = Settings.get_instance()
+        data_dir = settings.get_variable("gws_gena", "data_dir")
+        if not data_dir:
+            try:
+                data_dir = os.path.join(Settings.get_data_dir(), "gws_gena")
+            except Exception as err:
+                Logger.warning(
+                    f"The data directory of the lab is not available ({err}), the test data directory is used")
+                data_dir = os.path.join(DataProvider.get_test_data_dir(), "unicell")
         if not os.path.exists(data_dir):
             os.makedirs(data_dir)
+        return data_dir
 
-        net = None
-        if not refresh and os.path.exists(file_path):
-            with open(file_path, "rb") as fp:
-                net = pickle.load(fp)
+    @classmethod
+    def create_network(cls, tax_id: str = None, refresh: bool = False) -> Network:
+        """
+        Create the unicell network (i.e. all the reactions of biota) or the network of a taxonomy
 
-        if net is None:
-            net = Network.from_biota(tax_id=tax_id)
-            with open(file_path, "wb") as fp:
-                pickle.dump(net, fp)
-        return net
+        The networks are persisted in a versioned store (see `get_store_file`). The network is created from the
+        stored dump with `Network.loads`, which still looks up biota (e.g. enzymes, compartments): use
+        `create_graph`, `create_universal_problem` or `create_stoichiometric_matrix` when only the stoichiometry
+        is needed, they read the store directly.
+        """
+
+        file_path = cls.get_store_file(tax_id=tax_id, refresh=refresh)
+        data = NetworkDataBinaryHelper().load(file_path)
+        return Network.loads(data)
+
+    @classmethod
+    def get_store_file(cls, tax_id: str = None, refresh: bool = False) -> str:
+        """
+        Get the path of the store file of the unicell network (or of the network of a taxonomy).
+
+        The store is keyed by the biota version, the format version of the files and the taxonomy. Each file holds
+        the CSR stoichiometry and the columnar metadata of a network (see `NetworkDataBinaryHelper`) and can be
+        memory-mapped.
+        The file of the unicell network is built from biota if it does not exist. The files of the taxonomies
+        are built by slicing the unicell network with the ids of the reactions of the taxonomy.
+        """
+
+        store_dir = os.path.join(
+            cls.get_data_dir(), f"store_{cls.get_biota_version()}_v{NetworkDataBinaryHelper.FORMAT_VERSION}")
+        if not os.path.exists(store_dir):
+            os.makedirs(store_dir)
+        file_path = os.path.join(store_dir, f"network_{tax_id}.npz" if tax_id else "network_all.npz")
+
+        if refresh or not os.path.exists(file_path):
+            if tax_id:
+                data = cls._create_taxonomy_dump(tax_id)
+            else:
+                data = Network.from_biota().dumps()
+            # write then rename, the file may be read by other processes
+            tmp_file_path = file_path + f".{os.getpid()}.tmp"
+            NetworkDataBinaryHelper().dump(data, tmp_file_path)
+            os.replace(tmp_file_path, file_path)
+        return file_path
+
+    @classmethod
+    def _create_taxonomy_dump(cls, tax_id: str) -> NetworkDict:
+        tax = BiotaTaxonomy.get_or_none(BiotaTaxonomy.tax_id == tax_id)
+        if tax is None:
+            raise BadRequestException(f"No taxonomy found with taxonomy id {tax_id}")
+        Logger.info(f"Creating network with tax_id={tax_id} ({tax.name}) from the unicell network ...")
+
+        query = BiotaReaction.search_by_tax_ids(tax.tax_id).where(BiotaReaction.direction == "UN")
+        rhea_ids = {biota_rxn.rhea_id for biota_rxn in query}
+
+        data = NetworkDataBinaryHelper().load(cls.get_store_file())
+        reactions = [rxn_data for rxn_data in data["reactions"] if rxn_data["rhea_id"] in rhea_ids]
+        comp_ids = {comp_id for rxn_data in reactions for comp_id in rxn_data["metabolites"]}
+        data["name"] = tax.name
+        data["metabolites"] = [comp_data for comp_data in data["metabolites"] if comp_data["id"] in comp_ids]
+        data["reactions"] = reactions
+        return data
 
     @classmethod
     def create_bigg_network(cls, refresh: bool = False):
@@ -44,8 +145,134 @@ class Unicell:
 
         return net
 
+    @classmethod
+    def create_graph(cls, tax_id: str = None, refresh: bool = False, skip_cofactors: bool = False) -> Graph:
+        """
+        Create the graph of the unicell network (or of the network of a taxonomy), with the chebi ids as nodes.
+        The graph is created from the core of the network (the network is not created) and cached in the process.
+        """
+
+        file_path = cls.get_store_file(tax_id=tax_id, refresh=refresh)
+        key = (file_path, skip_cofactors)
+        graph = None if refresh else cls._graphs.get(key)
+        if graph is None:
+            core = cls._get_core_from_store(file_path, refresh=refresh)
+            graph = Graph.from_stoichiometric_matrix(
+                core.get_csc_matrix(), core.compound_ids, core.reaction_ids,
+                chebi_ids=core.compound_chebi_ids, rhea_ids=core.reaction_rhea_ids,
+                use_chebi_ids_as_nodes=True, skip_cofactors=skip_cofactors)
+            cls._graphs.set(key, graph)
+        return graph
+
+    @classmethod
+    def create_universal_problem(cls, tax_id: str = None, refresh: bool = False) -> UnicellProblemDict:
+        """
+        Create the universal problem of the unicell network (or of the network of a taxonomy), i.e. its
+        stoichiometric matrix (compounds x reactions) with the compounds keyed by `(chebi_id, compartment)` and
+        the reactions keyed by rhea id, so that it can be embedded in the problem of another network.
+        The problem is created from the core of the network (the network is not created) and cached in the process.
+        """
+
+        file_path = cls.get_store_file(tax_id=tax_id, refresh=refresh)
+        problem = None if refresh else cls._problems.get(file_path)
+        if problem is None:
+            core = cls._get_core_from_store(file_path, refresh=refresh)
+            problem = UnicellProblemDict(
+                S=core.get_csc_matrix(),
+                compound_keys=[
+                    (chebi_id or comp_id, core.get_compound_compartment_id(i))
+                    for i, (comp_id, chebi_id) in enumerate(zip(core.compound_ids, core.compound_chebi_ids))],
+                rhea_ids=core.reaction_rhea_ids)
+            cls._problems.set(file_path, problem)
+        return problem
+
     @classmethod
     def create_stoichiometric_matrix(cls, tax_id: str = None, refresh: bool = False) -> DataFrame:
-        net = cls.create_network(tax_id=tax_id, refresh=refresh)
-        stoich_matrix = net.create_stoichiometric_matrix()
-        return stoich_matrix
+        """ Create the stoichiometric matrix of the unicell network, from its core (the network is not created) """
+        core = cls.get_core(tax_id=tax_id, refresh=refresh)
+        return DataFrame(
+            index=core.compound_ids,
+            columns=core.reaction_ids,
+            data=core.S.toarray()
+        )
+
+    @classmethod
+    def get_biota_version(cls, refresh: bool = False) -> str:
+        """
+        Get the version stamp of the biota DB, computed from the number of rows and the last id of the compound,
+        reaction and enzyme tables. The stamp is checked again after `VERSION_CHECK_INTERVAL` seconds.
+        """
+
+        now = time.monotonic()
+        if not refresh and cls._biota_version is not None and now - cls._biota_version[0] < cls.VERSION_CHECK_INTERVAL:
+            return cls._biota_version[1]
+
+        parts = []
+        for model in (BiotaCompound, BiotaReaction, BiotaEnzyme):
+            last = model.select(model.id).order_by(model.id.desc()).first()
+            parts.append(f"{model.select().count()}.{last.id if last is not None else 0}")
+        version = "-".join(parts)
+        cls._biota_version = (now, version)
+        return version
+
+    @classmethod
+    def get_core(cls, tax_id: str = None, refresh: bool = False) -> NetworkCore:
+        """
+        Get the core of the unicell network (or of the network of a taxonomy), read from the store without creating
+        the network (see `NetworkCore.from_arrays`). The core is cached in the process.
+        """
+
+        file_path = cls.get_store_file(tax_id=tax_id, refresh=refresh)
+        return cls._get_core_from_store(file_path, refresh=refresh)
+
+    @classmethod
+    def _get_core_from_store(cls, file_path: str, refresh: bool = False) -> NetworkCore:
+        core = None if refresh else cls._cores.get(file_path)
+        if core is None:
+            core = NetworkCore.from_arrays(NetworkDataBinaryHelper().load_arrays(file_path, mmap_mode="r"))
+            cls._cores.set(file_path, core)
+        return core
+
+    @classmethod
+    def get_lookup_tables(cls, refresh: bool = False) -> UnicellLookupTablesDict:
+        """
+        Get the lookup tables of the unicell network, i.e. the chebi ids of its compounds and the rhea ids of
+        its reactions that exist in biota (the biota entities can then be fetched with `BiotaLookupHelper`).
+
+        The tables are built once per biota version. They are cached in the process and persisted in a compact
+        file (memory-mapped when loaded).
+        """
+
+        version = cls.get_biota_version()
+        if not refresh and cls._lookup_tables is not None and cls._lookup_tables["version"] == version:
+            return cls._lookup_tables
+
+        file_path = os.path.join(cls.get_data_dir(), f"lookup_tables_{version}.npz")
+        binary_helper = NetworkDataBinaryHelper()
+        if not refresh and os.path.exists(file_path):
+            arrays = binary_helper.load_arrays(file_path, mmap_mode="r")
+            compound_chebi_ids = frozenset(arrays["compound_chebi_ids"].tolist())
+            reaction_rhea_ids = frozenset(arrays["reaction_rhea_ids"].tolist())
+        else:
+            Logger.info(f"Building the unicell lookup tables (biota version {version}) ...")
+            unicell = cls.create_network(refresh=refresh)
+            chebi_ids = [comp.chebi_id for comp in unicell.compounds.peek_values() if comp.chebi_id]
+            rhea_ids = [rxn.rhea_id for rxn in unicell.reactions.peek_values() if rxn.rhea_id]
+            compound_chebi_ids = frozenset(BiotaLookupHelper.get_compounds_by_chebi_ids(chebi_ids))
+            reaction_rhea_ids = frozenset(BiotaLookupHelper.get_reactions_by_rhea_ids(rhea_ids))
+
+            metadata = json.dumps({"version": version}).encode("utf-8")
+            with open(file_path, "wb") as fp:
+                np.savez(
+                    fp,
+                    compound_chebi_ids=np.array(sorted(compound_chebi_ids), dtype=str),
+                    reaction_rhea_ids=np.array(sorted(reaction_rhea_ids), dtype=str),
+                    **{binary_helper.METADATA_KEY: np.frombuffer(metadata, dtype=np.uint8)}
+                )
+
+        cls._lookup_tables = UnicellLookupTablesDict(
+            version=version,
+            compound_chebi_ids=compound_chebi_ids,
+            reaction_rhea_ids=reaction_rhea_ids
+        )
+        return cls._lookup_tables
@@ -1,8 +1,11 @@
 import os
+import tempfile
 
 from gws_core import BaseTestCase, File, TaskRunner
-from gws_gena import DataProvider
+from gws_gena import DataProvider, NetworkImporter
+from gws_gena.cobra.conversion_annotation._conversion_annotation import AnnotationDBIndex
 from gws_gena.cobra.conversion_annotation.conversion_annotation import ConvertAnnotation
+from gws_gena.cobra.conversion_annotation.conversion_annotation_helper import ConversionAnnotationHelper
 
 
 class TestConvertAnnotation(BaseTestCase):
@@ -33,3 +36,36 @@ class TestConvertAnnotation(BaseTestCase):
         self.assertEqual([374], table.get_column_data("EC number filled"))
         self.assertEqual([650], table.get_column_data("Number metabolites"))
         self.assertEqual([0], table.get_column_data("ChEBI filled"))
+
+    def test_convert_annotation_network(self):
+        data_dir = DataProvider.get_test_data_dir()
+        net = NetworkImporter.call(File(path=os.path.join(data_dir, "ecoli", "ecoli.json")), {"add_biomass": True})
+
+        # small databases, indexed next to their file
+        with tempfile.TemporaryDirectory() as db_dir:
+            db_metabolites_path = os.path.join(db_dir, "metabolites.txt")
+            db_reactions_path = os.path.join(db_dir, "reactions.txt")
+            with open(db_metabolites_path, "w", encoding="utf-8") as file:
+                file.write("BIGG\tName\tCHEBI\nglc__D\tD-Glucose\tCHEBI:4167\npyr\tPyruvate\t\n")
+            with open(db_reactions_path, "w", encoding="utf-8") as file:
+                file.write("BIGG\tRHEA\tEC-number\nPDH\t28042\t1.2.4.1\nPDH\t28043\t\n")
+
+            net_annotated, results = ConversionAnnotationHelper().annotate(
+                net, db_metabolites_path, db_reactions_path, "BiGG", "Other", "BiGG", "Other")
+
+            self.assertTrue(os.path.exists(db_reactions_path + AnnotationDBIndex.INDEX_FILE_SUFFIX))
+            self.assertEqual(net_annotated.reactions["PDH"].rhea_id, "RHEA:28042")
+            self.assertFalse(net.reactions["PDH"].rhea_id)
+            # the empty chebi ids are skipped
+            self.assertEqual(net_annotated.compounds["pyr_c"].chebi_id, net.compounds["pyr_c"].chebi_id)
+            self.assertEqual(results["Rhea filled"].tolist(), [1])
+            self.assertEqual(results["Number reactions"].tolist(), [len(net.reactions)])
+            self.assertEqual(results["Number metabolites"].tolist(), [len(net.compounds)])
+
+            # the index file is reused
+            db_index = AnnotationDBIndex.load(db_reactions_path, AnnotationDBIndex.REACTION_KEY_COLUMNS)
+            self.assertEqual(db_index.get("BIGG", "PDH")["RHEA"], "28042")
+            self.assertIsNone(db_index.get("BIGG", "PFK"))
+            # only the annotation columns of the indexed rows are kept
+            self.assertEqual(db_index.header, ["RHEA", "EC-number"])
+            self.assertEqual(len(db_index.rows), 1)
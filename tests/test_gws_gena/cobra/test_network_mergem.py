@@ -1,7 +1,8 @@
 import os
 
 from gws_core import BaseTestCase, File, TaskRunner
-from gws_gena import DataProvider, NetworkMergem
+from gws_gena import DataProvider, NetworkImporter, NetworkMergem
+from gws_gena.network.helper.network_mergem_helper import NetworkMergemHelper
 
 
 class TestMergem(BaseTestCase):
@@ -22,3 +23,27 @@ class TestMergem(BaseTestCase):
 
         self.assertTrue("PDH" in net_merged.reactions)
         self.assertTrue("merged-objectives" in net_merged.reactions)
+
+    def test_native_mergem(self):
+        data_dir = DataProvider.get_test_data_dir()
+        file_path = os.path.join(data_dir, "ecoli", "ecoli.json")
+        net1 = NetworkImporter.call(File(path=file_path), {})
+        net2 = NetworkImporter.call(File(path=file_path), {})
+
+        helper = NetworkMergemHelper()
+        net_merged = helper.merge(net1, net2, keep_objective="1")
+
+        # all the reactions of the second network are matched
+        self.assertEqual(len(net_merged.reactions), len(net1.reactions))
+        self.assertEqual(len(net_merged.compounds), len(net1.compounds))
+        self.assertEqual(helper.translation["reaction_ids"]["PDH"], "PDH")
+        self.assertEqual(len(net2.reactions), len(net1.reactions))
+
+        tester = TaskRunner(
+            params={"engine": "native", "keep_objective": "2"},
+            inputs={"network_1": net1, "network_2": net2},
+            task_type=NetworkMergem,
+        )
+        net_merged = tester.run()["network"]
+        self.assertEqual(len(net_merged.reactions), len(net1.reactions))
+        self.assertTrue("merged-objectives" not in net_merged.reactions)
@@ -13,3 +13,14 @@ class TestCompartment(BaseTestCaseUsingFullBiotaDB):
 
         compart2 = Compartment.from_biota(go_id="GO:0016049")
         self.assertEqual(compart2.name, "biomass")
+
+    def test_compartment_cache(self):
+        Compartment.prefetch_biota_compartments()
+        compart = Compartment.from_biota(bigg_id="c")
+        self.assertEqual(compart.go_id, Compartment.CYTOSOL_GO_ID)
+        self.assertTrue(compart.is_steady)
+
+        # the cached compartments are the same as the ones of biota
+        compart2 = Compartment.from_biota(go_id=Compartment.CYTOSOL_GO_ID)
+        self.assertEqual(compart2.bigg_id, "c")
+        self.assertIsNone(Compartment.from_biota(bigg_id="unknown_compartment"))
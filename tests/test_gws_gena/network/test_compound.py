@@ -1,5 +1,7 @@
 from gws_biota import BaseTestCaseUsingFullBiotaDB
+from gws_biota import Compound as BiotaCompound
 from gws_gena import Compartment, Compound
+from gws_gena.network.helper.biota_fetch_helper import BiotaFetchHelper
 
 
 class TestNetwork(BaseTestCaseUsingFullBiotaDB):
@@ -25,3 +27,27 @@ class TestNetwork(BaseTestCaseUsingFullBiotaDB):
 
         comp3 = Compound.from_biota(kegg_id="C00293")
         self.assertEqual(comp3.monoisotopic_mass, 180.06339)
+
+    def test_compound_type(self):
+        compart = Compartment.from_biota(go_id=Compartment.CYTOSOL_GO_ID)
+        comp = Compound(dict(name="ATP", compartment=compart, chebi_id="CHEBI:30616"))
+        self.assertTrue(comp.is_cofactor())
+        self.assertEqual(comp.get_type(), Compound.COFACTOR_TYPE)
+        self.assertEqual(comp.copy().get_type(), Compound.COFACTOR_TYPE)
+
+        # the classification is updated when the compound changes
+        comp.chebi_id = "CHEBI:17234"
+        comp.name = "glucose"
+        self.assertFalse(comp.is_cofactor())
+        self.assertEqual(comp.get_type(), Compound.DEFAULT_TYPE)
+
+    def test_concurrent_fetch(self):
+        chebi_ids = ["CHEBI:17234", "CHEBI:15377", "CHEBI:15378", "CHEBI:16236", "CHEBI:30616", "CHEBI:456216"]
+
+        def _fetch(batch):
+            return [comp.chebi_id for comp in BiotaCompound.select().where(BiotaCompound.chebi_id.in_(batch))]
+
+        sequential = [chebi_id for batch in [chebi_ids[i:i + 2] for i in range(0, len(chebi_ids), 2)]
+                      for chebi_id in _fetch(batch)]
+        concurrent = BiotaFetchHelper.fetch_in_batches(_fetch, chebi_ids, batch_size=2)
+        self.assertEqual(concurrent, sequential)
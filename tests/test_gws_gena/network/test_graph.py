@@ -1,5 +1,6 @@
 import os
 
+import networkx as nx
 from gws_biota import BaseTestCaseUsingFullBiotaDB
 from gws_core import File
 from gws_gena import DataProvider, NetworkImporter
@@ -23,3 +24,56 @@ class TestGraph(BaseTestCaseUsingFullBiotaDB):
         self.assertTrue("X2_e" in nodes)
         self.assertTrue("X1_c" in nodes)
         self.print(nodes)
+
+    def test_sparse_graph(self):
+        data_dir = DataProvider.get_test_data_dir()
+        file_path = os.path.join(data_dir, "toy", "toy.json")
+        net = NetworkImporter.call(
+            File(path=file_path), params={"skip_orphans": True, "add_biomass": True}
+        )
+
+        graph = Graph(net)
+        nxgraph = graph.get_nx_graph()
+        self.assertEqual(set(graph.get_node_ids()), set(nxgraph.nodes))
+
+        # the queries on the sparse graph match networkx
+        component = graph.get_connected_component("X2_c")
+        self.assertEqual(component, nx.node_connected_component(nxgraph, "X2_c"))
+        self.assertEqual(sum(len(comp) for comp in graph.get_connected_components()), nxgraph.number_of_nodes())
+        self.assertEqual(set(graph.find_neigbors(["X2_c"], radius=2)), set(nx.ego_graph(nxgraph, "X2_c", radius=2)))
+        self.assertEqual(
+            {rxn_id for _, _, rxn_id in graph.get_edges("X2_c")},
+            {data["rxn_id"] for _, _, data in nxgraph.edges("X2_c", data=True)})
+
+        # the graph is cached on the network
+        self.assertIs(Graph(net)._data, graph._data)
+
+    def test_neighborhood(self):
+        data_dir = DataProvider.get_test_data_dir()
+        file_path = os.path.join(data_dir, "toy", "toy.json")
+        net = NetworkImporter.call(
+            File(path=file_path), params={"skip_orphans": True, "add_biomass": True}
+        )
+
+        graph = Graph(net)
+        nxgraph = graph.get_nx_graph()
+
+        # the induced subgraph matches networkx
+        nodes = ["X2_c", "X1_c"]
+        edges = graph.find_neighborhood(nodes, radius=2)
+        ego_nodes = set()
+        for node in nodes:
+            ego_nodes.update(nx.ego_graph(nxgraph, node, radius=2))
+        subgraph = nxgraph.subgraph(ego_nodes)
+        self.assertEqual(len(edges), subgraph.number_of_edges())
+        self.assertEqual(set(edges["rxn_id"]), {data["rxn_id"] for _, _, data in subgraph.edges(data=True)})
+
+        # the excluded nodes are not traversed
+        edges = graph.find_neighborhood(["X2_c"], radius=2, exclude_nodes=["X2_c"])
+        self.assertEqual(len(edges), 0)
+
+        # graph created from the stoichiometric matrix
+        core = net.network_data.get_core()
+        other_graph = Graph.from_stoichiometric_matrix(core.get_csc_matrix(), core.compound_ids, core.reaction_ids)
+        self.assertEqual(
+            set(other_graph.find_neigbors(["X2_c"], radius=2)), set(graph.find_neigbors(["X2_c"], radius=2)))
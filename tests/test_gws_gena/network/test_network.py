@@ -1,8 +1,9 @@
 import os
+from unittest.mock import patch
 
 from gws_biota import BaseTestCaseUsingFullBiotaDB
 from gws_core import File
-from gws_gena import DataProvider, NetworkImporter
+from gws_gena import Compound, DataProvider, NetworkImporter, Reaction
 from pandas import DataFrame
 
 
@@ -122,6 +123,20 @@ class TestNetwork(BaseTestCaseUsingFullBiotaDB):
         self.assertEqual(len(net.compounds), 93)
         self.assertEqual(len(net.reactions), 95)
 
+    def test_network_import_streaming(self):
+        self.print("Test Network streaming import")
+        data_dir = DataProvider.get_test_data_dir()
+        file_path = os.path.join(data_dir, "ecoli", "ecoli.json")
+
+        net = NetworkImporter.call(File(path=file_path), params={"add_biomass": True})
+        streamed_net = NetworkImporter.call(File(path=file_path), params={"add_biomass": True, "streaming": True})
+        self.assertEqual(len(streamed_net.compounds), 93)
+        self.assertEqual(len(streamed_net.reactions), 95)
+        self.assertEqual(streamed_net.compounds["o2_env"].compartment.id, "env")
+        self.assertEqual(streamed_net.get_compound_ids(), net.get_compound_ids())
+        self.assertEqual(streamed_net.get_reaction_ids(), net.get_reaction_ids())
+        self.assertTrue(streamed_net.create_stoichiometric_matrix().equals(net.create_stoichiometric_matrix()))
+
     def test_network_import_file_with_metabolite_biomass(self):
         data_dir = DataProvider.get_test_data_dir()
         data_dir = os.path.join(data_dir, "ecoli")
@@ -138,3 +153,143 @@ class TestNetwork(BaseTestCaseUsingFullBiotaDB):
         self.assertEqual(net.compounds["o2_env"].compartment.is_steady, False)
         self.assertEqual(len(net.reactions), 95)
         self.assertEqual(net.reactions["EX_o2_e"].id, "EX_o2_e")
+
+    def test_network_copy(self):
+        self.print("Test Network Copy")
+        data_dir = DataProvider.get_test_data_dir()
+        file_path = os.path.join(data_dir, "small_net", "small_net.json")
+
+        net = NetworkImporter.call(
+            File(path=file_path), params={"skip_orphans": True, "add_biomass": True}
+        )
+        net_copy = net.copy()
+        self.assertEqual(net_copy.get_reaction_ids(), net.get_reaction_ids())
+        self.assertEqual(net_copy.get_compound_ids(), net.get_compound_ids())
+
+        # the copies are independent
+        net_copy.reactions["GLNabc"].lower_bound = -1e-9
+        net_copy.reactions["GLNabc"].upper_bound = 1e-9
+        net_copy.update_reaction_recon_tag("GLNabc", {"knocked_out": True})
+        self.assertEqual(net_copy.reactions["GLNabc"].upper_bound, 1e-9)
+        self.assertNotEqual(net.reactions["GLNabc"].upper_bound, 1e-9)
+        self.assertEqual(net.get_reaction_recon_tag("GLNabc"), {})
+
+        net.remove_reaction("glc_D_transport")
+        self.assertEqual(len(net.reactions), 2)
+        self.assertEqual(len(net_copy.reactions), 3)
+        self.assertNotIn("glc_D_transport", [rxn["id"] for rxn in net.dumps()["reactions"]])
+        self.assertEqual(len(net_copy.dumps()["reactions"]), 3)
+
+    def test_network_core(self):
+        self.print("Test Network Core")
+        data_dir = DataProvider.get_test_data_dir()
+        file_path = os.path.join(data_dir, "small_net", "small_net.json")
+
+        net = NetworkImporter.call(
+            File(path=file_path), params={"skip_orphans": True, "add_biomass": True}
+        )
+        core = net.get_core()
+        self.assertEqual(core.compound_ids, net.get_compound_ids())
+        self.assertEqual(core.reaction_ids, net.get_reaction_ids())
+        self.assertTrue((core.S.toarray() == net.create_stoichiometric_matrix().to_numpy()).all())
+
+        i = core.get_compound_index("biomass_b")
+        self.assertTrue(core.compound_is_biomass[i])
+        self.assertFalse(core.compound_is_steady[i])
+        rxn_indexes, stoichs = core.get_compound_stoichiometry(i)
+        self.assertEqual([core.reaction_ids[j] for j in rxn_indexes], ["biomass"])
+        self.assertEqual(list(stoichs), [1.0])
+
+        # the compartments are stored as codes
+        self.assertEqual(core.get_compound_compartment_id(i), net.compounds["biomass_b"].compartment.id)
+        code = core.compound_compartments[i]
+        self.assertTrue(core.compartment_is_biomass[code])
+        self.assertEqual(core.compound_chebi_ids[i], net.compounds["biomass_b"].chebi_id or "")
+
+        # the core is refreshed when the network changes
+        self.assertIs(net.get_core(), core)
+        net.reactions["GLNabc"].upper_bound = 10.0
+        self.assertIsNot(net.get_core(), core)
+        self.assertEqual(net.get_reaction_bounds().loc["GLNabc", "ub"], 10.0)
+
+    def test_network_indexes(self):
+        self.print("Test Network Indexes")
+        data_dir = DataProvider.get_test_data_dir()
+        file_path = os.path.join(data_dir, "small_net", "small_net.json")
+
+        net = NetworkImporter.call(
+            File(path=file_path), params={"skip_orphans": True, "add_biomass": True}
+        )
+        self.assertEqual(net.get_biomass_reaction().id, "biomass")
+        self.assertEqual(net.get_biomass_compound().id, "biomass_b")
+        cytosol_go_id = net.compounds["atp_c"].compartment.go_id
+        self.assertIn("atp_c", net.get_compounds_by_compartments([cytosol_go_id]))
+        self.assertEqual(len(net.get_steady_compounds()) + len(net.get_non_steady_compounds()), 7)
+
+        # the indexes are updated when the network changes
+        net.remove_compound("biomass_b")
+        self.assertIsNone(net.get_biomass_compound())
+        self.assertIsNone(net.get_biomass_reaction())
+        net.remove_compound("atp_c")
+        self.assertNotIn("atp_c", net.get_compounds_by_compartments([cytosol_go_id]))
+        self.assertEqual(len(net.get_steady_compounds()) + len(net.get_non_steady_compounds()), 5)
+
+    def test_network_mass_and_charge_balance(self):
+        self.print("Test Network Mass and Charge Balance")
+        data_dir = DataProvider.get_test_data_dir()
+        file_path = os.path.join(data_dir, "small_net", "small_net.json")
+
+        net = NetworkImporter.call(
+            File(path=file_path), params={"skip_orphans": True, "add_biomass": True}
+        )
+        rxn = net.reactions["glc_D_transport"]
+        self.assertEqual(rxn.compute_mass_and_charge_balance(), {"mass": None, "charge": None})
+
+        # the balances are updated when the compounds change
+        for reaction_compound in [*rxn.substrates.values(), *rxn.products.values()]:
+            reaction_compound.compound.mass = 180.15588
+            reaction_compound.compound.charge = 0.0
+            reaction_compound.compound.formula = "C6H12O6"
+        self.assertEqual(rxn.compute_mass_and_charge_balance(), {"mass": 0.0, "charge": 0.0})
+
+        balance = net.compute_mass_and_charge_balance()
+        self.assertEqual(balance.loc["glc_D_transport", "mass"], 0.0)
+        self.assertEqual(balance.loc["glc_D_transport", "C"], 0.0)
+        self.assertTrue(balance.isna().loc["GLNabc"].all())
+
+        rxn.products["glc_D_c"].stoich = 2.0
+        balance = net.compute_mass_and_charge_balance()
+        self.assertEqual(balance.loc["glc_D_transport", "C"], -6.0)
+        self.assertEqual(rxn.compute_mass_and_charge_balance()["mass"], -180.15588)
+
+    def test_network_copy_after_access(self):
+        self.print("Test Network Copy after access")
+        data_dir = DataProvider.get_test_data_dir()
+        file_path = os.path.join(data_dir, "small_net", "small_net.json")
+
+        net = NetworkImporter.call(
+            File(path=file_path), params={"skip_orphans": True, "add_biomass": True}
+        )
+        # the copy of a loaded network copies no compound and no reaction
+        with patch.object(Compound, "copy", autospec=True) as compound_copy, \
+                patch.object(Reaction, "copy", autospec=True) as reaction_copy:
+            net_copy = net.copy()
+        compound_copy.assert_not_called()
+        reaction_copy.assert_not_called()
+
+        # each network copies a reaction on its own first write
+        rxn = net.reactions["GLNabc"]
+        ub = net.get_reaction_bounds().loc["GLNabc", "ub"]
+        self.assertEqual(net_copy.get_reaction_bounds().loc["GLNabc", "ub"], ub)
+        rxn.upper_bound = 1e-9
+        self.assertIs(net.reactions["GLNabc"], rxn)
+        self.assertEqual(net.get_reaction_bounds().loc["GLNabc", "ub"], 1e-9)
+        self.assertEqual(net_copy.reactions["GLNabc"].upper_bound, ub)
+        self.assertEqual(net_copy.get_reaction_bounds().loc["GLNabc", "ub"], ub)
+
+        # the reactions accessed before a copy are shared, and copied again on the next write
+        net_copy_2 = net.copy()
+        self.assertIsNot(net.reactions["GLNabc"], rxn)
+        net.reactions["GLNabc"].upper_bound = 2e-9
+        self.assertEqual(net.get_reaction_bounds().loc["GLNabc", "ub"], 2e-9)
+        self.assertEqual(net_copy_2.get_reaction_bounds().loc["GLNabc", "ub"], 1e-9)
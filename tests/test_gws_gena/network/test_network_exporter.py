@@ -1,8 +1,12 @@
+import gzip
 import os
+import tempfile
 
 from gws_biota import BaseTestCaseUsingFullBiotaDB
 from gws_core import File
 from gws_gena import DataProvider, NetworkExporter, NetworkImporter
+from gws_gena.network.network_data.helper.network_data_binary_helper import NetworkDataBinaryHelper
+from gws_gena.network.network_data.network_core import NetworkCore
 
 
 class TestNetworkExporter(BaseTestCaseUsingFullBiotaDB):
@@ -79,3 +83,69 @@ class TestNetworkExporter(BaseTestCaseUsingFullBiotaDB):
         )
 
         self.assertTrue(file_exporter.is_txt())
+
+    def test_network_binary_export(self):
+        self.print("Test Network binary export and import")
+        data_dir = DataProvider.get_test_data_dir()
+        file_path = os.path.join(data_dir, "small_net", "small_net.json")
+
+        net = NetworkImporter.call(File(path=file_path), params={"add_biomass": True})
+        file_exporter = NetworkExporter.call(
+            net, params={"file_name": "network", "file_format": "npz"}
+        )
+        self.assertTrue(file_exporter.path.endswith(".npz"))
+
+        net2 = NetworkImporter.call(file_exporter, params={"add_biomass": True})
+        self.assertEqual(net2.get_compound_ids(), net.get_compound_ids())
+        self.assertEqual(net2.get_reaction_ids(), net.get_reaction_ids())
+        self.assertTrue(net2.create_stoichiometric_matrix().equals(net.create_stoichiometric_matrix()))
+        self.assertTrue(net2.get_reaction_bounds().equals(net.get_reaction_bounds()))
+
+        # the binary dump is lossless
+        self.assertEqual(net2.dumps(), net.dumps())
+        data = NetworkDataBinaryHelper().load(file_exporter.path)
+        self.assertEqual(
+            [set(comp_data.keys()) for comp_data in data["metabolites"]],
+            [set(comp_data.keys()) for comp_data in net.dumps()["metabolites"]])
+
+        # the arrays can be memory-mapped without creating the network
+        arrays = NetworkDataBinaryHelper().load_arrays(file_exporter.path, mmap_mode="r")
+        self.assertEqual(len(arrays["stoichiometry.indptr"]), net.get_number_of_reactions() + 1)
+
+        # the core can be read from the arrays without creating the network
+        core = NetworkCore.from_arrays(arrays)
+        net_core = net.get_core()
+        self.assertEqual(core.compound_ids, net_core.compound_ids)
+        self.assertEqual(core.reaction_rhea_ids, net_core.reaction_rhea_ids)
+        self.assertTrue((core.S != net_core.S).nnz == 0)
+        self.assertTrue((core.compound_is_steady == net_core.compound_is_steady).all())
+        self.assertTrue((core.reaction_upper_bounds == net_core.reaction_upper_bounds).all())
+
+    def test_network_sbml_export(self):
+        self.print("Test Network SBML import and export")
+        data_dir = DataProvider.get_test_data_dir()
+        file_path = os.path.join(data_dir, "cobra", "network_convert", "e_coli_core.xml")
+
+        # the SBML file is read directly, without the cobra conversion to JSON
+        net = NetworkImporter.call(File(path=file_path), params={"add_biomass": True})
+        self.assertEqual(net.reactions["PFK"].gene_reaction_rule, "b3916 or b1723")
+        self.assertEqual(net.get_reaction_bounds().loc["ATPM", "lb"], 8.39)
+
+        file_exporter = NetworkExporter.call(
+            net, params={"file_name": "network", "file_format": "xml.gz"}
+        )
+        self.assertTrue(file_exporter.path.endswith(".xml.gz"))
+
+        net2 = NetworkImporter.call(file_exporter, params={"add_biomass": True})
+        self.assertEqual(net2.get_compound_ids(), net.get_compound_ids())
+        self.assertEqual(net2.get_reaction_ids(), net.get_reaction_ids())
+        self.assertTrue(net2.create_stoichiometric_matrix().equals(net.create_stoichiometric_matrix()))
+        self.assertTrue(net2.get_reaction_bounds().equals(net.get_reaction_bounds()))
+
+        # only the compressed SBML files are supported
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            gz_path = os.path.join(tmp_dir, "network.json.gz")
+            with gzip.open(gz_path, "wt", encoding="utf-8") as fp:
+                fp.write("{}")
+            with self.assertRaises(Exception):
+                NetworkImporter.call(File(path=gz_path), params={"add_biomass": True})
@@ -2,7 +2,7 @@ import os
 
 from gws_biota import BaseTestCaseUsingFullBiotaDB
 from gws_core import File, TaskRunner
-from gws_gena import DataProvider, NetworkImporter, NetworkMerger
+from gws_gena import DataProvider, Network, NetworkImporter, NetworkMerger
 
 
 class TestMerge(BaseTestCaseUsingFullBiotaDB):
@@ -54,3 +54,31 @@ class TestMerge(BaseTestCaseUsingFullBiotaDB):
         # with open(file_path, 'w', encoding="utf-8") as f:
         #     table = net_merged.get_compound_stats_as_table()
         #     f.write(table.to_csv())
+
+    def test_merge_all(self):
+        data_dir = DataProvider.get_test_data_dir()
+        file1 = File(path=os.path.join(data_dir, "network_merger", "net1.json"))
+        file2 = File(path=os.path.join(data_dir, "network_merger", "net2.json"))
+
+        net1 = NetworkImporter.call(file1, {"add_biomass": True})
+        net2 = NetworkImporter.call(file2, {"add_biomass": True})
+        n1 = len(net1.reactions)
+        n2 = len(net2.reactions)
+
+        # a duplicate of a reaction of net2, with another id
+        net3 = Network()
+        rxn = net2.reactions["RHEA_66592_4_2_99_18"].copy()
+        rxn.id = "RHEA_66592_duplicate"
+        net3.add_reaction(rxn)
+        self.assertEqual(net2.get_duplicate_reaction_ids(rxn), ["RHEA_66592_4_2_99_18"])
+        self.assertTrue(net2.reaction_exists(rxn, check_signature=True))
+        self.assertFalse(net2.reaction_exists(rxn))
+
+        net_merged = Network.merge_all([net1, net2, net1, net3], skip_duplicates=True)
+        self.assertEqual(len(net_merged.reactions), n1 + n2)
+        self.assertTrue("RHEA_66592_duplicate" not in net_merged.reactions)
+        self.assertEqual(len(net1.reactions), n1)
+
+        # only the reactions with the same id are skipped by default
+        net_merged = Network.merge_all([net1, net2, net3])
+        self.assertEqual(len(net_merged.reactions), n1 + n2 + 1)
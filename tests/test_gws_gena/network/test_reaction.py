@@ -1,5 +1,9 @@
 from gws_biota import BaseTestCaseUsingFullBiotaDB
+from gws_biota import Enzyme as BiotaEnzyme
 from gws_gena import Compartment, Compound, Network, Reaction
+from gws_gena.network.helper.biota_lookup_helper import BiotaLookupHelper
+from gws_gena.network.reaction.helper.enzyme_search_up_helper import EnzymeSearchUpHelper
+from gws_gena.network.reaction.helper.reaction_biota_helper import ReactionBiotaHelper
 
 
 class TestNetwork(BaseTestCaseUsingFullBiotaDB):
@@ -97,3 +101,66 @@ class TestNetwork(BaseTestCaseUsingFullBiotaDB):
         print("--->")
         sink_rxn = Reaction.create_sink_reaction(related_compound=comp4, network=net)
         print(sink_rxn.to_str())
+
+    def test_reactions_from_ec_numbers(self):
+        ec_numbers = ["1.4.1.3", "2.7.1.1", "0.0.0.0"]
+        helper = ReactionBiotaHelper()
+        rxns_by_ec, errors_by_ec = helper.create_reactions_from_ec_numbers(
+            ec_numbers, tax_id="42068", tax_search_method="bottom_up")
+        self.assertTrue("0.0.0.0" in errors_by_ec)
+        for ec_number in ["1.4.1.3", "2.7.1.1"]:
+            rxns = Reaction.from_biota(ec_number=ec_number, tax_id="42068", tax_search_method="bottom_up")
+            self.assertEqual(
+                sorted(rxn.id for rxn in rxns_by_ec[ec_number]),
+                sorted(rxn.id for rxn in rxns))
+
+    def test_enzyme_search_up(self):
+        tax = BiotaLookupHelper.get_taxonomy("42068")
+        lineage = [t for t in BiotaLookupHelper.get_taxonomy_lineage(tax.tax_id)[1:] if t.rank != "no rank"]
+
+        def _get_depth(enzyme):
+            # position of the closest ancestor of the taxonomy matched by the enzyme
+            for depth, t in enumerate(lineage):
+                if getattr(enzyme, "tax_" + t.rank, None) == t.tax_id:
+                    return depth
+            return len(lineage)
+
+        # each group of enzymes independently gives the enzyme of its closest ancestor
+        ec_number = "1.4.1.3"
+        groups = {}
+        for enzyme in BiotaEnzyme.select_and_follow_if_deprecated(ec_number=ec_number):
+            groups.setdefault(enzyme.ec_number, []).append(enzyme)
+        found = EnzymeSearchUpHelper.search_up(ec_number, tax)
+        self.assertEqual(len(found), len(groups))
+        for enzyme in found:
+            self.assertEqual(_get_depth(enzyme), min(_get_depth(e) for e in groups[enzyme.ec_number]))
+
+        found_in_bulk = EnzymeSearchUpHelper.search_up_in_bulk([ec_number], tax)
+        self.assertEqual(
+            [_get_depth(enzyme) for enzyme in found_in_bulk[ec_number]],
+            [_get_depth(enzyme) for enzyme in found if enzyme.ec_number == ec_number])
+
+        # the deprecated ec_numbers are not followed by the bulk search up, they are searched one by one
+        deprecated_ec_number = "3.6.3.14"  # transferred to 7.1.2.2
+        self.assertEqual(EnzymeSearchUpHelper.search_up_in_bulk([deprecated_ec_number], tax), {})
+        enzymes = EnzymeSearchUpHelper.search_in_bulk([deprecated_ec_number], tax_id=tax.tax_id)
+        expected = EnzymeSearchUpHelper.search(deprecated_ec_number, tax.tax_id)
+        self.assertTrue(len(expected) > 0)
+        self.assertEqual(
+            sorted(enzyme.id for enzyme in enzymes[deprecated_ec_number]),
+            sorted(enzyme.id for enzyme in expected))
+        self.assertNotIn(deprecated_ec_number, [enzyme.ec_number for enzyme in enzymes[deprecated_ec_number]])
+
+    def test_reaction_templates(self):
+        rxn1 = Reaction.from_biota(rhea_id="RHEA:15133")[0]
+        rxn2 = Reaction.from_biota(rhea_id="RHEA:15133")[0]
+        self.assertIsNot(rxn1, rxn2)
+        self.assertEqual(rxn1.to_str(), rxn2.to_str())
+
+        # the copies are independent of the template
+        rxn1.lower_bound = 0.0
+        comp_id = list(rxn1.substrates.keys())[0]
+        rxn1.substrates[comp_id].compound.layout["x"] = 1234
+        rxn3 = Reaction.from_biota(rhea_id="RHEA:15133")[0]
+        self.assertEqual(rxn3.lower_bound, rxn2.lower_bound)
+        self.assertNotEqual(rxn3.substrates[comp_id].compound.layout.get("x"), 1234)
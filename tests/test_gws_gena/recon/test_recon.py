@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 from gws_biota import BaseTestCaseUsingFullBiotaDB
 from gws_core import (
@@ -16,6 +17,8 @@ from gws_gena import (
     TransformerBiomassReactionTable,
     TransformerECNumberTable,
 )
+from gws_gena.network.reaction.helper.reaction_biota_helper import ReactionBiotaHelper
+from gws_gena.recon.helper.recon_cache_helper import ReconCacheHelper
 
 
 class TestRecon(BaseTestCaseUsingFullBiotaDB):
@@ -130,3 +133,30 @@ class TestRecon(BaseTestCaseUsingFullBiotaDB):
         rxn_ids = recon_net.get_reaction_ids()
         self.assertTrue("RHEA:16585" in rxn_ids)
         self.assertTrue("RHEA:15481" in rxn_ids)
+
+    def test_recon_cache(self):
+        ec_numbers = ["1.4.1.3", "2.7.1.1", "0.0.0.0"]
+        rxns_by_ec, errors_by_ec = ReactionBiotaHelper().create_reactions_from_ec_numbers(
+            ec_numbers, tax_id="42068", tax_search_method="bottom_up")
+        self.assertTrue("0.0.0.0" in errors_by_ec)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            helper = ReconCacheHelper(file_path=os.path.join(tmp_dir, "recon_cache.sqlite"))
+            self.assertEqual(helper.get_reactions(ec_numbers, "42068", "bottom_up"), {})
+
+            helper.set_reactions(rxns_by_ec, "42068", "bottom_up")
+            cached_rxns = helper.get_reactions(ec_numbers, "42068", "bottom_up")
+            self.assertEqual(set(cached_rxns.keys()), set(rxns_by_ec.keys()))
+            for ec_number, rxns in rxns_by_ec.items():
+                self.assertEqual([rxn.to_str() for rxn in cached_rxns[ec_number]], [rxn.to_str() for rxn in rxns])
+
+            # the errors are not cached
+            self.assertNotIn("0.0.0.0", cached_rxns)
+
+            # other keys are not cached
+            self.assertEqual(helper.get_reactions(ec_numbers, "42068", "none"), {})
+
+            # the reconstruction goes on without cache if the database cannot be opened (e.g. the path is a directory)
+            helper = ReconCacheHelper(file_path=tmp_dir)
+            helper.set_reactions(rxns_by_ec, "42068", "bottom_up")
+            self.assertEqual(helper.get_reactions(ec_numbers, "42068", "bottom_up"), {})
@@ -27,3 +27,29 @@ class TestGapFinder(BaseTestCaseUsingFullBiotaDB):
         print(f"After gap filling: {len(dead)} dead-end over {len(result.compounds)} compounds")
 
         print(dead)
+
+    def test_gap_filler_with_optimization(self):
+        data_dir = DataProvider.get_test_data_dir()
+        file_path = os.path.join(data_dir, "./ecoli/ecoli.json")
+        net = NetworkImporter.call(File(path=file_path), {"add_biomass": True})
+
+        helper = GapFinderHelper()
+        rxn_ids = set(net.reactions.keys())
+        blocked = set(helper.find_blocked_reaction_ids(net))
+
+        params = {"tax_id": "562", "method": "optimization", "target": "dead_ends"}
+        tester = TaskRunner(params=params, inputs={"network": net}, task_type=GapFiller)
+        outputs = tester.run()
+        result = outputs["network"]
+
+        result_blocked = set(helper.find_blocked_reaction_ids(result))
+        print(f"Before gap filling: {len(blocked)} blocked reactions over {len(rxn_ids)} reactions")
+        print(f"After gap filling: {len(result_blocked)} blocked reactions over {len(result.reactions)} reactions")
+
+        # adding reactions cannot block the other reactions
+        self.assertTrue(len(result.reactions) >= len(rxn_ids))
+        self.assertTrue((result_blocked & rxn_ids).issubset(blocked))
+
+        # some blocked reactions are unblocked, i.e. the added reactions are connected to the network compounds
+        self.assertTrue(len(blocked - result_blocked) > 0)
+        self.assertTrue(len(result.reactions) > len(rxn_ids))
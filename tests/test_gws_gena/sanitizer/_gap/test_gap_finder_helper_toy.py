@@ -53,3 +53,32 @@ class TestDeadEndFinderHelper(BaseTestCaseUsingFullBiotaDB):
         self.assertEqual(
             comp_ids, ["X1_e", "X2_e", "X4_e", "X5_e", "X_orphan_c", "X_fake_orphan_e"]
         )
+
+    def test_toy_with_gaps_cascade(self):
+        data_dir = DataProvider.get_test_data_dir()
+        data_dir = os.path.join(data_dir, "toy_with_gap")
+
+        file_path = os.path.join(data_dir, "toy_network.json")
+        net = NetworkImporter.call(File(path=file_path), params={"add_biomass": True})
+
+        helper = GapFinderHelper()
+        gaps = helper.analyze_gaps(net)
+        self.print(gaps)
+        self.assertEqual(gaps["orphan_compound_ids"], helper.find_orphan_compound_ids(net))
+        self.assertEqual(gaps["deadend_compound_ids"], ["X1_c", "X2_c", "X1_e", "X2_e", "X4_e", "X5_e"])
+
+        # the dead-ends and the compounds that cannot be produced or consumed are blocked
+        blocked_comp_ids = set(gaps["blocked_compound_ids"])
+        self.assertTrue(set(gaps["deadend_compound_ids"]).issubset(blocked_comp_ids))
+        self.assertTrue(set(gaps["not_produced_compound_ids"]).issubset(blocked_comp_ids))
+        self.assertTrue(set(gaps["not_consumed_compound_ids"]).issubset(blocked_comp_ids))
+
+        # the reactions of the blocked compounds are blocked
+        blocked_rxn_ids = set(gaps["blocked_reaction_ids"])
+        for rxn_id, rxn in net.reactions.items():
+            comp_ids = {val.compound.id for val in (*rxn.substrates.values(), *rxn.products.values())}
+            if comp_ids & blocked_comp_ids:
+                self.assertTrue(rxn_id in blocked_rxn_ids)
+
+        df = helper.find_gaps(net)
+        self.assertEqual([idx for idx in df.index if df.at[idx, "is_blocked"]], gaps["blocked_compound_ids"])
@@ -3,7 +3,7 @@ import os
 
 from gws_biota import BaseTestCaseUsingFullBiotaDB
 from gws_core import File
-from gws_gena import ContextImporter, DataProvider, NetworkImporter, Twin
+from gws_gena import ContextImporter, DataProvider, FlatTwin, NetworkImporter, Twin
 
 
 class TestTwinFlattener(BaseTestCaseUsingFullBiotaDB):
@@ -38,3 +38,47 @@ class TestTwinFlattener(BaseTestCaseUsingFullBiotaDB):
             expected_json = json.load(fp)
 
         self.assertEqual(twin.dumps_flat(), expected_json)
+
+    def test_block_stoichiometric_matrix(self):
+        self.print("Test block stoichiometric matrix")
+        data_dir = os.path.join(DataProvider.get_test_data_dir(), "toy")
+        net = NetworkImporter.call(
+            File(path=os.path.join(data_dir, "toy.json")), params={"skip_orphans": True, "add_biomass": True}
+        )
+        net_2 = net.copy()
+        net_2.name = "toy_2"
+        net_2.network_data.name = "toy_2"
+
+        twin = Twin()
+        twin.add_network(net)
+        twin.add_network(net_2)
+
+        blocks = twin.create_block_stoichiometric_matrix()
+        S = blocks["S"]
+        self.assertEqual(S.shape, (len(blocks["compound_ids"]), len(blocks["reaction_ids"])))
+        self.assertEqual(S.shape[1], 2 * len(net.reactions))
+
+        # each diagonal block is the stoichiometric matrix of the private compounds of the network
+        S_net = net.create_stoichiometric_matrix()
+        start, end = blocks["row_ranges"][net.name]
+        col_start, col_end = blocks["column_ranges"][net.name]
+        private_ids = [comp_id[len(net.name) + 1:] for comp_id in blocks["compound_ids"][start:end]]
+        self.assertTrue((S[start:end, col_start:col_end].toarray() == S_net.loc[private_ids, :].to_numpy()).all())
+
+        # the shared environment compounds couple both networks
+        nb_shared = len(blocks["shared_compound_ids"])
+        coupling = S[S.shape[0] - nb_shared:, :].toarray()
+        start_2, _ = blocks["column_ranges"][net_2.name]
+        self.assertTrue((coupling[:, :start_2] == coupling[:, start_2:]).all())
+
+        # the flat twin stoichiometry is assembled from the blocks
+        flat_S = twin.flatten().get_flat_network().create_stoichiometric_matrix()
+        expected_S = FlatTwin.loads(twin.dumps_flat()).get_flat_network().create_stoichiometric_matrix()
+        self.assertTrue(flat_S.equals(expected_S))
+
+        # only the block of the network that changed is recomputed
+        block = net.network_data.create_flat_stoichiometric_block()
+        net_2.remove_reaction(next(iter(net_2.reactions)))
+        twin.create_block_stoichiometric_matrix()
+        self.assertIs(net.network_data.create_flat_stoichiometric_block(), block)
+        self.assertEqual(twin.create_block_stoichiometric_matrix()["S"].shape[1], 2 * len(net.reactions) - 1)
@@ -32,3 +32,24 @@ class TestUnicell(BaseTestCaseUsingFullBiotaDB):
 
         dff2 = df1.loc[df2.index, df2.columns]
         self.assertTrue(dff2.equals(df2))
+
+    def test_lookup_tables(self):
+        tables = Unicell.get_lookup_tables()
+        self.print(f"Unicell lookup tables (biota version {tables['version']})")
+        self.assertTrue(len(tables["compound_chebi_ids"]) > 0)
+        self.assertTrue(len(tables["reaction_rhea_ids"]) > 0)
+
+        # the tables are cached in the process
+        self.assertIs(Unicell.get_lookup_tables(), tables)
+
+    def test_store(self):
+        file_path = Unicell.get_store_file(tax_id="562")
+        self.assertTrue(Unicell.get_biota_version() in file_path)
+
+        # the store file is reused
+        self.assertEqual(Unicell.get_store_file(tax_id="562"), file_path)
+
+        net = Unicell.create_network(tax_id="562")
+        df = Unicell.create_stoichiometric_matrix(tax_id="562")
+        self.assertEqual(len(net.reactions), df.shape[1])
+        self.assertEqual(set(net.reactions.keys()), set(df.columns))